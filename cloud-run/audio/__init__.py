@@ -5,6 +5,8 @@ Teknokul Audio Modülü
 from .music_manager import (
     get_music_type_for_subject,
     download_music,
+    get_music_info,
+    get_prefetch_paths,
     add_background_music,
     add_outro_jingle,
     create_full_audio_mix,
@@ -12,14 +14,22 @@ from .music_manager import (
     MUSIC_CONFIG,
     SUBJECT_MUSIC
 )
+from .asset_cache import ASSET_CACHE, MusicAssetCache
+from .finishing import build_finishing_command, finish_video
 
 __all__ = [
     "get_music_type_for_subject",
     "download_music", 
+    "get_music_info",
+    "get_prefetch_paths",
     "add_background_music",
     "add_outro_jingle",
     "create_full_audio_mix",
     "create_silent_audio",
     "MUSIC_CONFIG",
-    "SUBJECT_MUSIC"
+    "SUBJECT_MUSIC",
+    "ASSET_CACHE",
+    "MusicAssetCache",
+    "build_finishing_command",
+    "finish_video"
 ]
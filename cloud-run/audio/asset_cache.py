@@ -0,0 +1,160 @@
+"""
+Teknokul Müzik Asset Önbelleği
+🎵 Arka plan müzikleri ve jingle süreç başına bir kez indirilir
+- Paylaşılan cache dizininde tek kopya, job'lara hardlink/symlink
+- ETag / If-None-Match ile periyodik doğrulama
+- FFprobe bilgisi (süre, format) dosyayla birlikte saklanır
+"""
+
+import os
+import json
+import time
+import shutil
+import asyncio
+import hashlib
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+from pipeline.http import get_client
+from pipeline.process import run_process
+
+SUPABASE_URL = os.getenv("SUPABASE_URL", "")
+ASSET_CACHE_DIR = Path(os.getenv("ASSET_CACHE_DIR", "/tmp/teknokul-cache/assets"))
+ASSET_REVALIDATE_SECONDS = int(os.getenv("ASSET_REVALIDATE_SECONDS", "600"))
+
+
+async def probe_audio_info(path: Path) -> dict:
+    """FFprobe ile süre ve stream formatını oku"""
+    try:
+        result = await run_process(
+            ["ffprobe", "-v", "error", "-select_streams", "a:0",
+             "-show_entries", "format=duration,format_name:stream=codec_name,sample_rate,channels",
+             "-of", "json", path],
+            timeout=30, step="ffprobe asset"
+        )
+        data = json.loads(result.stdout)
+        fmt = data.get("format", {})
+        stream = (data.get("streams") or [{}])[0]
+        return {
+            "duration": float(fmt.get("duration", 0)) or None,
+            "format_name": fmt.get("format_name"),
+            "codec_name": stream.get("codec_name"),
+            "sample_rate": int(stream["sample_rate"]) if stream.get("sample_rate") else None,
+            "channels": stream.get("channels"),
+        }
+    except Exception as e:
+        print(f"⚠️ Asset probe hatası: {e}")
+        return {}
+
+
+def link_asset(src: Path, dest: Path) -> None:
+    """Cache dosyasını job dizinine bağla: hardlink → symlink → kopya"""
+    if dest.exists() or dest.is_symlink():
+        dest.unlink()
+    try:
+        os.link(src, dest)
+        return
+    except OSError:
+        pass
+    try:
+        os.symlink(src, dest)
+    except OSError:
+        shutil.copyfile(src, dest)
+
+
+class MusicAssetCache:
+    """Supabase Storage'daki müzik dosyaları için süreç çapında önbellek"""
+
+    def __init__(self, root: Path, revalidate_seconds: int = ASSET_REVALIDATE_SECONDS):
+        self.root = Path(root)
+        self.revalidate_seconds = revalidate_seconds
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._checked_at: Dict[str, float] = {}
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _paths(self, storage_path: str):
+        digest = hashlib.sha1(storage_path.encode("utf-8")).hexdigest()[:16]
+        name = f"{digest}_{Path(storage_path).name}"
+        return self.root / name, self.root / f"{name}.json"
+
+    def _load_meta(self, storage_path: str) -> Optional[dict]:
+        data_path, meta_path = self._paths(storage_path)
+        if not data_path.exists():
+            return None
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def info(self, storage_path: str) -> dict:
+        """Cache'teki dosyanın probe bilgisi (süre, format, codec)"""
+        return self._load_meta(storage_path) or {}
+
+    async def fetch(self, storage_path: str) -> Optional[Path]:
+        """
+        Dosyanın cache'teki yolunu döndür
+        - Son doğrulamadan beri süre dolmadıysa ağa çıkılmaz
+        - Süre dolduysa If-None-Match ile doğrulanır (304 → indirme yok)
+        - Ağ hatasında eski kopya kullanılır
+        """
+        data_path, meta_path = self._paths(storage_path)
+        lock = self._locks.setdefault(storage_path, asyncio.Lock())
+
+        async with lock:
+            meta = self._load_meta(storage_path)
+            checked = self._checked_at.get(storage_path, 0)
+            if meta and time.monotonic() - checked < self.revalidate_seconds:
+                return data_path
+
+            url = f"{SUPABASE_URL}/storage/v1/object/public/assets/{storage_path}"
+            headers = {}
+            if meta and meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+
+            tmp_path = data_path.with_name(f".{data_path.name}.tmp")
+            try:
+                client = get_client("supabase")
+                async with client.stream("GET", url, headers=headers) as response:
+                    if response.status_code == 304 and meta:
+                        self._checked_at[storage_path] = time.monotonic()
+                        return data_path
+
+                    if response.status_code != 200:
+                        print(f"⚠️ Müzik indirilemedi: {response.status_code}")
+                        return data_path if meta else None
+
+                    with open(tmp_path, "wb") as f:
+                        async for chunk in response.aiter_bytes(256 * 1024):
+                            f.write(chunk)
+                    etag = response.headers.get("etag")
+
+            except Exception as e:
+                print(f"⚠️ Müzik indirme hatası: {e}")
+                tmp_path.unlink(missing_ok=True)
+                return data_path if meta else None
+
+            os.replace(tmp_path, data_path)
+            new_meta = await probe_audio_info(data_path)
+            new_meta.update({"etag": etag, "storage_path": storage_path, "fetched_at": time.time()})
+            with open(meta_path, "w", encoding="utf-8") as f:
+                json.dump(new_meta, f)
+
+            self._checked_at[storage_path] = time.monotonic()
+            print(f"✅ Müzik önbelleğe alındı: {storage_path}")
+            return data_path
+
+    async def link_into(self, storage_path: str, dest: Path) -> bool:
+        """Dosyayı job dizinine bağla"""
+        cached = await self.fetch(storage_path)
+        if not cached:
+            return False
+        link_asset(cached, dest)
+        return True
+
+    async def prefetch(self, storage_paths: Iterable[str]) -> None:
+        """Tüm dosyaları paralel olarak önbelleğe al (startup'ta)"""
+        await asyncio.gather(*[self.fetch(p) for p in storage_paths], return_exceptions=True)
+
+
+ASSET_CACHE = MusicAssetCache(ASSET_CACHE_DIR)
@@ -0,0 +1,128 @@
+"""
+Teknokul Tek Geçişli Bitirme Aşaması
+🎬 Ham Manim videosu + TTS segmentleri + arka plan müziği + jingle
+tek bir filter_complex ile tek seferde final MP4'e dönüştürülür
+- Ara MP3 yok (nesil kaybı yok), tek AAC encode
+- Video stream copy
+"""
+
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from pipeline.process import run_process, probe_duration
+
+# Jingle video bitmeden kaç saniye önce başlar
+JINGLE_LEAD_SECONDS = 3.5
+
+
+def build_finishing_command(video_path: Path, segments: List[Tuple[Path, float]],
+                            output_path: Path, video_duration: float,
+                            music_path: Optional[Path] = None,
+                            music_duration: Optional[float] = None,
+                            jingle_path: Optional[Path] = None,
+                            music_volume: float = 0.12, tail_duration: float = 0.0) -> list:
+    """
+    Tek geçişli FFmpeg komutu oluştur
+
+    segments: [(ses dosyası, süre)] - videodaki sırayla, art arda yerleşir
+    Final süre: TTS varsa min(video, toplam TTS) (eski -shortest davranışı)
+    tail_duration: videonun sonuna eklenmiş outro klibi; sınır min(video, TTS + outro) olur
+    (-t baştan keser: ana sahne TTS'ten uzunsa birleştirmeden önce kırpılmalı, bkz. append_outro_clip)
+    """
+    inputs = ["-i", str(video_path)]
+    filter_parts = []
+    idx = 1
+
+    # 1. TTS segmentleri: her biri kendi offset'inde
+    tts_labels = []
+    offset = 0.0
+    for i, (segment_path, segment_duration) in enumerate(segments):
+        inputs.extend(["-i", str(segment_path)])
+        delay_ms = int(offset * 1000)
+        filter_parts.append(f"[{idx}:a]adelay={delay_ms}:all=1[s{i}]")
+        tts_labels.append(f"[s{i}]")
+        offset += segment_duration
+        idx += 1
+
+    tts_total = offset
+    final_duration = min(video_duration, tts_total + tail_duration) if segments else video_duration
+
+    mix_labels = []
+    if len(tts_labels) > 1:
+        filter_parts.append(
+            f"{''.join(tts_labels)}amix=inputs={len(tts_labels)}:duration=longest:normalize=0[tts]"
+        )
+        mix_labels.append("[tts]")
+    elif tts_labels:
+        mix_labels.append(tts_labels[0])
+
+    # 2. Arka plan müziği: gerekiyorsa loop, final süreye kırp
+    if music_path:
+        if not (music_duration and music_duration >= final_duration):
+            inputs.extend(["-stream_loop", "-1"])
+        inputs.extend(["-i", str(music_path)])
+        filter_parts.append(f"[{idx}:a]volume={music_volume},atrim=0:{final_duration}[bg]")
+        mix_labels.append("[bg]")
+        idx += 1
+
+    # 3. Jingle: video bitmeden JINGLE_LEAD_SECONDS önce
+    if jingle_path:
+        inputs.extend(["-i", str(jingle_path)])
+        jingle_ms = int(max(0, final_duration - JINGLE_LEAD_SECONDS) * 1000)
+        filter_parts.append(
+            f"[{idx}:a]adelay={jingle_ms}:all=1,afade=t=in:st=0:d=0.3,volume=0.7[jingle]"
+        )
+        mix_labels.append("[jingle]")
+        idx += 1
+
+    if not mix_labels:
+        # Ses yok: sadece remux
+        return ["ffmpeg", "-y", "-i", str(video_path), "-c", "copy",
+                "-movflags", "+faststart", str(output_path)]
+
+    if len(mix_labels) > 1:
+        filter_parts.append(f"{''.join(mix_labels)}amix=inputs={len(mix_labels)}:duration=first[aout]")
+        audio_out = "[aout]"
+    else:
+        audio_out = mix_labels[0]
+
+    return [
+        "ffmpeg", "-y",
+        *inputs,
+        "-filter_complex", ";".join(filter_parts),
+        "-map", "0:v",
+        "-map", audio_out,
+        "-c:v", "copy",
+        "-c:a", "aac",
+        "-t", f"{final_duration:.3f}",
+        "-movflags", "+faststart",
+        str(output_path)
+    ]
+
+
+async def finish_video(video_path: Path, segments: List[Tuple[Path, float]], output_path: Path,
+                       music_path: Optional[Path] = None, music_duration: Optional[float] = None,
+                       jingle_path: Optional[Path] = None, music_volume: float = 0.12,
+                       tail_duration: float = 0.0) -> bool:
+    """Bitirme komutunu çalıştır"""
+    try:
+        video_duration = await probe_duration(video_path)
+        if video_duration is None:
+            print("⚠️ Video süresi okunamadı")
+            return False
+
+        cmd = build_finishing_command(
+            video_path, segments, output_path, video_duration,
+            music_path=music_path, music_duration=music_duration,
+            jingle_path=jingle_path, music_volume=music_volume, tail_duration=tail_duration
+        )
+        result = await run_process(cmd, timeout=180, step="ffmpeg finish")
+
+        if result.ok and output_path.exists():
+            return True
+        print(f"⚠️ Bitirme hatası: {result.stderr[-500:]}")
+        return False
+
+    except Exception as e:
+        print(f"⚠️ Bitirme hatası: {e}")
+        return False
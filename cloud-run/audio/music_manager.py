@@ -4,10 +4,10 @@ Teknokul Müzik Yöneticisi
 """
 
 import os
-import subprocess
 from pathlib import Path
 from typing import Optional
-import httpx
+from pipeline.process import run_process
+from .asset_cache import ASSET_CACHE
 
 # Supabase bilgileri
 SUPABASE_URL = os.getenv("SUPABASE_URL", "")
@@ -44,41 +44,41 @@ def get_music_type_for_subject(subject_name: str) -> str:
     return "default"
 
 
+def resolve_music_path(music_key: str) -> str:
+    """Müzik anahtarını Storage yoluna çevir"""
+    if music_key in MUSIC_CONFIG:
+        return MUSIC_CONFIG[music_key]
+    elif music_key in MUSIC_CONFIG.get("background", {}):
+        return MUSIC_CONFIG["background"][music_key]
+    return MUSIC_CONFIG["background"]["default"]
+
+
+def get_prefetch_paths() -> list:
+    """Startup'ta önbelleğe alınacak müzik dosyaları"""
+    return list(MUSIC_CONFIG["background"].values()) + [MUSIC_CONFIG["outro_jingle"]]
+
+
+def get_music_info(music_key: str) -> dict:
+    """Önbellekteki müziğin probe bilgisi (süre, format)"""
+    return ASSET_CACHE.info(resolve_music_path(music_key))
+
+
 async def download_music(music_key: str, output_path: Path) -> bool:
-    """Supabase Storage'dan müzik indir"""
+    """Supabase Storage'dan müzik al (asset cache üzerinden, job dizinine bağlanır)"""
     try:
         if not SUPABASE_URL or not SUPABASE_SERVICE_KEY:
             print("⚠️ Supabase credentials eksik, müzik indirilemedi")
             return False
         
-        # Müzik yolunu al
-        if music_key in MUSIC_CONFIG:
-            music_path = MUSIC_CONFIG[music_key]
-        elif music_key in MUSIC_CONFIG.get("background", {}):
-            music_path = MUSIC_CONFIG["background"][music_key]
-        else:
-            music_path = MUSIC_CONFIG["background"]["default"]
-        
-        url = f"{SUPABASE_URL}/storage/v1/object/public/assets/{music_path}"
-        
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, timeout=60)
-            
-            if response.status_code == 200:
-                with open(output_path, "wb") as f:
-                    f.write(response.content)
-                return True
-            else:
-                print(f"⚠️ Müzik indirilemedi: {response.status_code}")
-                return False
+        return await ASSET_CACHE.link_into(resolve_music_path(music_key), output_path)
                 
     except Exception as e:
         print(f"⚠️ Müzik indirme hatası: {e}")
         return False
 
 
-def add_background_music(video_path: Path, music_path: Path, output_path: Path, 
-                         music_volume: float = 0.15) -> bool:
+async def add_background_music(video_path: Path, music_path: Path, output_path: Path,
+                               music_volume: float = 0.15) -> bool:
     """
     Videoya arka plan müziği ekle
     - TTS duyulsun diye müzik düşük volume
@@ -92,7 +92,7 @@ def add_background_music(video_path: Path, music_path: Path, output_path: Path,
             "-of", "default=noprint_wrappers=1:nokey=1",
             str(video_path)
         ]
-        result = subprocess.run(duration_cmd, capture_output=True, text=True, timeout=30)
+        result = await run_process(duration_cmd, timeout=30, step="ffprobe")
         video_duration = float(result.stdout.strip())
         
         # Müziği loop edip video süresine kırp, volume ayarla, orijinal sesle mixle
@@ -112,12 +112,12 @@ def add_background_music(video_path: Path, music_path: Path, output_path: Path,
             str(output_path)
         ]
         
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=120)
+        result = await run_process(cmd, timeout=120, step="ffmpeg mix")
         
         if result.returncode == 0 and output_path.exists():
             return True
         else:
-            print(f"⚠️ Müzik ekleme hatası: {result.stderr[:300]}")
+            print(f"⚠️ Müzik ekleme hatası: {result.stderr[-300:]}")
             return False
             
     except Exception as e:
@@ -125,8 +125,8 @@ def add_background_music(video_path: Path, music_path: Path, output_path: Path,
         return False
 
 
-def add_outro_jingle(video_path: Path, jingle_path: Path, output_path: Path,
-                     jingle_start_before_end: float = 3.0) -> bool:
+async def add_outro_jingle(video_path: Path, jingle_path: Path, output_path: Path,
+                           jingle_start_before_end: float = 3.0) -> bool:
     """
     Video sonuna jingle ekle
     - Video bitmeden X saniye önce başlar
@@ -140,7 +140,7 @@ def add_outro_jingle(video_path: Path, jingle_path: Path, output_path: Path,
             "-of", "default=noprint_wrappers=1:nokey=1",
             str(video_path)
         ]
-        result = subprocess.run(duration_cmd, capture_output=True, text=True, timeout=30)
+        result = await run_process(duration_cmd, timeout=30, step="ffprobe")
         video_duration = float(result.stdout.strip())
         
         jingle_start = max(0, video_duration - jingle_start_before_end)
@@ -160,12 +160,12 @@ def add_outro_jingle(video_path: Path, jingle_path: Path, output_path: Path,
             str(output_path)
         ]
         
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=120)
+        result = await run_process(cmd, timeout=120, step="ffmpeg mix")
         
         if result.returncode == 0 and output_path.exists():
             return True
         else:
-            print(f"⚠️ Jingle ekleme hatası: {result.stderr[:300]}")
+            print(f"⚠️ Jingle ekleme hatası: {result.stderr[-300:]}")
             return False
             
     except Exception as e:
@@ -173,25 +173,31 @@ def add_outro_jingle(video_path: Path, jingle_path: Path, output_path: Path,
         return False
 
 
-def create_full_audio_mix(video_path: Path, tts_audio_path: Path, 
-                          music_path: Optional[Path], jingle_path: Optional[Path],
-                          output_path: Path, music_volume: float = 0.12) -> bool:
+async def create_full_audio_mix(video_path: Path, tts_audio_path: Path,
+                                music_path: Optional[Path], jingle_path: Optional[Path],
+                                output_path: Path, music_volume: float = 0.12,
+                                video_duration: Optional[float] = None,
+                                music_duration: Optional[float] = None) -> bool:
     """
     Tüm sesleri tek seferde mixle:
     1. TTS (ana ses - yüksek volume)
     2. Arka plan müziği (düşük volume)
     3. Outro jingle (son 3 saniye)
+    
+    Süreler biliniyorsa (asset cache) tekrar probe edilmez;
+    müzik videodan uzunsa loop gerekmez
     """
     try:
         # Video süresini al
-        duration_cmd = [
-            "ffprobe", "-v", "error",
-            "-show_entries", "format=duration",
-            "-of", "default=noprint_wrappers=1:nokey=1",
-            str(video_path)
-        ]
-        result = subprocess.run(duration_cmd, capture_output=True, text=True, timeout=30)
-        video_duration = float(result.stdout.strip())
+        if video_duration is None:
+            duration_cmd = [
+                "ffprobe", "-v", "error",
+                "-show_entries", "format=duration",
+                "-of", "default=noprint_wrappers=1:nokey=1",
+                str(video_path)
+            ]
+            result = await run_process(duration_cmd, timeout=30, step="ffprobe")
+            video_duration = float(result.stdout.strip())
         
         inputs = ["-i", str(video_path)]
         filter_parts = []
@@ -203,7 +209,10 @@ def create_full_audio_mix(video_path: Path, tts_audio_path: Path,
         
         # Arka plan müziği
         if music_path and music_path.exists():
-            inputs.extend(["-stream_loop", "-1", "-i", str(music_path)])
+            if music_duration and music_duration >= video_duration:
+                inputs.extend(["-i", str(music_path)])
+            else:
+                inputs.extend(["-stream_loop", "-1", "-i", str(music_path)])
             filter_parts.append(f"[{stream_idx}:a]volume={music_volume},atrim=0:{video_duration}[bg]")
             audio_streams.append("[bg]")
             stream_idx += 1
@@ -246,12 +255,12 @@ def create_full_audio_mix(video_path: Path, tts_audio_path: Path,
                 str(output_path)
             ]
         
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=180)
+        result = await run_process(cmd, timeout=180, step="ffmpeg mix")
         
         if result.returncode == 0 and output_path.exists():
             return True
         else:
-            print(f"⚠️ Audio mix hatası: {result.stderr[:500]}")
+            print(f"⚠️ Audio mix hatası: {result.stderr[-500:]}")
             return False
             
     except Exception as e:
@@ -260,7 +269,7 @@ def create_full_audio_mix(video_path: Path, tts_audio_path: Path,
 
 
 # Basit placeholder müzik oluştur (test için)
-def create_silent_audio(duration: float, output_path: Path) -> bool:
+async def create_silent_audio(duration: float, output_path: Path) -> bool:
     """Test için sessiz audio oluştur"""
     try:
         cmd = [
@@ -271,7 +280,7 @@ def create_silent_audio(duration: float, output_path: Path) -> bool:
             "-c:a", "libmp3lame",
             str(output_path)
         ]
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
+        result = await run_process(cmd, timeout=30, step="ffmpeg silence")
         return result.returncode == 0
-    except:
+    except Exception:
         return False
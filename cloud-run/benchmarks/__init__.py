@@ -0,0 +1,5 @@
+"""
+Teknokul Benchmark'ları
+⏱️ Dış servisler (Gemini, ElevenLabs, Supabase, Teknokul API) yerel sahtelerle
+değiştirilerek pipeline performansı tekrarlanabilir şekilde ölçülür
+"""
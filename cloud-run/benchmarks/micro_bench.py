@@ -0,0 +1,390 @@
+"""
+Teknokul Mikro Benchmark
+⏱️ Fallback yolundaki saf Python katmanını ölçer (dış servis, manim, ffmpeg yok):
+- Ders template üreticileri ve smart renderer
+- detect_animations, extract_math_expressions, extract_numbers
+- get_full_prompt, add_outro_to_code
+
+Sentetik soru korpusu sabit seed ile üretilir; sonuçlar çağrı başına µs (en iyi tur,
+medyan, p90) olarak raporlanır. En iyi tur (gürültüden en az etkilenen) micro_thresholds.json'daki
+referansın (1 + tolerans) katını aşarsa çıkış kodu 1 olur. Makine hız farkı, her çalıştırmada
+ölçülen sabit bir kalibrasyon iş yüküyle referanslar ölçeklenerek dengelenir:
+
+    python -m benchmarks.micro_bench
+    python -m benchmarks.micro_bench --update-thresholds   # referansları yenile
+"""
+
+import io
+import gc
+import sys
+import json
+import time
+import random
+import re
+import shutil
+import argparse
+import tempfile
+import contextlib
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+from .pipeline_bench import BENCH_DIR, configure_environment, percentile
+
+THRESHOLDS_PATH = BENCH_DIR / "micro_thresholds.json"
+
+SUBJECT_TOPICS = {
+    "Matematik": ["Denklemler", "Üçgenler", "Fonksiyonlar", "Olasılık", "Kesirler", "Oran Orantı"],
+    "Fizik": ["Hız", "Kuvvet ve Hareket", "Elektrik Devreleri", "Basınç", "Enerji"],
+    "Kimya": ["Bileşikler", "Mol Kavramı", "Asitler ve Bazlar", "Periyodik Tablo"],
+    "Biyoloji": ["Hücre", "Fotosentez", "Kalıtım", "Sindirim Sistemi"],
+    "Türkçe": ["Cümlenin Ögeleri", "Sözcükte Anlam", "Paragraf", "Yazım Kuralları"],
+    "Tarih": ["Cumhuriyet Dönemi", "Kurtuluş Savaşı", "Osmanlı Kuruluş", "İnkılaplar"],
+}
+
+# {a}, {b}, {c}: sayı; {u}: birim — regex'lerin gerçek içerikte tetiklendiği kalıplar
+QUESTION_FRAGMENTS = {
+    "Matematik": [
+        "{a}x + {b} = {c} denkleminde x kaçtır?",
+        "Kenarları {a} cm ve {b} cm olan dikdörtgenin alanı kaç cm²'dir?",
+        "f(x) = {a}x + {b} fonksiyonunun grafiği y eksenini nerede keser?",
+        "Bir torbada {a} kırmızı ve {b} mavi top var. Rastgele çekilen topun kırmızı olma olasılığı nedir?",
+        "{a}/{b} + {b}/{c} işleminin sonucu kaçtır?",
+        "Bir üçgenin iç açıları {a}°, {b}° ve x'tir. x kaç derecedir?",
+    ],
+    "Fizik": [
+        "Bir araç {a} saatte {c} km yol alıyor. Ortalama hızı kaç km/h'tir?",
+        "{a} kg kütleli cisme {b} N kuvvet uygulanıyor. İvmesi kaç m/s²'dir?",
+        "{a} V gerilimli devrede direnç {b} Ω ise akım kaç A olur?",
+        "{a} m yükseklikten bırakılan cismin yere çarpma hızı kaç m/s'dir?",
+    ],
+    "Kimya": [
+        "{a} g suda kaç mol molekül bulunur?",
+        "H2O, CO2 ve NaCl bileşiklerinden hangisi iyonik bağlıdır?",
+        "pH değeri {a} olan çözelti asidik midir bazik midir?",
+        "Atom numarası {a} olan elementin periyodik tablodaki yeri neresidir?",
+    ],
+    "Biyoloji": [
+        "Fotosentez hücrenin hangi organelinde gerçekleşir?",
+        "Aa x Aa çaprazlamasında çekinik fenotip oranı yüzde kaçtır?",
+        "Sindirim sisteminde besinlerin emilimi hangi organda gerçekleşir?",
+        "Mitokondri ve kloroplastın ortak özelliği nedir?",
+    ],
+    "Türkçe": [
+        "\"Kitap okumak insanı geliştirir.\" cümlesinin yüklemi hangisidir?",
+        "Aşağıdaki cümlelerin hangisinde mecaz anlamlı bir sözcük vardır?",
+        "Bu paragrafın ana düşüncesi aşağıdakilerden hangisidir?",
+        "Hangi cümlede yazım yanlışı yapılmıştır?",
+    ],
+    "Tarih": [
+        "Türkiye Cumhuriyeti hangi yıl ilan edilmiştir?",
+        "Sakarya Meydan Muharebesi'nin sonuçlarından biri aşağıdakilerden hangisidir?",
+        "Osmanlı Devleti'nin kuruluş döneminde uygulanan iskan politikasının amacı nedir?",
+        "Harf İnkılabı hangi yıl yapılmıştır ve amacı nedir?",
+    ],
+}
+
+STEP_FRAGMENTS = [
+    "Önce verilenleri yazalım: a = {a}, b = {b}.",
+    "Şimdi {a} + {b} = {s} işlemini yapalım.",
+    "Eşitliğin iki tarafını {b} ile bölelim, x = {a} olur.",
+    "Şekildeki açı {a}° olduğuna göre diğer açı {c}° eder.",
+    "Hız eşittir yol bölü zaman, {c} km / {a} saat.",
+    "Grafiği çizelim ve y eksenini kestiği noktayı bulalım.",
+    "Oranı %{a} olarak bulduk, bunu kesir olarak {a}/100 yazabiliriz.",
+    "Tabloyu inceleyelim, toplam {s} kg eder.",
+    "Bu bilgiyi hatırlayalım ve şıkları karşılaştıralım.",
+    "Cevabımız {opt} şıkkı!",
+]
+
+COLORS = ["YELLOW", "GREEN", "BLUE", "ORANGE", "PURPLE", "WHITE"]
+
+
+def _fill(fragment: str, rng: random.Random) -> str:
+    a, b, c = rng.randint(2, 12), rng.randint(1, 9), rng.randint(20, 180)
+    return fragment.format(a=a, b=b, c=c, s=a + b, opt=rng.choice("ABCD"))
+
+
+def build_synthetic_corpus(size: int, seed: int = 0) -> List[dict]:
+    """
+    Sabit seed ile sentetik soru korpusu
+    - Her kayıt: question (VideoRequest alanları), scenario (Gemini Flash çıktısı) ve durations
+    - Adım sayısı 3-6 arası (template'ler en fazla 6 adım işler)
+    """
+    rng = random.Random(seed)
+    subjects = list(SUBJECT_TOPICS)
+    corpus = []
+    for i in range(size):
+        subject = subjects[i % len(subjects)]
+        topic = rng.choice(SUBJECT_TOPICS[subject])
+        question_text = _fill(rng.choice(QUESTION_FRAGMENTS[subject]), rng)
+        correct = rng.choice("ABCD")
+        steps = []
+        for n in range(rng.randint(3, 6)):
+            tts = _fill(rng.choice(STEP_FRAGMENTS), rng)
+            steps.append({
+                "adim_no": n + 1,
+                "tts_metni": tts,
+                "ekranda_gosterilecek_metin": tts[:40],
+                "vurgu_rengi": rng.choice(COLORS),
+            })
+        corpus.append({
+            "question": {
+                "question_id": f"micro-{i}",
+                "question_text": question_text,
+                "options": {k: str(rng.randint(1, 99)) for k in "ABCD"},
+                "correct_answer": correct,
+                "topic_name": topic,
+                "subject_name": subject,
+                "grade": rng.randint(5, 12),
+                "explanation": None,
+            },
+            "scenario": {
+                "video_senaryosu": {
+                    "hook_cumlesi": f"{topic} sorusunu birlikte çözelim!",
+                    "adimlar": steps,
+                    "kapanis_cumlesi": "Teknokul ile başarıya!",
+                }
+            },
+            "durations": {
+                "hook": round(rng.uniform(2.0, 4.0), 2),
+                "steps": [round(rng.uniform(2.0, 6.0), 2) for _ in steps],
+                "kapanis": round(rng.uniform(2.0, 3.5), 2),
+            },
+        })
+    return corpus
+
+
+def all_content(item: dict) -> str:
+    """generate_smart_script'in detect_animations'a verdiği birleşik metin"""
+    video_data = item["scenario"]["video_senaryosu"]
+    return f"{item['question']['question_text']} {video_data['hook_cumlesi']} " + " ".join(
+        a["ekranda_gosterilecek_metin"] + " " + a["tts_metni"] for a in video_data["adimlar"]
+    )
+
+
+def build_cases(main) -> List[Tuple[str, Callable[[dict], object]]]:
+    """Ölçülecek (isim, korpus kaydı -> sonuç) çiftleri"""
+    from templates.smart_renderer import (
+        generate_smart_script, detect_animations, extract_math_expressions, extract_numbers
+    )
+    from templates.genel import generate_genel_script
+    from templates.matematik import (
+        generate_cebir_script, generate_geometri_script, generate_fonksiyon_script, generate_istatistik_script
+    )
+    from templates.fizik import generate_mekanik_script, generate_elektrik_script, generate_fizik_genel_script
+    from templates.kimya import generate_kimya_genel_script
+    from templates.biyoloji import generate_biyoloji_genel_script
+    from templates.dil import generate_turkce_genel_script
+    from prompts import get_full_prompt
+
+    generators = [
+        ("smart_script", generate_smart_script),
+        ("genel_script", generate_genel_script),
+        ("cebir_script", generate_cebir_script),
+        ("geometri_script", generate_geometri_script),
+        ("fonksiyon_script", generate_fonksiyon_script),
+        ("istatistik_script", generate_istatistik_script),
+        ("mekanik_script", generate_mekanik_script),
+        ("elektrik_script", generate_elektrik_script),
+        ("fizik_genel_script", generate_fizik_genel_script),
+        ("kimya_genel_script", generate_kimya_genel_script),
+        ("biyoloji_genel_script", generate_biyoloji_genel_script),
+        ("turkce_genel_script", generate_turkce_genel_script),
+    ]
+    cases = [
+        (name, lambda item, fn=fn: fn(item["scenario"], item["question"], item["durations"]))
+        for name, fn in generators
+    ]
+
+    def per_step(fn):
+        return lambda item: [fn(a["tts_metni"]) for a in item["scenario"]["video_senaryosu"]["adimlar"]]
+
+    def full_prompt(item):
+        q = item["question"]
+        return get_full_prompt(q["question_text"], q["options"], q["correct_answer"],
+                               q["subject_name"], q["topic_name"], q["grade"], q["explanation"])
+
+    cases += [
+        ("detect_animations", lambda item: detect_animations(item["_content"])),
+        ("detect_animations_steps", per_step(detect_animations)),
+        ("extract_math_expressions", lambda item: extract_math_expressions(item["_content"])),
+        ("extract_numbers", lambda item: extract_numbers(item["_content"])),
+        ("get_full_prompt", full_prompt),
+        ("add_outro_to_code", lambda item: main.add_outro_to_code(item["_script"])),
+    ]
+    return cases
+
+
+def _time_round(fn: Callable[[dict], object], corpus: List[dict]) -> float:
+    started = time.perf_counter()
+    for item in corpus:
+        fn(item)
+    return (time.perf_counter() - started) / len(corpus) * 1e6
+
+
+def measure(cases: List[Tuple[str, Callable[[dict], object]]], corpus: List[dict],
+            rounds: int) -> Dict[str, dict]:
+    """
+    Her ölçüm için korpusun tamamını rounds kez çalıştır; tur başına çağrı başına µs
+    - Turlar ölçümler arasında sırayla döner: makine hızındaki dalgalanma hepsine eşit dağılır
+    - İlk (ısınma) tur sayılmaz
+    - Ölçüm sırasında GC kapalı (timeit gibi)
+    """
+    for _, fn in cases:
+        for item in corpus:
+            fn(item)
+    samples: Dict[str, List[float]] = {name: [] for name, _ in cases}
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(rounds):
+            for name, fn in cases:
+                samples[name].append(_time_round(fn, corpus))
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return {
+        name: {
+            "min_us": round(min(values), 2),
+            "median_us": round(percentile(values, 0.50), 2),
+            "p90_us": round(percentile(values, 0.90), 2),
+        }
+        for name, values in samples.items()
+    }
+
+
+_CALIBRATION_PATTERN = re.compile(r"(\d+)\s*(cm|kg|m/s)")
+CALIBRATION = "_calibration"
+
+
+def calibration_workload(item: dict) -> int:
+    """Template/regex katmanına benzeyen sabit iş yükü (makine hız ölçüsü)"""
+    text = item["_content"]
+    words = {}
+    for word in text.lower().split():
+        words[word] = words.get(word, 0) + 1
+    script = "".join(f"Text(\"{w}\", font_size={n})\n" for w, n in words.items())
+    return len(script) + len(_CALIBRATION_PATTERN.findall(text))
+
+
+def load_thresholds(path: Path) -> dict:
+    if not path.exists():
+        return {"calibration_us": None, "min_us": {}}
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    return {"calibration_us": data.get("calibration_us"), "min_us": data.get("min_us", {})}
+
+
+def save_thresholds(path: Path, results: Dict[str, dict], calibration_us: float, corpus_size: int) -> None:
+    """
+    Ölçülenleri referanslara yaz
+    - --only ile ölçülmeyenler eski kalibrasyona göre ölçeklenip korunur
+    """
+    previous = load_thresholds(path)
+    scale = calibration_us / previous["calibration_us"] if previous["calibration_us"] else 1.0
+    baselines = {name: round(value * scale, 2) for name, value in previous["min_us"].items()}
+    baselines.update({name: r["min_us"] for name, r in results.items()})
+    data = {
+        "corpus": corpus_size,
+        "python": sys.version.split()[0],
+        "calibration_us": calibration_us,
+        "min_us": baselines,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+        f.write("\n")
+
+
+def scaled_baselines(thresholds: dict, calibration_us: float) -> Dict[str, float]:
+    """Referansları bu makinenin hızına ölçekle"""
+    reference = thresholds["calibration_us"]
+    scale = calibration_us / reference if reference else 1.0
+    return {name: value * scale for name, value in thresholds["min_us"].items()}
+
+
+def compare(results: Dict[str, dict], baselines: Dict[str, float], tolerance: float) -> List[str]:
+    """Referansın (1 + tolerance) katını aşan ölçümler"""
+    regressions = []
+    for name, r in results.items():
+        baseline = baselines.get(name)
+        if baseline and r["min_us"] > baseline * (1 + tolerance):
+            regressions.append(name)
+    return regressions
+
+
+def run_micro_benchmark(args) -> Tuple[Dict[str, dict], float]:
+    work_dir = Path(tempfile.mkdtemp(prefix="teknokul-micro-"))
+    configure_environment(work_dir)
+    sys.path.insert(0, str(BENCH_DIR.parent))
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            import main
+        # get_full_prompt varyasyonları random modülünü kullanır
+        random.seed(args.seed)
+
+        corpus = build_synthetic_corpus(args.size, args.seed)
+        from templates.smart_renderer import generate_smart_script
+        for item in corpus:
+            item["_content"] = all_content(item)
+            item["_script"] = generate_smart_script(item["scenario"], item["question"], item["durations"])
+
+        cases = [(CALIBRATION, calibration_workload)] + [
+            (name, fn) for name, fn in build_cases(main)
+            if not args.only or any(key in name for key in args.only)
+        ]
+        results = measure(cases, corpus, args.rounds)
+        calibration_us = results.pop(CALIBRATION)["min_us"]
+        return results, calibration_us
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Teknokul script üretimi / metin analizi mikro benchmark'ı")
+    parser.add_argument("--size", type=int, default=1000, help="Sentetik korpus büyüklüğü")
+    parser.add_argument("--rounds", type=int, default=7, help="Ölçüm turu sayısı (ısınma hariç)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--only", default="", type=lambda s: [x for x in s.split(",") if x],
+                        help="Sadece adı bunları içeren ölçümler (örn. detect,extract)")
+    parser.add_argument("--thresholds", default=str(THRESHOLDS_PATH))
+    parser.add_argument("--tolerance", type=float, default=0.5,
+                        help="Referansa göre izin verilen yavaşlama oranı (0.5 = %%50)")
+    parser.add_argument("--update-thresholds", action="store_true",
+                        help="Ölçümleri yeni referans olarak kaydet")
+    parser.add_argument("--json", default=None, help="Sonuçları JSON olarak bu dosyaya yaz")
+    return parser.parse_args(argv)
+
+
+def main_cli(argv=None) -> int:
+    args = parse_args(argv)
+    results, calibration_us = run_micro_benchmark(args)
+    thresholds_path = Path(args.thresholds)
+    baselines = scaled_baselines(load_thresholds(thresholds_path), calibration_us)
+
+    print(f"\n── Mikro benchmark (korpus: {args.size}, tur: {args.rounds}, kalibrasyon: {calibration_us:.2f} µs) ──")
+    print(f"{'ölçüm':<26} {'en iyi µs':>11} {'medyan µs':>11} {'p90 µs':>11} {'referans':>11}")
+    for name, r in results.items():
+        baseline = baselines.get(name)
+        ref = f"{baseline:.2f}" if baseline else "-"
+        print(f"{name:<26} {r['min_us']:>11.2f} {r['median_us']:>11.2f} {r['p90_us']:>11.2f} {ref:>11}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"calibration_us": calibration_us, "results": results}, f, ensure_ascii=False, indent=2)
+        print(f"📄 Rapor: {args.json}")
+
+    if args.update_thresholds:
+        save_thresholds(thresholds_path, results, calibration_us, args.size)
+        print(f"✅ Referanslar güncellendi: {thresholds_path}")
+        return 0
+
+    regressions = compare(results, baselines, args.tolerance)
+    if regressions:
+        print(f"❌ Yavaşlama (>%{args.tolerance * 100:.0f}): {', '.join(regressions)}")
+        return 1
+    print("✅ Eşikler içinde")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
@@ -0,0 +1,382 @@
+"""
+Teknokul Pipeline Benchmark
+⏱️ process_video'yu sabit bir soru korpusu üzerinde, dış servisler yerel sahtelerle
+değiştirilmiş halde çalıştırır ve raporlar:
+- Aşama / adım süreleri için p50, p90, p99, max
+- N eşzamanlı iş için throughput
+- Tepe RSS (servis süreci + manim/ffmpeg alt süreçleri)
+- Tepe geçici dizin disk kullanımı
+
+Manim ve ffmpeg gerçekten çalışır; Docker imajında (veya ikisinin kurulu olduğu
+bir ortamda) cloud-run dizininden çalıştırın:
+
+    python -m benchmarks.pipeline_bench --concurrency 1,2,4 --repeat 2
+
+ffmpeg / ffprobe / manim PATH'te yoksa başlamaz; başarısız iş varsa çıkış kodu 1
+(hatalı işlerin süreleri ölçümü anlamsız kılar, CI'da sessizce geçmemeli).
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import shutil
+import asyncio
+import argparse
+import tempfile
+import contextlib
+from pathlib import Path
+from typing import Dict, List
+
+from .stubs import StubLatency, StubUpstreams
+
+BENCH_DIR = Path(__file__).resolve().parent
+SUPABASE_HOST = "supabase.bench"
+TEKNOKUL_HOST = "teknokul.bench"
+
+
+def configure_environment(work_dir: Path) -> None:
+    """Servis adreslerini sahtelere, cache/temp dizinlerini work_dir'e yönlendir (main import'undan önce)"""
+    os.environ.update({
+        "SUPABASE_URL": f"http://{SUPABASE_HOST}",
+        "SUPABASE_SERVICE_KEY": "bench",
+        "GEMINI_API_KEY": "bench",
+        "ELEVENLABS_API_KEY": "bench",
+        "TEKNOKUL_API_BASE": f"http://{TEKNOKUL_HOST}",
+        "API_SECRET": "bench",
+        "CACHE_DIR": str(work_dir / "cache"),
+        "CACHE_BUCKET": "",
+        "ASSET_CACHE_DIR": str(work_dir / "cache" / "assets"),
+        "JOB_STORE_URL": f"sqlite:///{work_dir / 'jobs.db'}",
+    })
+    temp_root = work_dir / "tmp"
+    temp_root.mkdir(parents=True, exist_ok=True)
+    os.environ["TMPDIR"] = str(temp_root)
+    tempfile.tempdir = str(temp_root)
+
+
+def percentile(values: List[float], p: float) -> float:
+    """Doğrusal interpolasyonlu yüzdelik"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * p
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    return {
+        "count": len(values),
+        "p50": round(percentile(values, 0.50), 3),
+        "p90": round(percentile(values, 0.90), 3),
+        "p99": round(percentile(values, 0.99), 3),
+        "max": round(max(values), 3) if values else 0.0,
+    }
+
+
+# ============================================================
+# KAYNAK ÖRNEKLEYİCİ
+# ============================================================
+
+def _read_rss_kb(pid: str) -> int:
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+def _descendants(root_pid: int) -> List[str]:
+    children: Dict[str, List[str]] = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # pid (comm) state ppid ... - comm boşluk içerebilir
+                ppid = f.read().rsplit(")", 1)[1].split()[1]
+        except (OSError, IndexError):
+            continue
+        children.setdefault(ppid, []).append(entry)
+
+    found, stack = [], [str(root_pid)]
+    while stack:
+        for child in children.get(stack.pop(), []):
+            found.append(child)
+            stack.append(child)
+    return found
+
+
+def _dir_size(path: Path) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                pass
+    return total
+
+
+class ResourceSampler:
+    """Periyodik olarak RSS ve geçici dizin boyutunu örnekler, tepe değerleri tutar"""
+
+    def __init__(self, temp_root: Path, interval: float = 0.25):
+        self.temp_root = temp_root
+        self.interval = interval
+        self.reset()
+
+    def reset(self) -> None:
+        self.peak_self_kb = 0
+        self.peak_children_kb = 0
+        self.peak_temp_bytes = 0
+
+    def sample(self) -> None:
+        pid = os.getpid()
+        self.peak_self_kb = max(self.peak_self_kb, _read_rss_kb(str(pid)))
+        if os.path.isdir("/proc"):
+            children = sum(_read_rss_kb(p) for p in _descendants(pid))
+            self.peak_children_kb = max(self.peak_children_kb, children)
+        self.peak_temp_bytes = max(self.peak_temp_bytes, _dir_size(self.temp_root))
+
+    async def run(self) -> None:
+        while True:
+            await asyncio.to_thread(self.sample)
+            await asyncio.sleep(self.interval)
+
+
+# ============================================================
+# BENCHMARK
+# ============================================================
+
+async def make_audio_fixture(run_process, path: Path, seconds: float) -> bytes:
+    """Sahte TTS / müzik için ffmpeg ile sinüs MP3 üret"""
+    try:
+        result = await run_process(
+            ["ffmpeg", "-y", "-f", "lavfi", "-i", f"sine=frequency=440:duration={seconds}",
+             "-c:a", "libmp3lame", "-b:a", "64k", path],
+            timeout=60, step="bench fixture"
+        )
+        if result.ok:
+            return path.read_bytes()
+    except OSError:
+        pass
+    print(f"⚠️ ffmpeg yok, {path.name} boş kullanılacak (ffmpeg/manim adımları başarısız olur)", file=sys.stderr)
+    return b""
+
+
+def load_corpus(path: Path, subjects: List[str]) -> List[dict]:
+    with open(path, "r", encoding="utf-8") as f:
+        corpus = json.load(f)
+    if subjects:
+        corpus = [item for item in corpus if item["subject_name"] in subjects]
+    return corpus
+
+
+async def run_level(main, corpus: List[dict], concurrency: int, repeat: int,
+                    sampler: ResourceSampler, verbose: bool, profile: str = "standard") -> dict:
+    """Korpusu repeat kez, en fazla concurrency eşzamanlı işle çalıştır"""
+    requests = [
+        main.VideoRequest(**{
+            **{k: v for k, v in item.items() if k != "steps"},
+            "question_id": f"{item['question_id']}-c{concurrency}-r{r}",
+            "render_profile": profile
+        })
+        for r in range(repeat) for item in corpus
+    ]
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(request):
+        async with semaphore:
+            return await main.process_video(request)
+
+    sampler.reset()
+    sampler_task = asyncio.create_task(sampler.run())
+    started = time.monotonic()
+    sink = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+    try:
+        with sink:
+            results = await asyncio.gather(*[one(r) for r in requests])
+    finally:
+        wall = time.monotonic() - started
+        sampler_task.cancel()
+        await asyncio.gather(sampler_task, return_exceptions=True)
+        sampler.sample()
+
+    stages: Dict[str, List[float]] = {}
+    steps: Dict[str, List[float]] = {}
+    for result in results:
+        for name, timing in (result.get("stages") or {}).items():
+            stages.setdefault(name, []).append(timing["duration"])
+        for step in result.get("timings") or []:
+            steps.setdefault(step["step"], []).append(step["seconds"])
+
+    succeeded = sum(1 for r in results if r.get("success"))
+    return {
+        "concurrency": concurrency,
+        "jobs": len(results),
+        "succeeded": succeeded,
+        "errors": sorted({r["error"] for r in results if r.get("error")}),
+        "wall_seconds": round(wall, 3),
+        "jobs_per_minute": round(len(results) / wall * 60, 2) if wall else 0.0,
+        "job_seconds": summarize([r["duration"] for r in results]),
+        "stages": {name: summarize(v) for name, v in sorted(stages.items())},
+        "steps": {name: summarize(v) for name, v in sorted(steps.items())},
+        "peak_rss_mb": round(sampler.peak_self_kb / 1024, 1),
+        "peak_child_rss_mb": round(sampler.peak_children_kb / 1024, 1),
+        "peak_temp_mb": round(sampler.peak_temp_bytes / (1024 * 1024), 1),
+    }
+
+
+def print_level(report: dict) -> None:
+    print(f"\n=== Eşzamanlılık {report['concurrency']}: {report['succeeded']}/{report['jobs']} başarılı, "
+          f"{report['wall_seconds']}s, {report['jobs_per_minute']} iş/dk ===")
+    print(f"Tepe RSS: servis {report['peak_rss_mb']} MB, alt süreçler {report['peak_child_rss_mb']} MB | "
+          f"tepe geçici disk: {report['peak_temp_mb']} MB")
+    for error in report["errors"]:
+        print(f"  ⚠️ {error}")
+
+    print(f"{'':28}{'adet':>6}{'p50':>9}{'p90':>9}{'p99':>9}{'max':>9}")
+    rows = [("iş", report["job_seconds"])]
+    rows += [(f"aşama:{name}", s) for name, s in report["stages"].items()]
+    rows += [(f"adım:{name}", s) for name, s in report["steps"].items()]
+    for name, s in rows:
+        print(f"{name[:28]:28}{s['count']:>6}{s['p50']:>9}{s['p90']:>9}{s['p99']:>9}{s['max']:>9}")
+
+
+def clear_result_caches(cache_dir: Path) -> None:
+    """TTS ve render cache'ini boşalt (soğuk ölçüm); müzik ve outro sıcak kalır"""
+    for name in ("tts", "render"):
+        shutil.rmtree(cache_dir / name, ignore_errors=True)
+        (cache_dir / name).mkdir(parents=True, exist_ok=True)
+
+
+async def run_benchmark(args) -> dict:
+    work_dir = Path(args.work_dir or tempfile.mkdtemp(prefix="teknokul-bench-"))
+    configure_environment(work_dir)
+
+    # Ortam ayarlandıktan sonra import: modüller env'i import anında okur
+    sys.path.insert(0, str(BENCH_DIR.parent))
+    import main
+    from pipeline import http_clients, run_process
+
+    corpus = load_corpus(Path(args.corpus), args.subjects)
+    fixtures = work_dir / "fixtures"
+    fixtures.mkdir(exist_ok=True)
+    stub = StubUpstreams(
+        corpus,
+        tts_audio=await make_audio_fixture(run_process, fixtures / "tts.mp3", 2.0),
+        music_audio=await make_audio_fixture(run_process, fixtures / "music.mp3", 90.0),
+        supabase_host=SUPABASE_HOST,
+        teknokul_host=TEKNOKUL_HOST,
+        latency=StubLatency(
+            gemini_flash=args.gemini_flash_latency,
+            gemini_pro=args.gemini_pro_latency,
+            tts=args.tts_latency,
+            storage=args.storage_latency,
+            gemini_tail_rate=args.gemini_tail_rate,
+            gemini_tail_factor=args.gemini_tail_factor,
+        ),
+        code_failure_rate=args.code_failure_rate,
+        seed=args.seed,
+    )
+    await http_clients.use_transport(stub.transport())
+
+    # Üretimde startup'ta yapılan ısınma: müzik asset'leri ve outro klibi
+    with contextlib.redirect_stdout(io.StringIO()):
+        await main.ASSET_CACHE.prefetch(main.get_prefetch_paths())
+        if main.OUTRO_MODE == "clip":
+            profile = main.get_render_profile(args.profile)
+            await main.OUTRO_CLIPS.get(profile.width, profile.height, profile.fps)
+
+    sampler = ResourceSampler(work_dir / "tmp")
+    levels = []
+    for concurrency in args.concurrency:
+        if not args.warm:
+            clear_result_caches(work_dir / "cache")
+        report = await run_level(main, corpus, concurrency, args.repeat, sampler, args.verbose, args.profile)
+        print_level(report)
+        levels.append(report)
+
+    await http_clients.aclose()
+    summary = {
+        "corpus": len(corpus),
+        "repeat": args.repeat,
+        "render_profile": args.profile,
+        "warm_caches": args.warm,
+        "latency": vars(stub.latency),
+        "upstream_requests": dict(stub.requests),
+        "bytes_uploaded": stub.bytes_received,
+        "gemini_prompt_chars": stub.gemini_prompt_chars,
+        "levels": levels,
+    }
+    if not args.keep:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return summary
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Teknokul video pipeline benchmark (sahte dış servislerle)")
+    parser.add_argument("--concurrency", default="1,2,4",
+                        type=lambda s: [int(x) for x in s.split(",") if x],
+                        help="Virgülle ayrılmış eşzamanlı iş sayıları (varsayılan: 1,2,4)")
+    parser.add_argument("--repeat", type=int, default=1, help="Korpusun her seviyede kaç kez çalışacağı")
+    parser.add_argument("--corpus", default=str(BENCH_DIR / "corpus.json"))
+    parser.add_argument("--subjects", default="", type=lambda s: [x for x in s.split(",") if x],
+                        help="Sadece bu dersler (örn. Matematik,Fizik)")
+    parser.add_argument("--gemini-flash-latency", type=float, default=StubLatency.gemini_flash)
+    parser.add_argument("--gemini-pro-latency", type=float, default=StubLatency.gemini_pro)
+    parser.add_argument("--tts-latency", type=float, default=StubLatency.tts)
+    parser.add_argument("--storage-latency", type=float, default=StubLatency.storage)
+    parser.add_argument("--gemini-tail-rate", type=float, default=0.0,
+                        help="Gemini isteklerinin yavaş (kuyruk) dönme oranı (hedging etkisini ölçmek için)")
+    parser.add_argument("--gemini-tail-factor", type=float, default=StubLatency.gemini_tail_factor)
+    parser.add_argument("--code-failure-rate", type=float, default=0.0,
+                        help="Gemini Pro'nun hata döndürme oranı (fallback yolunu ölçmek için)")
+    parser.add_argument("--profile", default="standard", choices=["draft", "standard", "final"],
+                        help="İşlerin render profili (profil başına maliyeti ölçmek için)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--warm", action="store_true", help="Seviyeler arasında TTS/render cache'ini temizleme")
+    parser.add_argument("--work-dir", default=None, help="Cache/temp dizini (varsayılan: geçici)")
+    parser.add_argument("--keep", action="store_true", help="Bitince work-dir'i silme")
+    parser.add_argument("--json", default=None, help="Raporu JSON olarak bu dosyaya yaz")
+    parser.add_argument("--verbose", action="store_true", help="Pipeline loglarını göster")
+    parser.add_argument("--allow-missing-tools", action="store_true",
+                        help="ffmpeg/manim yoksa da çalıştır (yalnızca benchmark düzeneğini denemek için)")
+    return parser.parse_args(argv)
+
+
+REQUIRED_TOOLS = ("ffmpeg", "ffprobe", "manim")
+
+
+def main_cli(argv=None) -> int:
+    args = parse_args(argv)
+    missing = [tool for tool in REQUIRED_TOOLS if shutil.which(tool) is None]
+    if missing and not args.allow_missing_tools:
+        print(f"❌ PATH'te bulunamadı: {', '.join(missing)} — benchmark'ı Docker imajında çalıştırın "
+              f"(düzeneği denemek için --allow-missing-tools)", file=sys.stderr)
+        return 2
+
+    summary = asyncio.run(run_benchmark(args))
+    print(f"\nUpstream istekleri: {summary['upstream_requests']} | "
+          f"yüklenen: {summary['bytes_uploaded'] / (1024 * 1024):.1f} MB")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+        print(f"📄 Rapor: {args.json}")
+
+    failed = sum(level["jobs"] - level["succeeded"] for level in summary["levels"])
+    if failed:
+        print(f"❌ {failed} iş başarısız oldu, ölçümler geçersiz", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
@@ -0,0 +1,219 @@
+"""
+Teknokul Benchmark Sahte Servisleri
+🧪 httpx.MockTransport üzerinden tüm upstream'lere yanıt veren yerel sahteler
+- Gemini: korpustaki sorudan üretilen hazır senaryo ve Manim kodu (streamGenerateContent: SSE parçaları),
+  cachedContents kayıtları (gönderilen prompt karakterleri sayılır)
+- ElevenLabs: hazır MP3
+- Supabase: müzik asset'leri + upload/DB için yerel çöp kutusu (byte sayılır)
+- Teknokul API: YouTube upload yanıtı
+Her upstream'e ayarlanabilir gecikme eklenir
+"""
+
+import json
+import uuid
+import random
+import asyncio
+from collections import Counter
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, List, Optional
+
+import httpx
+
+
+@dataclass
+class StubLatency:
+    """Upstream başına yapay gecikme (saniye)"""
+    gemini_flash: float = 1.5
+    gemini_pro: float = 8.0
+    tts: float = 0.6
+    storage: float = 0.05
+    teknokul: float = 0.2
+    # Gemini kuyruk gecikmesi: isteklerin bu oranı tail_factor kat yavaş döner (hedging ölçümü)
+    gemini_tail_rate: float = 0.0
+    gemini_tail_factor: float = 5.0
+
+
+def build_scenario(item: dict) -> dict:
+    """Korpus kaydından Gemini Flash senaryosu"""
+    return {
+        "video_senaryosu": {
+            "hook_cumlesi": f"{item['topic_name']} sorusunu birlikte çözelim!",
+            "adimlar": [
+                {"adim_no": i + 1, "tts_metni": text, "ekranda_gosterilecek_metin": text[:40],
+                 "vurgu_rengi": "YELLOW"}
+                for i, text in enumerate(item["steps"])
+            ],
+            "kapanis_cumlesi": "Teknokul ile başarıya!"
+        }
+    }
+
+
+def build_manim_code(item: dict) -> str:
+    """Korpus kaydından Gemini Pro'nun döndürdüğü türden kısa bir VideoScene"""
+    step_lines = "\n".join(
+        f"        step = Text({json.dumps(text[:40], ensure_ascii=False)}, font_size=30).next_to(title, DOWN, buff=1)\n"
+        f"        self.play(FadeIn(step), run_time=0.5)\n"
+        f"        self.wait(1.5)\n"
+        f"        self.play(FadeOut(step), run_time=0.3)"
+        for text in item["steps"]
+    )
+    return f'''from manim import *
+
+class VideoScene(Scene):
+    def construct(self):
+        title = Text({json.dumps(item["topic_name"], ensure_ascii=False)}, font_size=48).to_edge(UP)
+        self.play(Write(title), run_time=1)
+{step_lines}
+        answer = Text("Cevap: {item["correct_answer"]}", font_size=56, color=GREEN)
+        self.play(GrowFromCenter(answer), run_time=0.6)
+        self.wait(1)
+'''
+
+
+# Gemini Pro kod bloğundan sonra açıklama yazar; akış modunda bu kısım beklenmez
+CODE_EXPLANATION = (
+    "\n\nBu kodda soru adım adım canlandırılır: önce başlık, sonra her çözüm adımı "
+    "ekrana gelir ve doğru cevap vurgulanır. " * 8
+)
+
+
+class StubUpstreams:
+    """Tüm dış servisleri taklit eden tek handler"""
+
+    def __init__(self, corpus: List[dict], tts_audio: bytes, music_audio: bytes,
+                 supabase_host: str, teknokul_host: str,
+                 latency: Optional[StubLatency] = None,
+                 code_failure_rate: float = 0.0, seed: int = 0):
+        self.corpus = corpus
+        self.tts_audio = tts_audio
+        self.music_audio = music_audio
+        self.supabase_host = supabase_host
+        self.teknokul_host = teknokul_host
+        self.latency = latency or StubLatency()
+        self.code_failure_rate = code_failure_rate
+        self.requests: Counter = Counter()
+        self.bytes_received = 0
+        self.gemini_prompt_chars = 0
+        self._cached_contents: Dict[str, dict] = {}
+        self._random = random.Random(seed)
+        self._uploads: Dict[str, int] = {}
+
+    def transport(self) -> httpx.MockTransport:
+        return httpx.MockTransport(self.handle)
+
+    def _find_item(self, prompt: str) -> dict:
+        for item in self.corpus:
+            if item["question_text"] in prompt:
+                return item
+        return self.corpus[0]
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        if host == "generativelanguage.googleapis.com":
+            return await self._gemini(request)
+        if host == "api.elevenlabs.io":
+            self.requests["elevenlabs"] += 1
+            await asyncio.sleep(self.latency.tts)
+            return httpx.Response(200, content=self.tts_audio, headers={"Content-Type": "audio/mpeg"})
+        if host == self.supabase_host:
+            return await self._supabase(request)
+        if host == self.teknokul_host:
+            self.requests["teknokul"] += 1
+            self.bytes_received += len(request.content)
+            await asyncio.sleep(self.latency.teknokul)
+            return httpx.Response(200, json={"videoUrl": "https://youtu.be/benchmark"})
+
+        self.requests["other"] += 1
+        return httpx.Response(200, json={})
+
+    def _cached_content(self, request: httpx.Request) -> httpx.Response:
+        if request.method == "GET":
+            return httpx.Response(200, json={"cachedContents": list(self._cached_contents.values())})
+        self.requests["gemini_cache_create"] += 1
+        body = json.loads(request.content)
+        self.gemini_prompt_chars += len(body["contents"][0]["parts"][0]["text"])
+        name = f"cachedContents/stub-{len(self._cached_contents)}"
+        self._cached_contents[name] = {
+            "name": name, "model": body["model"], "displayName": body.get("displayName", ""),
+            "expireTime": "2099-01-01T00:00:00Z",
+        }
+        return httpx.Response(200, json=self._cached_contents[name])
+
+    async def _gemini(self, request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/cachedContents"):
+            return self._cached_content(request)
+        body = json.loads(request.content)
+        prompt = body["contents"][0]["parts"][0]["text"]
+        self.gemini_prompt_chars += len(prompt)
+        if "cachedContent" in body:
+            if body["cachedContent"] not in self._cached_contents:
+                return httpx.Response(404, text="stub: cached content not found")
+            self.requests["gemini_cached_calls"] += 1
+        item = self._find_item(prompt)
+        slow = 1.0
+        if self.latency.gemini_tail_rate and self._random.random() < self.latency.gemini_tail_rate:
+            slow = self.latency.gemini_tail_factor
+            self.requests["gemini_tail"] += 1
+
+        if "flash" in request.url.path:
+            self.requests["gemini_flash"] += 1
+            await asyncio.sleep(self.latency.gemini_flash * slow)
+            text = "```json\n" + json.dumps(build_scenario(item), ensure_ascii=False) + "\n```"
+        else:
+            self.requests["gemini_pro"] += 1
+            text = "```python\n" + build_manim_code(item) + "```" + CODE_EXPLANATION
+            if request.url.path.endswith(":streamGenerateContent"):
+                if self._random.random() < self.code_failure_rate:
+                    await asyncio.sleep(self.latency.gemini_pro * 0.15)
+                    return httpx.Response(503, text="stub: overloaded")
+                return httpx.Response(200, content=self._sse(text, self.latency.gemini_pro * slow),
+                                      headers={"Content-Type": "text/event-stream"})
+            await asyncio.sleep(self.latency.gemini_pro * slow)
+            if self._random.random() < self.code_failure_rate:
+                return httpx.Response(503, text="stub: overloaded")
+
+        return httpx.Response(200, json={"candidates": [{"content": {"parts": [{"text": text}]}}]})
+
+    @staticmethod
+    async def _sse(text: str, total: float, chunk_size: int = 400) -> AsyncIterator[bytes]:
+        """Toplam süreyi ilk token gecikmesi + parça başına eşit paylarla dağıtarak SSE olayları üret"""
+        first_token = total * 0.15
+        await asyncio.sleep(first_token)
+        chunks = [text[i:i + chunk_size] for i in range(0, len(text), chunk_size)]
+        per_chunk = (total - first_token) / max(1, len(chunks))
+        for chunk in chunks:
+            event = {"candidates": [{"content": {"role": "model", "parts": [{"text": chunk}]}}]}
+            yield f"data: {json.dumps(event, ensure_ascii=False)}\r\n\r\n".encode("utf-8")
+            await asyncio.sleep(per_chunk)
+
+    async def _supabase(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        self.requests["supabase"] += 1
+        await asyncio.sleep(self.latency.storage)
+
+        if path.startswith("/storage/v1/object/public/assets/"):
+            if request.headers.get("if-none-match") == '"bench"':
+                return httpx.Response(304)
+            return httpx.Response(200, content=self.music_audio, headers={"ETag": '"bench"'})
+
+        if path == "/storage/v1/upload/resumable" and request.method == "POST":
+            upload_id = uuid.uuid4().hex
+            self._uploads[upload_id] = 0
+            return httpx.Response(201, headers={"Location": f"/storage/v1/upload/resumable/{upload_id}"})
+
+        if path.startswith("/storage/v1/upload/resumable/"):
+            upload_id = path.rsplit("/", 1)[-1]
+            if request.method == "PATCH":
+                self._uploads[upload_id] = self._uploads.get(upload_id, 0) + len(request.content)
+                self.bytes_received += len(request.content)
+                return httpx.Response(204, headers={"Upload-Offset": str(self._uploads[upload_id])})
+            return httpx.Response(200, headers={"Upload-Offset": str(self._uploads.get(upload_id, 0))})
+
+        if path.startswith("/rest/v1/"):
+            return httpx.Response(204)
+
+        # Storage cache katmanı: okuma ıska, yazma kabul
+        if request.method == "GET":
+            return httpx.Response(404)
+        self.bytes_received += len(request.content)
+        return httpx.Response(200, json={})
@@ -0,0 +1,16 @@
+"""
+Teknokul Cache Modülü
+İçerik adresli, katmanlı (disk + Supabase Storage) önbellekler
+"""
+
+from .disk import DiskCache, link_or_copy
+from .storage import SupabaseStorageTier
+from .tiered import TieredCache, content_key
+
+__all__ = [
+    "DiskCache",
+    "SupabaseStorageTier",
+    "TieredCache",
+    "content_key",
+    "link_or_copy",
+]
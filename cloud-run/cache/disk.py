@@ -0,0 +1,112 @@
+"""
+Teknokul Disk Cache
+💾 İçerik adresli, boyut sınırlı (LRU) yerel dosya önbelleği
+"""
+
+import os
+import json
+import shutil
+import threading
+from pathlib import Path
+from typing import Optional, Tuple
+
+
+def link_or_copy(src: Path, dest: Path) -> None:
+    """Dosyayı hardlink ile bağla, farklı dosya sistemindeyse kopyala"""
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    if dest.exists():
+        dest.unlink()
+    try:
+        os.link(src, dest)
+    except OSError:
+        shutil.copyfile(src, dest)
+
+
+class DiskCache:
+    """
+    Yerel dosya önbelleği
+    - Her kayıt: veri dosyası + meta JSON
+    - Erişilen kayıtların mtime'ı güncellenir (LRU sırası)
+    - Toplam boyut max_bytes'ı aşınca en eski kayıtlar silinir
+    """
+
+    def __init__(self, root: Path, max_bytes: int, suffix: str = ".bin"):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _paths(self, key: str) -> Tuple[Path, Path]:
+        shard = self.root / key[:2]
+        return shard / f"{key}{self.suffix}", shard / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Tuple[Path, dict]]:
+        """Kayıt varsa (veri yolu, meta) döndür"""
+        data_path, meta_path = self._paths(key)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            if not data_path.exists():
+                raise FileNotFoundError(data_path)
+            os.utime(data_path)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return data_path, meta
+
+    def put(self, key: str, src: Path, meta: dict) -> Path:
+        """Dosyayı önbelleğe al (atomik yazım), gerekirse eski kayıtları sil"""
+        data_path, meta_path = self._paths(key)
+        data_path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Geçici ad süreç + thread başına: aynı anahtara eşzamanlı yazımlar (to_thread) çakışmaz
+        suffix = f"{os.getpid()}.{threading.get_ident()}.tmp"
+        tmp_data = data_path.with_name(f".{data_path.name}.{suffix}")
+        tmp_meta = meta_path.with_name(f".{meta_path.name}.{suffix}")
+        shutil.copyfile(src, tmp_data)
+        with open(tmp_meta, "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(tmp_data, data_path)
+        os.replace(tmp_meta, meta_path)
+
+        self.evict()
+        return data_path
+
+    def evict(self) -> int:
+        """Boyut sınırı aşıldıysa en eski kayıtları sil, silinen kayıt sayısını döndür"""
+        with self._lock:
+            entries = []
+            total = 0
+            for data_path in self.root.glob(f"*/*{self.suffix}"):
+                try:
+                    stat = data_path.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, data_path))
+                total += stat.st_size
+
+            removed = 0
+            for _, size, data_path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    data_path.unlink()
+                    data_path.with_name(data_path.name[:-len(self.suffix)] + ".json").unlink(missing_ok=True)
+                except OSError:
+                    continue
+                total -= size
+                removed += 1
+            return removed
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+        }
@@ -0,0 +1,118 @@
+"""
+Teknokul Supabase Storage Cache Katmanı
+☁️ Instance'lar arası paylaşılan önbellek (yeni instance'lar da faydalanır)
+"""
+
+import os
+import json
+import asyncio
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+from pipeline.http import get_client
+from pipeline.upload import iter_file
+
+SUPABASE_URL = os.getenv("SUPABASE_URL", "")
+SUPABASE_SERVICE_KEY = os.getenv("SUPABASE_SERVICE_KEY", "")
+
+
+class SupabaseStorageTier:
+    """
+    Supabase Storage üzerinde önbellek
+    - {prefix}/{key}{suffix}: veri
+    - {prefix}/{key}.json: meta
+    """
+
+    def __init__(self, bucket: str, prefix: str, suffix: str = ".bin",
+                 content_type: str = "application/octet-stream"):
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+        self.suffix = suffix
+        self.content_type = content_type
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(SUPABASE_URL and SUPABASE_SERVICE_KEY and self.bucket)
+
+    def _url(self, name: str) -> str:
+        return f"{SUPABASE_URL}/storage/v1/object/{self.bucket}/{self.prefix}/{name}"
+
+    def _headers(self, content_type: str = None) -> dict:
+        headers = {"Authorization": f"Bearer {SUPABASE_SERVICE_KEY}"}
+        if content_type:
+            headers["Content-Type"] = content_type
+            headers["x-upsert"] = "true"
+        return headers
+
+    async def get(self, key: str, dest: Path) -> Optional[dict]:
+        """
+        Kayıt varsa dest'e indir ve meta döndür
+        - Veri belleğe alınmadan dest'in dizinindeki geçici dosyaya akıtılır, tamamlanınca yerine taşınır
+          (yarım indirme dest'te görünmez)
+        """
+        if not self.enabled:
+            return None
+
+        try:
+            client = get_client("supabase")
+            meta_resp = await client.get(self._url(f"{key}.json"), headers=self._headers(), timeout=15)
+            if meta_resp.status_code != 200:
+                self.misses += 1
+                return None
+
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            async with client.stream("GET", self._url(f"{key}{self.suffix}"),
+                                     headers=self._headers(), timeout=60) as data_resp:
+                if data_resp.status_code != 200:
+                    self.misses += 1
+                    return None
+
+                fd, tmp_name = tempfile.mkstemp(dir=dest.parent, prefix=f".{dest.name}.", suffix=".tmp")
+                try:
+                    with os.fdopen(fd, "wb") as f:
+                        async for chunk in data_resp.aiter_bytes(256 * 1024):
+                            await asyncio.to_thread(f.write, chunk)
+                    os.replace(tmp_name, dest)
+                except BaseException:
+                    os.unlink(tmp_name)
+                    raise
+
+            self.hits += 1
+            return meta_resp.json()
+
+        except Exception as e:
+            print(f"⚠️ Storage cache okuma hatası: {e}")
+            self.misses += 1
+            return None
+
+    async def put(self, key: str, src: Path, meta: dict) -> bool:
+        """Kaydı Storage'a yükle (önce veri, sonra meta)"""
+        if not self.enabled:
+            return False
+
+        try:
+            client = get_client("supabase")
+            data_resp = await client.post(
+                self._url(f"{key}{self.suffix}"),
+                headers={**self._headers(self.content_type), "Content-Length": str(src.stat().st_size)},
+                content=iter_file(src),
+                timeout=120
+            )
+            if data_resp.status_code not in [200, 201]:
+                print(f"⚠️ Storage cache yazma hatası: {data_resp.status_code}")
+                return False
+
+            meta_resp = await client.post(
+                self._url(f"{key}.json"),
+                headers=self._headers("application/json"),
+                content=json.dumps(meta, ensure_ascii=False).encode("utf-8"),
+                timeout=15
+            )
+            return meta_resp.status_code in [200, 201]
+
+        except Exception as e:
+            print(f"⚠️ Storage cache yazma hatası: {e}")
+            return False
@@ -0,0 +1,87 @@
+"""
+Teknokul Katmanlı Cache
+💾 Disk (sıcak instance) → ☁️ Supabase Storage (yeni instance) sırasıyla arar
+- Disk işlemleri (meta okuma, kopya / hardlink, atomik yazım) thread'de: event loop bloklanmaz
+"""
+
+import json
+import asyncio
+import hashlib
+from pathlib import Path
+from typing import Optional
+
+from .disk import DiskCache, link_or_copy
+from .storage import SupabaseStorageTier
+
+
+def content_key(*parts) -> str:
+    """Parçaların kanonik JSON'undan sha256 anahtarı üret"""
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class TieredCache:
+    """Disk + opsiyonel Storage katmanlı önbellek"""
+
+    def __init__(self, disk: DiskCache, remote: Optional[SupabaseStorageTier] = None):
+        self.disk = disk
+        self.remote = remote
+        self.hits = 0
+        self.misses = 0
+        self._uploads = set()
+
+    async def get(self, key: str, dest: Path) -> Optional[dict]:
+        """
+        Kayıt varsa dest'e yerleştir ve meta döndür
+        - Storage'dan gelen kayıt disk katmanına da yazılır
+        """
+        meta = await asyncio.to_thread(self._get_disk, key, dest)
+        if meta is not None:
+            self.hits += 1
+            return meta
+
+        if self.remote:
+            meta = await self.remote.get(key, dest)
+            if meta is not None:
+                await asyncio.to_thread(self.disk.put, key, dest, meta)
+                self.hits += 1
+                return meta
+
+        self.misses += 1
+        return None
+
+    async def put(self, key: str, src: Path, meta: dict, remote: bool = True) -> None:
+        """
+        Kaydı disk katmanına yaz
+        - Storage yüklemesi arka planda, disk kopyasından yapılır (pipeline beklemez)
+        """
+        try:
+            cached_path = await asyncio.to_thread(self.disk.put, key, src, meta)
+        except OSError as e:
+            print(f"⚠️ Disk cache yazma hatası: {e}")
+            cached_path = src
+
+        if remote and self.remote and self.remote.enabled:
+            task = asyncio.create_task(self.remote.put(key, cached_path, meta))
+            self._uploads.add(task)
+            task.add_done_callback(self._uploads.discard)
+
+    def _get_disk(self, key: str, dest: Path) -> Optional[dict]:
+        entry = self.disk.get(key)
+        if not entry:
+            return None
+        data_path, meta = entry
+        link_or_copy(data_path, dest)
+        return meta
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        stats = {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            "disk": self.disk.stats(),
+        }
+        if self.remote:
+            stats["remote"] = {"hits": self.remote.hits, "misses": self.remote.misses}
+        return stats
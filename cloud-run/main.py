@@ -13,28 +13,53 @@ Teknokul Video Factory - Cloud Run Service v8.0.0
 
 import os
 import json
+import asyncio
 import time
-import base64
 import tempfile
-import subprocess
+import uuid
 from pathlib import Path
 from datetime import datetime
-from typing import Optional
-
-from fastapi import FastAPI, HTTPException, BackgroundTasks, Header
-from fastapi.responses import JSONResponse
+from importlib import metadata
+from typing import List, Literal, Optional, Tuple
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from fastapi import FastAPI, HTTPException, Header
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, PlainTextResponse
 from pydantic import BaseModel
-import httpx
 
 # Yeni modüller
-from prompts import get_full_prompt, SUPER_MANIM_PROMPT
-from templates import get_outro_integration_code, generate_smart_script, detect_animations
+from prompts import get_full_prompt, build_system_prompt, SUPER_MANIM_PROMPT
+from templates import (
+    get_outro_integration_code, generate_smart_sections, detect_animations, SectionedScript, get_prewarm_script
+)
+from templates.routing import RoutingTable
 from audio.music_manager import (
     download_music, 
     get_music_type_for_subject, 
-    create_full_audio_mix,
+    get_music_info,
+    get_prefetch_paths,
+    resolve_music_path,
     MUSIC_CONFIG
 )
+from audio.asset_cache import ASSET_CACHE
+from audio.finishing import finish_video
+from pipeline import (
+    StageGraph, get_client, http_clients, run_process, probe_duration, upload_file_resumable,
+    multipart_file_body,
+)
+from pipeline.metrics import METRICS, STAGE_SECONDS, JOB_SECONDS, timed, record_step, start_job_steps
+from pipeline.gemini_stream import CodeStreamParser, iter_sse_text
+from pipeline.hedging import AttemptRejected, LatencyTracker, DeadlineBudget, hedged
+from pipeline.prompt_cache import GeminiPromptCache
+from pipeline.jobs import JobQueue, QueueFullError, create_job_store
+from cache import DiskCache, SupabaseStorageTier, TieredCache, content_key
+from video import (
+    OutroClipCache, concat_videos, trim_video,
+    RenderProfile, RENDER_PROFILES, get_render_profile, apply_render_profile, render_ladder,
+    ManimWorkerPool, WorkerStartError
+)
 
 app = FastAPI(
     title="Teknokul Video Factory",
@@ -53,6 +78,37 @@ ELEVENLABS_API_KEY = os.getenv("ELEVENLABS_API_KEY", "")
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
 SUPABASE_URL = os.getenv("SUPABASE_URL", "")
 SUPABASE_SERVICE_KEY = os.getenv("SUPABASE_SERVICE_KEY", "")
+TTS_CONCURRENCY = int(os.getenv("TTS_CONCURRENCY", "4"))
+CACHE_DIR = Path(os.getenv("CACHE_DIR", "/tmp/teknokul-cache"))
+CACHE_BUCKET = os.getenv("CACHE_BUCKET", "")  # Boşsa Storage cache katmanı kapalı
+TTS_CACHE_MAX_MB = int(os.getenv("TTS_CACHE_MAX_MB", "256"))
+RENDER_CACHE_MAX_MB = int(os.getenv("RENDER_CACHE_MAX_MB", "1024"))
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", str(os.cpu_count() or 2)))
+JOB_QUEUE_MAX = int(os.getenv("JOB_QUEUE_MAX", "20"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))  # instance'ı düşüren iş en fazla bu kadar denenir
+SYNC_WAIT_TIMEOUT = int(os.getenv("SYNC_WAIT_TIMEOUT", "900"))  # /generate-sync bekleme sınırı (sn)
+JOB_STORE_URL = os.getenv("JOB_STORE_URL", "sqlite:////tmp/teknokul-jobs/jobs.db")
+# Kuyruğa sığmayacak toplu istek kabul edilmez: en fazla JOB_QUEUE_MAX
+BATCH_MAX_ITEMS = min(int(os.getenv("BATCH_MAX_ITEMS", str(JOB_QUEUE_MAX))), JOB_QUEUE_MAX)
+YOUTUBE_TRANSFER_MODE = os.getenv("YOUTUBE_TRANSFER_MODE", "url")  # url: Storage URL, multipart: dosya akışı
+GEMINI_STREAMING = os.getenv("GEMINI_STREAMING", "true").lower() == "true"  # streamGenerateContent + erken doğrulama
+# Yedek istek: çağrı p90'ını aşınca (veya hızlı hata verince) ikinci kopya, ilk dönen kazanır
+GEMINI_HEDGING = os.getenv("GEMINI_HEDGING", "true").lower() == "true"
+GEMINI_HEDGE_MODEL_CODE = os.getenv("GEMINI_HEDGE_MODEL_CODE", GEMINI_MODEL_PRO)  # kod yedeği için model
+# Senaryo ve kod aşamaları paralel koşar: her birinin kendi süre bütçesi (yedek istek dahil)
+SCENARIO_DEADLINE_SECONDS = float(os.getenv("SCENARIO_DEADLINE_SECONDS", "60"))
+CODE_DEADLINE_SECONDS = float(os.getenv("CODE_DEADLINE_SECONDS", "180"))
+# Ders başına sabit prompt öneki Gemini context cache'e kaydedilip handle ile gönderilir
+GEMINI_PROMPT_CACHE = os.getenv("GEMINI_PROMPT_CACHE", "true").lower() == "true"
+GEMINI_PROMPT_CACHE_TTL = int(os.getenv("GEMINI_PROMPT_CACHE_TTL", "3600"))
+OUTRO_MODE = os.getenv("OUTRO_MODE", "clip")  # clip: önceden render edilmiş klip, inline: koda göm
+ROUTING_FILE = os.getenv("ROUTING_FILE", "")  # templates.routing çıktısı; boşsa render sırasında tespit
+# sectioned: fallback script'i bölüm bölüm paralel render edilir, single: tek sahne
+RENDER_MODE = os.getenv("RENDER_MODE", "sectioned" if (os.cpu_count() or 1) > 1 else "single")
+SECTION_WORKERS = int(os.getenv("SECTION_WORKERS", str(os.cpu_count() or 2)))
+MANIM_WORKERS = int(os.getenv("MANIM_WORKERS", str(SECTION_WORKERS)))  # 0: her render ayrı manim CLI süreci
+MANIM_WORKER_MAX_JOBS = int(os.getenv("MANIM_WORKER_MAX_JOBS", "20"))
+MANIM_WORKER_MAX_RSS_MB = int(os.getenv("MANIM_WORKER_MAX_RSS_MB", "1024"))
 
 
 class VideoRequest(BaseModel):
@@ -68,6 +124,12 @@ class VideoRequest(BaseModel):
     callback_url: Optional[str] = None
     include_music: Optional[bool] = True
     include_outro: Optional[bool] = True
+    # draft: önizleme 540x960 @15fps (yayınlanmaz), standard: 1080x1920 @30fps, final: + çözünürlük merdiveni
+    render_profile: Literal["draft", "standard", "final"] = "standard"
+
+
+class BatchRequest(BaseModel):
+    items: List[VideoRequest]
 
 
 class HealthResponse(BaseModel):
@@ -86,14 +148,20 @@ def log(message: str, level: str = "INFO"):
 # MANIM CONFIG HEADER
 # ============================================================
 
-CONFIG_HEADER = '''from manim import *
+# Varsayılan (standard) profil; istek bazında video/profiles.py'deki profil uygulanır
+DEFAULT_PROFILE = get_render_profile()
+VIDEO_WIDTH = DEFAULT_PROFILE.width
+VIDEO_HEIGHT = DEFAULT_PROFILE.height
+VIDEO_FPS = DEFAULT_PROFILE.fps
+
+CONFIG_HEADER = f'''from manim import *
 import numpy as np
 
 config.frame_width = 9
 config.frame_height = 16
-config.pixel_width = 1080
-config.pixel_height = 1920
-config.frame_rate = 30
+config.pixel_width = {VIDEO_WIDTH}
+config.pixel_height = {VIDEO_HEIGHT}
+config.frame_rate = {VIDEO_FPS}
 config.background_color = "#0f0f23"
 Text.set_default(font="Noto Sans")
 
@@ -104,8 +172,64 @@ Text.set_default(font="Noto Sans")
 # GEMİNİ 3 PRO İLE MANİM KODU ÜRET
 # ============================================================
 
-async def generate_manim_code_with_gemini_pro(question: VideoRequest, include_outro: bool = True) -> Optional[str]:
-    """Gemini 3 Pro ile doğrudan Manim kodu üret - Süper Prompt ile"""
+# Çağrı tipi başına gecikme takibi: yedek istek eşiği (p90)
+SCENARIO_LATENCY = LatencyTracker("gemini_scenario", default=20)
+CODE_LATENCY = LatencyTracker("gemini_code", default=90)
+
+
+# Sabit prompt öneki (SUPER_MANIM_PROMPT + ders ipuçları) → cachedContents handle
+PROMPT_CACHE = GeminiPromptCache(GEMINI_API_KEY, ttl=GEMINI_PROMPT_CACHE_TTL) if GEMINI_PROMPT_CACHE else None
+
+
+def build_code_request(system_prompt: str, user_prompt: str, model: str, subject_name: str) -> dict:
+    """
+    Kod isteği gövdesi
+    - Önek önbellekteyse handle + yalnızca değişken kısım (soru + varyasyonlar)
+    - Değilse önek inline; yine de en başta ve birebir aynı (Gemini'nin örtük önbelleği de yakalar)
+    """
+    generation_config = {"temperature": 0.3, "maxOutputTokens": 16000}
+    cached = PROMPT_CACHE.handle(model, system_prompt, subject_name) if PROMPT_CACHE else None
+    if cached:
+        return {
+            "cachedContent": cached,
+            "contents": [{"role": "user", "parts": [{"text": user_prompt}]}],
+            "generationConfig": generation_config
+        }
+    return {
+        "contents": [{"role": "user", "parts": [{"text": system_prompt + "\n\n" + user_prompt}]}],
+        "generationConfig": generation_config
+    }
+
+
+def forget_cached_prefix(request_body: dict, status_code: int) -> None:
+    """Gemini handle'ı reddettiyse (silinmiş / süresi dolmuş) bir sonraki deneme yeniden kaydeder"""
+    if PROMPT_CACHE and "cachedContent" in request_body and status_code in (400, 403, 404):
+        PROMPT_CACHE.invalidate(request_body["cachedContent"])
+
+
+async def warm_prompt_cache() -> None:
+    """Önceki instance'ların açtığı, hâlâ geçerli prompt önbellek kayıtlarını devral"""
+    adopted = await PROMPT_CACHE.load()
+    if adopted:
+        log(f"📦 {adopted} prompt önbellek kaydı devralındı")
+
+
+async def call_gemini(attempt, tracker: LatencyTracker, timeout: float):
+    """
+    attempt(index): 0 asıl istek, 1 yedek; GEMINI_HEDGING kapalıysa tek deneme
+    - Yalnızca bağlantı / HTTP hataları ve gecikme yedek başlatır; AttemptRejected (bozuk çıktı) başlatmaz
+    """
+    return await hedged(attempt, tracker, timeout, hedges=1 if GEMINI_HEDGING else 0)
+
+
+async def generate_manim_code_with_gemini_pro(question: VideoRequest, include_outro: bool = True,
+                                             system_prompt: Optional[str] = None,
+                                             budget: Optional[DeadlineBudget] = None) -> Optional[str]:
+    """
+    Gemini 3 Pro ile doğrudan Manim kodu üret - Süper Prompt ile
+    - system_prompt: toplu üretimde ders grubu için önceden hazırlanmış prompt
+    - budget: kod aşamasının süre bütçesi (CODE_DEADLINE_SECONDS); dolarsa None → smart renderer
+    """
     log(f"🚀 Gemini 3 Pro ile Manim kodu üretiliyor... (Ders: {question.subject_name})")
     
     # Süper prompt al
@@ -116,52 +240,156 @@ async def generate_manim_code_with_gemini_pro(question: VideoRequest, include_ou
         subject_name=question.subject_name or "Genel",
         topic_name=question.topic_name or "Genel",
         grade=question.grade or 8,
-        explanation=question.explanation
+        explanation=question.explanation,
+        system_prompt=system_prompt
     )
     
+    subject_name = question.subject_name or "Genel"
+    
+    async def attempt(index: int) -> Optional[str]:
+        model = GEMINI_MODEL_PRO if index == 0 else GEMINI_HEDGE_MODEL_CODE
+        request_body = build_code_request(system_prompt, user_prompt, model, subject_name)
+        if GEMINI_STREAMING:
+            return await stream_gemini_code(request_body, model)
+        return await request_gemini_code(request_body, model)
+    
+    timeout = budget.timeout(CODE_DEADLINE_SECONDS) if budget else CODE_DEADLINE_SECONDS
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"https://generativelanguage.googleapis.com/v1beta/models/{GEMINI_MODEL_PRO}:generateContent?key={GEMINI_API_KEY}",
-                json={
-                    "contents": [{"role": "user", "parts": [{"text": system_prompt + "\n\n" + user_prompt}]}],
-                    "generationConfig": {"temperature": 0.3, "maxOutputTokens": 16000}
-                },
-                timeout=180
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                text = data["candidates"][0]["content"]["parts"][0]["text"]
-                
-                # Python kodunu çıkar
-                code = text
-                if "```python" in text:
-                    code = text.split("```python")[1].split("```")[0]
-                elif "```" in text:
-                    code = text.split("```")[1].split("```")[0]
-                
-                code = code.strip()
-                
-                # Temel kontroller
-                if "class VideoScene" in code and "def construct" in code:
-                    log(f"✅ Gemini 3 Pro Manim kodu üretti ({len(code)} karakter)")
-                    
-                    # Outro ekle
-                    if include_outro:
-                        code = add_outro_to_code(code)
-                    
-                    return code
-                else:
-                    log("⚠️ Gemini kodu geçersiz format", "WARN")
-                    return None
-            else:
-                log(f"❌ Gemini 3 Pro hatası: {response.status_code} - {response.text[:300]}", "ERROR")
-                return None
-                
+        code = await call_gemini(attempt, CODE_LATENCY, timeout)
+    except asyncio.TimeoutError:
+        log(f"❌ Gemini 3 Pro timeout ({timeout:.0f} sn)", "ERROR")
+        return None
+    except AttemptRejected:
+        # Bozuk çıktı: yedek istek yapılmadı, doğrudan smart renderer
+        return None
     except Exception as e:
         log(f"❌ Gemini 3 Pro hatası: {e}", "ERROR")
         return None
+    
+    if code is None:
+        return None
+    code = code.strip()
+    
+    # Temel kontroller
+    if "class VideoScene" in code and "def construct" in code:
+        log(f"✅ Gemini 3 Pro Manim kodu üretti ({len(code)} karakter)")
+        
+        # Outro ekle
+        if include_outro:
+            code = add_outro_to_code(code)
+        
+        return code
+    else:
+        log("⚠️ Gemini kodu geçersiz format", "WARN")
+        return None
+
+
+async def request_gemini_code(request_body: dict, model: str = GEMINI_MODEL_PRO) -> Optional[str]:
+    """generateContent: yanıtın tamamı beklenir, kod bloğu sonra çıkarılır"""
+    client = get_client("gemini")
+    with timed("gemini_code") as timer:
+        response = await client.post(
+            f"https://generativelanguage.googleapis.com/v1beta/models/{model}:generateContent?key={GEMINI_API_KEY}",
+            json=request_body,
+            timeout=180
+        )
+        timer.ok = response.status_code == 200
+    
+    if response.status_code != 200:
+        log(f"❌ Gemini 3 Pro hatası: {response.status_code} - {response.text[:300]}", "ERROR")
+        forget_cached_prefix(request_body, response.status_code)
+        return None
+    
+    data = response.json()
+    text = data["candidates"][0]["content"]["parts"][0]["text"]
+    
+    # Python kodunu çıkar
+    code = text
+    if "```python" in text:
+        code = text.split("```python")[1].split("```")[0]
+    elif "```" in text:
+        code = text.split("```")[1].split("```")[0]
+    return code
+
+
+async def stream_gemini_code(request_body: dict, model: str = GEMINI_MODEL_PRO) -> Optional[str]:
+    """
+    streamGenerateContent (SSE): kod bloğu gelirken ayrıştırılır
+    - Kapanış ``` görülünce akış kapatılır, kod hemen döner (script / outro hazırlığı başlar)
+    - Çıktı bozuksa (kod bloğu yok, VideoScene yok, syntax hatası) akış kesilir, AttemptRejected → smart renderer
+      (yedek istek başlatılmaz); HTTP hatasında None → yedek istek
+    """
+    client = get_client("gemini")
+    parser = CodeStreamParser()
+    started = time.monotonic()
+    first_byte = False
+    
+    with timed("gemini_code") as timer:
+        async with client.stream(
+            "POST",
+            f"https://generativelanguage.googleapis.com/v1beta/models/{model}:streamGenerateContent?alt=sse&key={GEMINI_API_KEY}",
+            json=request_body,
+            timeout=180
+        ) as response:
+            if response.status_code != 200:
+                timer.ok = False
+                body = (await response.aread()).decode("utf-8", errors="replace")
+                log(f"❌ Gemini 3 Pro hatası: {response.status_code} - {body[:300]}", "ERROR")
+                forget_cached_prefix(request_body, response.status_code)
+                return None
+            
+            async for text in iter_sse_text(response):
+                parser.feed(text)
+                if not first_byte and parser.in_code:
+                    first_byte = True
+                    record_step("gemini_code_first_byte", time.monotonic() - started)
+                if parser.done or parser.error:
+                    break
+            parser.finish()
+        timer.ok = parser.error is None
+    
+    elapsed = time.monotonic() - started
+    if parser.error:
+        log(f"⚠️ Gemini kodu bozuk, akış {elapsed:.1f}s'de kesildi: {parser.error}", "WARN")
+        raise AttemptRejected(parser.error)
+    log(f"📡 Gemini kod bloğu tamamlandı ({elapsed:.1f}s, {len(parser.buffer)} karakter okundu)")
+    return parser.code
+
+
+# Önceden render edilmiş outro klipleri (çözünürlük, fps, stil versiyonu başına)
+OUTRO_CLIPS = OutroClipCache(CACHE_DIR / "outro")
+
+
+async def append_outro_clip(video_path: Path, temp_dir: Path, profile: RenderProfile = DEFAULT_PROFILE,
+                            max_duration: Optional[float] = None) -> Tuple[Path, float]:
+    """
+    Ana videonun arkasına cache'teki outro klibini ekle (stream copy, profil çözünürlüğünde)
+    - max_duration: bitirmedeki min(video, TTS) kırpması ana sahneye burada uygulanır, outro kesilmez
+    - (video, outro süresi) döndürür; outro eklenemediyse süre 0
+    """
+    outro_clip = await OUTRO_CLIPS.get(profile.width, profile.height, profile.fps)
+    if not outro_clip:
+        log("⚠️ Outro klibi yok, outro'suz devam ediliyor", "WARN")
+        return video_path, 0.0
+    
+    outro_duration = await probe_duration(outro_clip)
+    if outro_duration is None:
+        log("⚠️ Outro klibi süresi okunamadı, outro'suz devam ediliyor", "WARN")
+        return video_path, 0.0
+    
+    main_video = video_path
+    if max_duration:
+        video_duration = await probe_duration(video_path)
+        if video_duration is None or video_duration > max_duration:
+            main_video = temp_dir / "video_trimmed.mp4"
+            if not await trim_video(video_path, main_video, max_duration):
+                log("⚠️ Ana sahne kırpılamadı, outro'suz devam ediliyor", "WARN")
+                return video_path, 0.0
+    
+    output_path = temp_dir / "video_with_outro.mp4"
+    if await concat_videos([main_video, outro_clip], output_path):
+        return output_path, outro_duration
+    return video_path, 0.0
 
 
 def add_outro_to_code(code: str) -> str:
@@ -267,6 +495,22 @@ def get_voice_for_subject(subject_name: str) -> dict:
     return voice
 
 
+# ElevenLabs model ve ses ayarları (TTS cache anahtarının parçası)
+ELEVENLABS_MODEL = "eleven_turbo_v2_5"  # Hızlı + kaliteli + Türkçe
+ELEVENLABS_VOICE_SETTINGS = {
+    "stability": 0.70,           # Doğal ses için dengeli
+    "similarity_boost": 0.80,    # Orijinal sese yakın
+    "style": 0.35,               # Duygu ve ifade ekle
+    "use_speaker_boost": True    # Net ve temiz ses
+}
+
+# TTS cache: aynı (ses, model, ayar, metin) için ElevenLabs + ffprobe atlanır
+TTS_CACHE = TieredCache(
+    DiskCache(CACHE_DIR / "tts", max_bytes=TTS_CACHE_MAX_MB * 1024 * 1024, suffix=".mp3"),
+    SupabaseStorageTier(CACHE_BUCKET, "tts", suffix=".mp3", content_type="audio/mpeg") if CACHE_BUCKET else None
+)
+
+
 def get_random_voice() -> dict:
     """Rastgele bir ses seç"""
     voice_key = random.choice(list(TURKISH_VOICES.keys()))
@@ -290,35 +534,29 @@ async def generate_audio(text: str, output_path: Path, subject_name: str = None,
             selected_voice_id = voice["id"]
             voice_name = voice["name"]
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"https://api.elevenlabs.io/v1/text-to-speech/{selected_voice_id}",
-                headers={
-                    "xi-api-key": ELEVENLABS_API_KEY,
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "text": text,
-                    "model_id": "eleven_turbo_v2_5",  # Hızlı + kaliteli + Türkçe
-                    "voice_settings": {
-                        "stability": 0.70,           # Doğal ses için dengeli
-                        "similarity_boost": 0.80,    # Orijinal sese yakın
-                        "style": 0.35,               # Duygu ve ifade ekle
-                        "use_speaker_boost": True    # Net ve temiz ses
-                    }
-                },
-                timeout=60
-            )
-            
-            if response.status_code == 200:
-                with open(output_path, "wb") as f:
-                    f.write(response.content)
-                log(f"✅ Ses oluşturuldu: {voice_name} | {len(text)} karakter")
-                return True
-            else:
-                error_detail = response.text[:200] if response.text else "Bilinmeyen hata"
-                log(f"❌ ElevenLabs hatası: {response.status_code} - {error_detail}", "ERROR")
-                return False
+        client = get_client("elevenlabs")
+        response = await client.post(
+            f"https://api.elevenlabs.io/v1/text-to-speech/{selected_voice_id}",
+            headers={
+                "xi-api-key": ELEVENLABS_API_KEY,
+                "Content-Type": "application/json"
+            },
+            json={
+                "text": text,
+                "model_id": ELEVENLABS_MODEL,
+                "voice_settings": ELEVENLABS_VOICE_SETTINGS
+            }
+        )
+        
+        if response.status_code == 200:
+            with open(output_path, "wb") as f:
+                f.write(response.content)
+            log(f"✅ Ses oluşturuldu: {voice_name} | {len(text)} karakter")
+            return True
+        else:
+            error_detail = response.text[:200] if response.text else "Bilinmeyen hata"
+            log(f"❌ ElevenLabs hatası: {response.status_code} - {error_detail}", "ERROR")
+            return False
     except Exception as e:
         log(f"❌ ElevenLabs hatası: {e}", "ERROR")
         return False
@@ -330,35 +568,62 @@ async def generate_sound_effect(prompt: str, output_path: Path, duration_seconds
     Örnek: "classroom bell ringing", "applause", "success chime"
     """
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                "https://api.elevenlabs.io/v1/sound-generation",
-                headers={
-                    "xi-api-key": ELEVENLABS_API_KEY,
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "text": prompt,
-                    "duration_seconds": duration_seconds,
-                    "prompt_influence": 0.3  # Yaratıcılık dengesi
-                },
-                timeout=60
-            )
-            
-            if response.status_code == 200:
-                with open(output_path, "wb") as f:
-                    f.write(response.content)
-                log(f"✅ Ses efekti oluşturuldu: {prompt[:30]}...")
-                return True
-            else:
-                log(f"⚠️ Ses efekti hatası: {response.status_code}", "WARN")
-                return False
+        client = get_client("elevenlabs")
+        response = await client.post(
+            "https://api.elevenlabs.io/v1/sound-generation",
+            headers={
+                "xi-api-key": ELEVENLABS_API_KEY,
+                "Content-Type": "application/json"
+            },
+            json={
+                "text": prompt,
+                "duration_seconds": duration_seconds,
+                "prompt_influence": 0.3  # Yaratıcılık dengesi
+            }
+        )
+        
+        if response.status_code == 200:
+            with open(output_path, "wb") as f:
+                f.write(response.content)
+            log(f"✅ Ses efekti oluşturuldu: {prompt[:30]}...")
+            return True
+        else:
+            log(f"⚠️ Ses efekti hatası: {response.status_code}", "WARN")
+            return False
     except Exception as e:
         log(f"⚠️ Ses efekti hatası: {e}", "WARN")
         return False
 
 
-async def generate_tts_for_scenario(scenario: dict, audio_dir: Path, subject_name: str = None) -> tuple:
+# ElevenLabs eşzamanlılık limiti (tüm videolar için ortak)
+_tts_semaphore = asyncio.Semaphore(TTS_CONCURRENCY)
+
+
+async def synthesize_segment(text: str, output_path: Path, voice_id: str) -> Optional[float]:
+    """
+    Tek bir TTS segmenti üret, başarılıysa süresini döndür
+    - Önce TTS cache'e bakılır (süre de cache'te saklı, ffprobe gerekmez)
+    """
+    cache_key = content_key(voice_id, ELEVENLABS_MODEL, ELEVENLABS_VOICE_SETTINGS, text)
+    
+    meta = await TTS_CACHE.get(cache_key, output_path)
+    if meta is not None:
+        log(f"♻️ TTS cache: {text[:40]}")
+        return meta["duration"]
+    
+    async with _tts_semaphore:
+        with timed("elevenlabs_tts") as timer:
+            timer.ok = await generate_audio(text, output_path, voice_id=voice_id)
+        if not timer.ok:
+            return None
+    
+    duration = await get_audio_duration(output_path)
+    await TTS_CACHE.put(cache_key, output_path, {"duration": duration, "voice_id": voice_id, "text": text})
+    return duration
+
+
+async def generate_tts_for_scenario(scenario: dict, audio_dir: Path, subject_name: str = None,
+                                    voice: Optional[dict] = None) -> tuple:
     """
     Senaryo için tüm sesleri oluştur
     
@@ -366,60 +631,48 @@ async def generate_tts_for_scenario(scenario: dict, audio_dir: Path, subject_nam
     - Matematik/Fizik → Erdem (enerjik)
     - Türkçe/Biyoloji → Gamze (sıcak)
     - Tarih/Coğrafya → Mehmet (doğal)
+    
+    ⚡ Segmentler TTS_CONCURRENCY sınırı altında paralel üretilir,
+    sonuçlar orijinal sırayla birleştirilir
+    
+    Döndürür: ([(ses dosyası, süre)], süreler)
     """
-    audio_files = []
+    audio_segments = []
     durations = {"hook": 3.0, "steps": [], "kapanis": 3.0, "outro": 3.0}
     
     video_data = scenario.get("video_senaryosu", {})
     
-    # Ses seçimini logla
-    voice = get_voice_for_subject(subject_name)
+    # Ses seçimi video başına (toplu üretimde ders grubu başına) bir kez yapılır,
+    # tüm segmentler aynı sesi kullanır
+    voice = voice or get_voice_for_subject(subject_name)
     log(f"🎙️ Video sesi: {voice['name']} ({voice['description']})")
     
-    # Hook sesi
-    hook_text = video_data.get("hook_cumlesi", "Bu soruyu birlikte çözelim!")
-    hook_audio = audio_dir / "hook.mp3"
-    if await generate_audio(hook_text, hook_audio, subject_name=subject_name):
-        audio_files.append(hook_audio)
-        durations["hook"] = get_audio_duration(hook_audio)
-    
-    # Adım sesleri
+    # (süre anahtarı, metin, dosya) - sıra videodaki sıradır
+    segments = [("hook", video_data.get("hook_cumlesi", "Bu soruyu birlikte çözelim!"), audio_dir / "hook.mp3")]
     for i, adim in enumerate(video_data.get("adimlar", [])[:6]):
-        tts = adim.get("tts_metni", f"Adım {i+1}")
-        step_audio = audio_dir / f"step_{i}.mp3"
-        if await generate_audio(tts, step_audio, subject_name=subject_name):
-            audio_files.append(step_audio)
-            durations["steps"].append(get_audio_duration(step_audio))
-        else:
-            durations["steps"].append(3.0)
+        segments.append(("steps", adim.get("tts_metni", f"Adım {i+1}"), audio_dir / f"step_{i}.mp3"))
+    segments.append(("kapanis", video_data.get("kapanis_cumlesi", "Teknokul ile başarıya!"), audio_dir / "kapanis.mp3"))
+    segments.append(("outro", "Teknokul, eğitimin dijital üssü!", audio_dir / "outro.mp3"))
     
-    # Kapanış sesi
-    kapanis_text = video_data.get("kapanis_cumlesi", "Teknokul ile başarıya!")
-    kapanis_audio = audio_dir / "kapanis.mp3"
-    if await generate_audio(kapanis_text, kapanis_audio, subject_name=subject_name):
-        audio_files.append(kapanis_audio)
-        durations["kapanis"] = get_audio_duration(kapanis_audio)
+    results = await asyncio.gather(*[
+        synthesize_segment(text, path, voice["id"]) for _, text, path in segments
+    ])
     
-    # Outro sesi
-    outro_audio = audio_dir / "outro.mp3"
-    if await generate_audio("Teknokul, eğitimin dijital üssü!", outro_audio, subject_name=subject_name):
-        audio_files.append(outro_audio)
-        durations["outro"] = get_audio_duration(outro_audio)
+    for (key, _, path), duration in zip(segments, results):
+        if duration is not None:
+            audio_segments.append((path, duration))
+        if key == "steps":
+            durations["steps"].append(duration if duration is not None else 3.0)
+        elif duration is not None:
+            durations[key] = duration
     
-    return audio_files, durations
+    return audio_segments, durations
 
 
-def get_audio_duration(audio_path: Path) -> float:
+async def get_audio_duration(audio_path: Path) -> float:
     """FFprobe ile ses süresini al"""
-    try:
-        result = subprocess.run(
-            ["ffprobe", "-v", "error", "-show_entries", "format=duration",
-             "-of", "default=noprint_wrappers=1:nokey=1", str(audio_path)],
-            capture_output=True, text=True, timeout=30
-        )
-        return float(result.stdout.strip())
-    except:
-        return 3.0
+    duration = await probe_duration(audio_path)
+    return duration if duration is not None else 3.0
 
 
 # ============================================================
@@ -458,8 +711,11 @@ KURALLAR:
 """
 
 
-async def generate_scenario_with_gemini(question: VideoRequest) -> dict:
-    """Gemini Flash ile video senaryosu üret"""
+async def generate_scenario_with_gemini(question: VideoRequest, budget: Optional[DeadlineBudget] = None) -> dict:
+    """
+    Gemini Flash ile video senaryosu üret
+    - budget: senaryo aşamasının süre bütçesi (SCENARIO_DEADLINE_SECONDS); dolarsa fallback senaryo
+    """
     log(f"🎬 Gemini Flash ile senaryo üretiliyor... (Ders: {question.subject_name})")
     
     user_prompt = f"""SORU: {question.question_text}
@@ -472,40 +728,54 @@ AÇIKLAMA: {question.explanation or 'Yok'}
 
 Bu soru için video senaryosu oluştur. JSON formatında döndür."""
 
+    timeout = budget.timeout(SCENARIO_DEADLINE_SECONDS) if budget else SCENARIO_DEADLINE_SECONDS
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"https://generativelanguage.googleapis.com/v1beta/models/{GEMINI_MODEL_FLASH}:generateContent?key={GEMINI_API_KEY}",
-                json={
-                    "contents": [{"role": "user", "parts": [{"text": SCENARIO_PROMPT + "\n\n" + user_prompt}]}],
-                    "generationConfig": {"temperature": 0.7}
-                },
-                timeout=60
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                text = data["candidates"][0]["content"]["parts"][0]["text"]
-                
-                # JSON parse
-                json_str = text
-                if "```json" in text:
-                    json_str = text.split("```json")[1].split("```")[0]
-                elif "```" in text:
-                    json_str = text.split("```")[1].split("```")[0]
-                
-                scenario = json.loads(json_str.strip())
-                log(f"✅ Senaryo üretildi: {len(scenario.get('video_senaryosu', {}).get('adimlar', []))} adım")
-                return scenario
-            else:
-                log(f"❌ Gemini hatası: {response.status_code}", "ERROR")
-                
+        scenario = await call_gemini(lambda index: request_gemini_scenario(user_prompt), SCENARIO_LATENCY, timeout)
+        if scenario is not None:
+            log(f"✅ Senaryo üretildi: {len(scenario.get('video_senaryosu', {}).get('adimlar', []))} adım")
+            return scenario
+    except asyncio.TimeoutError:
+        log(f"❌ Gemini senaryo timeout ({timeout:.0f} sn), fallback senaryo", "ERROR")
     except Exception as e:
         log(f"❌ Gemini hatası: {e}", "ERROR")
     
     return create_fallback_scenario(question)
 
 
+async def request_gemini_scenario(user_prompt: str) -> Optional[dict]:
+    """Tek senaryo isteği: JSON bloğu ayrıştırılamazsa AttemptRejected (yedek istek yapılmaz)"""
+    client = get_client("gemini")
+    with timed("gemini_scenario") as timer:
+        response = await client.post(
+            f"https://generativelanguage.googleapis.com/v1beta/models/{GEMINI_MODEL_FLASH}:generateContent?key={GEMINI_API_KEY}",
+            json={
+                "contents": [{"role": "user", "parts": [{"text": SCENARIO_PROMPT + "\n\n" + user_prompt}]}],
+                "generationConfig": {"temperature": 0.7}
+            }
+        )
+        timer.ok = response.status_code == 200
+    
+    if response.status_code != 200:
+        log(f"❌ Gemini hatası: {response.status_code}", "ERROR")
+        return None
+    
+    data = response.json()
+    text = data["candidates"][0]["content"]["parts"][0]["text"]
+    
+    # JSON parse
+    json_str = text
+    if "```json" in text:
+        json_str = text.split("```json")[1].split("```")[0]
+    elif "```" in text:
+        json_str = text.split("```")[1].split("```")[0]
+    
+    try:
+        return json.loads(json_str.strip())
+    except json.JSONDecodeError as e:
+        log(f"⚠️ Senaryo JSON'u ayrıştırılamadı: {e}", "WARN")
+        raise AttemptRejected(str(e))
+
+
 def create_fallback_scenario(question: VideoRequest) -> dict:
     """Fallback senaryo oluştur"""
     return {
@@ -529,185 +799,316 @@ def create_fallback_scenario(question: VideoRequest) -> dict:
 # MANİM VİDEO OLUŞTUR
 # ============================================================
 
-async def create_manim_video(question: VideoRequest, scenario: dict, temp_dir: Path, 
-                             include_outro: bool = True) -> Optional[Path]:
-    """Gemini 3 Pro veya fallback ile Manim video oluştur"""
-    log(f"🎬 Manim video üretiliyor... (Ders: {question.subject_name})")
+def build_gemini_script(gemini_code: str) -> str:
+    """Gemini 3 Pro koduna config header ekle"""
+    if "from manim import" not in gemini_code:
+        return CONFIG_HEADER + gemini_code
+    return gemini_code.replace("from manim import *", CONFIG_HEADER.strip())
+
+
+# Önceden hesaplanmış soru yönlendirmeleri (python -m templates.routing), startup'ta yüklenir
+ROUTING_TABLE: Optional[RoutingTable] = None
+
+
+def load_routing_table() -> None:
+    global ROUTING_TABLE
+    try:
+        ROUTING_TABLE = RoutingTable.load(ROUTING_FILE)
+        log(f"🗂️ Routing tablosu yüklendi: {len(ROUTING_TABLE)} soru")
+    except Exception as e:
+        log(f"⚠️ Routing tablosu yüklenemedi, animasyonlar render sırasında tespit edilecek: {e}", "WARN")
+
+
+def build_fallback_sections(question: VideoRequest, scenario: dict, durations: dict) -> SectionedScript:
+    """
+    Smart renderer ile senaryo + TTS sürelerinden bölümlü script üret
+    - Routing tablosunda soru (aynı metinle) varsa soru metninin animasyon puanları oradan gelir
+    - Tek sahne: .to_scene_script(), bölümlü render: create_sectioned_manim_video
+    """
+    question_dict = {
+        "question_text": question.question_text,
+        "options": question.options,
+        "correct_answer": question.correct_answer,
+        "topic_name": question.topic_name,
+        "subject_name": question.subject_name,
+        "grade": question.grade
+    }
+    route = ROUTING_TABLE.get(question.question_id, question.question_text) if ROUTING_TABLE else None
+    if route and route["scores"] is not None:
+        question_dict["animation_scores"] = route["scores"]
+    return generate_smart_sections(scenario, question_dict, durations)
+
+
+def get_manim_version() -> str:
+    try:
+        return metadata.version("manim")
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+MANIM_VERSION = get_manim_version()
+
+# Render cache: aynı script + Manim sürümü + render profili için render atlanır
+RENDER_CACHE = TieredCache(
+    DiskCache(CACHE_DIR / "render", max_bytes=RENDER_CACHE_MAX_MB * 1024 * 1024, suffix=".mp4"),
+    SupabaseStorageTier(CACHE_BUCKET, "render", suffix=".mp4", content_type="video/mp4") if CACHE_BUCKET else None
+)
+
+
+# Kalıcı Manim worker'ları: import / font taraması video başına değil worker başına bir kez
+# Text / MathTex SVG'leri worker'lar ve restart'lar arasında CACHE_DIR altında paylaşılır
+MANIM_POOL: Optional[ManimWorkerPool] = (
+    ManimWorkerPool(MANIM_WORKERS, max_jobs=MANIM_WORKER_MAX_JOBS, max_rss_mb=MANIM_WORKER_MAX_RSS_MB,
+                    text_cache_dir=CACHE_DIR / "manim-text")
+    if MANIM_WORKERS > 0 else None
+)
+
+
+def disable_manim_pool(error: WorkerStartError) -> None:
+    """
+    Worker açılamadı
+    - manim import edilemiyorsa havuz kapatılır (boştaki worker'lar ve staging dizinleri temizlenir), CLI ile devam
+    - Geçici hata (startup timeout): havuz açık kalır, bu render CLI ile yapılır
+    """
+    global MANIM_POOL
+    if MANIM_POOL is None:
+        return
+    if not error.permanent:
+        log(f"⚠️ Manim worker açılamadı, bu render CLI ile yapılıyor: {str(error).strip()[-300:]}", "WARN")
+        return
+    log(f"⚠️ Manim worker havuzu açılamadı, CLI ile devam ediliyor: {str(error).strip()[-300:]}", "WARN")
+    pool, MANIM_POOL = MANIM_POOL, None
+    task = asyncio.create_task(pool.close())
+    _startup_tasks.add(task)
+    task.add_done_callback(_startup_tasks.discard)
+
+
+async def warm_manim_pool() -> None:
+    """İlk worker'ı aç ve sabit marka metinlerini (logo, slogan, ADIM 1-6, badge, outro) önbelleğe yaz"""
+    if MANIM_POOL is None:
+        return
+    try:
+        await MANIM_POOL.warm(1)
+        with tempfile.TemporaryDirectory() as work_dir:
+            result = await MANIM_POOL.prewarm(get_prewarm_script(), Path(work_dir))
+    except WorkerStartError as e:
+        disable_manim_pool(e)
+        return
+    if result.ok:
+        log(f"🔥 Text önbelleği hazır: {MANIM_POOL.text_cache_stats()}")
+    else:
+        log(f"⚠️ Text önbelleği ısıtılamadı: {result.error[-300:]}", "WARN")
+
+
+async def render_scene(script_content: str, script_path: Path, scene_name: str, media_dir: Path,
+                       profile: RenderProfile, step: str) -> Optional[Path]:
+    """
+    Script'teki tek sahneyi render et, video dosyasını döndür
+    - Worker havuzu açıksa kalıcı süreçte, değilse manim CLI ile (timeout/iptalde process grubu öldürülür)
+    - Havuz açılamazsa kapatılır, CLI ile devam edilir
+    """
+    pool = MANIM_POOL
+    if pool is not None:
+        try:
+            result = await pool.render(
+                script_content, scene_name, script_path, media_dir,
+                profile.width, profile.height, profile.fps, timeout=300, step=step
+            )
+        except WorkerStartError as e:
+            disable_manim_pool(e)
+        else:
+            if result.timed_out:
+                log(f"❌ Manim timeout (5 dakika): {scene_name}", "ERROR")
+                return None
+            if not result.ok:
+                log(f"❌ Manim hatası ({scene_name}): {result.error[-1500:]}", "ERROR")
+                return None
+            if not result.output or not result.output.exists():
+                log(f"❌ Video dosyası bulunamadı: {scene_name}", "ERROR")
+                return None
+            return result.output
     
-    script_content = None
-    generation_method = "fallback"
+    result = await run_process(
+        ["manim", "render", *profile.manim_flags, "--media_dir", str(media_dir), script_path, scene_name],
+        timeout=300,
+        cwd=script_path.parent,
+        step=step
+    )
     
-    # 1. Önce Gemini 3 Pro ile dene
-    gemini_code = await generate_manim_code_with_gemini_pro(question, include_outro)
+    if result.timed_out:
+        log(f"❌ Manim timeout (5 dakika): {scene_name}", "ERROR")
+        return None
     
-    if gemini_code and validate_manim_code(gemini_code):
-        # Config header ekle
-        if "from manim import" not in gemini_code:
-            script_content = CONFIG_HEADER + gemini_code
-        else:
-            script_content = gemini_code.replace("from manim import *", CONFIG_HEADER.strip())
-        
-        generation_method = "gemini_3_pro"
-        log("🚀 Gemini 3 Pro kodu kullanılıyor")
-    else:
-        # 2. Fallback: Smart renderer
-        log("⚠️ Fallback template kullanılıyor")
-        
-        question_dict = {
-            "question_text": question.question_text,
-            "options": question.options,
-            "correct_answer": question.correct_answer,
-            "topic_name": question.topic_name,
-            "subject_name": question.subject_name,
-            "grade": question.grade
-        }
-        
-        durations = {"hook": 3, "steps": [3, 3, 3], "kapanis": 3}
-        script_content = generate_smart_script(scenario, question_dict, durations)
+    log(f"📊 Manim exit code ({scene_name}): {result.returncode} ({result.duration:.1f}s)")
+    
+    if result.returncode != 0:
+        log(f"❌ Manim stderr ({scene_name}): {result.stderr[-1500:]}", "ERROR")
+        return None
+    
+    video_file = next(media_dir.rglob(f"{scene_name}.mp4"), None)
+    if not video_file:
+        log(f"❌ Video dosyası bulunamadı: {scene_name}", "ERROR")
+    return video_file
+
+
+async def create_manim_video(script_content: str, temp_dir: Path,
+                             profile: RenderProfile = DEFAULT_PROFILE) -> Optional[Path]:
+    """
+    Hazır Manim script'ini render et
+    - Script'in çözünürlük / fps satırları profile göre yeniden yazılır
+    - Aynı script daha önce aynı profille render edildiyse cache'ten döner (retry, yeniden üretim)
+    """
+    script_content = apply_render_profile(script_content, profile)
+    cache_key = content_key("render", script_content, MANIM_VERSION, profile.name, profile.manim_flags)
+    cached_path = temp_dir / "VideoScene.mp4"
+    if await RENDER_CACHE.get(cache_key, cached_path) is not None:
+        log("♻️ Render cache: Manim render atlandı")
+        return cached_path
+    
+    log("🎬 Manim video üretiliyor...")
     
     # Script'i kaydet
     script_path = temp_dir / "video_scene.py"
     with open(script_path, "w", encoding="utf-8") as f:
         f.write(script_content)
     
-    log(f"📝 Manim script oluşturuldu ({generation_method})")
-    
-    # Manim çalıştır
     try:
-        result = subprocess.run(
-            ["manim", "render", "-ql", "--format=mp4", str(script_path), "VideoScene"],
-            cwd=temp_dir,
-            capture_output=True,
-            text=True,
-            timeout=300
+        video_file = await render_scene(
+            script_content, script_path, "VideoScene", temp_dir / "media", profile,
+            step=f"manim render ({profile.name})"
         )
+        if not video_file:
+            return None
         
-        log(f"📊 Manim exit code: {result.returncode}")
+        log(f"✅ Video oluşturuldu: {video_file.name}")
+        await RENDER_CACHE.put(cache_key, video_file, {
+            "manim_version": MANIM_VERSION,
+            "profile": profile.name,
+            "flags": profile.manim_flags
+        })
+        return video_file
         
-        if result.returncode != 0:
-            log(f"❌ Manim stderr: {result.stderr[:1500]}", "ERROR")
-            return None, generation_method
-        
-        # Video dosyasını bul
-        for video_file in temp_dir.rglob("*.mp4"):
-            if "VideoScene" in video_file.name:
-                log(f"✅ Video oluşturuldu: {video_file.name}")
-                return video_file, generation_method
-        
-        log("❌ Video dosyası bulunamadı", "ERROR")
-        return None, generation_method
-        
-    except subprocess.TimeoutExpired:
-        log("❌ Manim timeout (5 dakika)", "ERROR")
-        return None, generation_method
     except Exception as e:
         log(f"❌ Manim hatası: {e}", "ERROR")
-        return None, generation_method
+        return None
 
 
-# ============================================================
-# SES VE VİDEO BİRLEŞTİR
-# ============================================================
+# Bölüm render'ları tüm işler arasında paylaşılan süreç havuzu: aynı anda en fazla SECTION_WORKERS Manim
+_section_slots = asyncio.Semaphore(SECTION_WORKERS)
+
 
-def merge_audio_video(video_path: Path, audio_path: Path, output_path: Path) -> bool:
-    """FFmpeg ile ses ve videoyu birleştir"""
-    log("🔊 Ses ve video birleştiriliyor...")
+async def create_sectioned_manim_video(sectioned: SectionedScript, temp_dir: Path,
+                                       profile: RenderProfile = DEFAULT_PROFILE) -> Optional[Path]:
+    """
+    Bölümlü script'i render et: her bölüm ayrı Manim sürecinde, paralel
+    - Duvar süresi ~ en uzun bölüm (+ CLI modunda süreç açılışı)
+    - Her bölüm kendi media dizinini kullanır (partial / text dosyaları çakışmaz)
+    - Bölümler aynı profille encode edildiği için stream copy ile birleştirilir
+    """
+    script_content = apply_render_profile(sectioned.to_sectioned_script(), profile)
+    cache_key = content_key("render", script_content, MANIM_VERSION, profile.name, profile.manim_flags)
+    output_path = temp_dir / "VideoScene.mp4"
+    if await RENDER_CACHE.get(cache_key, output_path) is not None:
+        log("♻️ Render cache: Manim render atlandı")
+        return output_path
     
+    scene_names = sectioned.scene_names
+    log(f"🎬 Manim video üretiliyor ({len(scene_names)} bölüm, {SECTION_WORKERS} paralel)...")
+    
+    script_path = temp_dir / "video_sections.py"
+    with open(script_path, "w", encoding="utf-8") as f:
+        f.write(script_content)
+    
+    async def render_section(index: int, scene_name: str) -> Optional[Path]:
+        async with _section_slots:
+            return await render_scene(
+                script_content, script_path, scene_name, temp_dir / "sections" / f"{index:02d}", profile,
+                step=f"manim section ({profile.name})"
+            )
+    
+    started = time.monotonic()
     try:
-        result = subprocess.run([
-            "ffmpeg", "-y",
-            "-i", str(video_path),
-            "-i", str(audio_path),
-            "-c:v", "copy",
-            "-c:a", "aac",
-            "-shortest",
-            str(output_path)
-        ], capture_output=True, text=True, timeout=120)
-        
-        if result.returncode == 0 and output_path.exists():
-            log("✅ Ses ve video birleştirildi")
-            return True
-        else:
-            log(f"❌ FFmpeg hatası: {result.stderr[:500]}", "ERROR")
-            return False
+        videos = await asyncio.gather(*[render_section(i, name) for i, name in enumerate(scene_names)])
     except Exception as e:
-        log(f"❌ FFmpeg hatası: {e}", "ERROR")
-        return False
+        log(f"❌ Manim hatası: {e}", "ERROR")
+        return None
+    
+    if not all(videos):
+        missing = [name for name, video in zip(scene_names, videos) if not video]
+        log(f"❌ Bölüm videoları eksik: {', '.join(missing)}", "ERROR")
+        return None
+    log(f"📊 {len(videos)} bölüm render edildi ({time.monotonic() - started:.1f}s)")
+    
+    if not await concat_videos(videos, output_path):
+        log("❌ Bölümler birleştirilemedi", "ERROR")
+        return None
+    
+    log(f"✅ Video oluşturuldu: {output_path.name}")
+    await RENDER_CACHE.put(cache_key, output_path, {
+        "manim_version": MANIM_VERSION,
+        "profile": profile.name,
+        "flags": profile.manim_flags,
+        "sections": len(scene_names)
+    })
+    return output_path
 
 
-def concat_audios(audio_files: list, output_path: Path) -> bool:
-    """Ses dosyalarını birleştir"""
-    try:
-        concat_file = output_path.parent / "concat.txt"
-        with open(concat_file, "w") as f:
-            for audio in audio_files:
-                f.write(f"file '{audio}'\n")
-        
-        result = subprocess.run([
-            "ffmpeg", "-y", "-f", "concat", "-safe", "0",
-            "-i", str(concat_file),
-            "-c:a", "libmp3lame", "-q:a", "2",
-            str(output_path)
-        ], capture_output=True, text=True, timeout=60)
-        
-        return result.returncode == 0
-    except Exception as e:
-        log(f"❌ Ses birleştirme hatası: {e}", "ERROR")
-        return False
+# ============================================================
+# SES VE VİDEO BİRLEŞTİR
+# ============================================================
+
+async def prepare_music(subject_name: str, temp_dir: Path) -> dict:
+    """Ders için arka plan müziği ve jingle'ı job dizinine hazırla"""
+    music_type = get_music_type_for_subject(subject_name or "Genel")
+    log(f"🎶 Müzik türü: {music_type}")
+    
+    music_path = temp_dir / "background_music.mp3"
+    jingle_path = temp_dir / "outro_jingle.mp3"
+    
+    music_ok, jingle_ok = await asyncio.gather(
+        download_music(music_type, music_path),
+        download_music("outro_jingle", jingle_path)
+    )
+    
+    if not music_ok:
+        log("⚠️ Arka plan müziği indirilemedi, müziksiz devam ediliyor")
+    if not jingle_ok:
+        log("⚠️ Jingle indirilemedi")
+    
+    return {
+        "music_path": music_path if music_ok else None,
+        "music_duration": get_music_info(music_type).get("duration") if music_ok else None,
+        "jingle_path": jingle_path if jingle_ok else None
+    }
 
 
-async def add_background_music_full(video_path: Path, output_path: Path, 
-                                     subject_name: str, temp_dir: Path) -> bool:
-    """Videoya arka plan müziği ve jingle ekle"""
-    log("🎵 Arka plan müziği ekleniyor...")
+async def finish_final_video(video_path: Path, audio_segments: list, music: dict,
+                             output_path: Path, outro_duration: float = 0.0) -> bool:
+    """
+    Tek geçişte TTS + müzik + jingle'ı videoya ekle
+    - Müzikli geçiş başarısız olursa sadece TTS ile tekrar denenir
+    - outro_duration: sona eklenmiş outro klibi, TTS süresine kırpılmaz (jingle outro üzerinde çalar)
+    """
+    log("🔊 Ses, müzik ve video tek geçişte birleştiriliyor...")
     
-    try:
-        # 1. Ders için uygun müzik türünü belirle
-        music_type = get_music_type_for_subject(subject_name or "Genel")
-        log(f"🎶 Müzik türü: {music_type}")
-        
-        # 2. Müzik dosyalarını indir
-        music_path = temp_dir / "background_music.mp3"
-        jingle_path = temp_dir / "outro_jingle.mp3"
-        
-        music_downloaded = await download_music(music_type, music_path)
-        jingle_downloaded = await download_music("outro_jingle", jingle_path)
-        
-        if not music_downloaded:
-            log("⚠️ Arka plan müziği indirilemedi, müziksiz devam ediliyor")
-            music_path = None
-        
-        if not jingle_downloaded:
-            log("⚠️ Jingle indirilemedi")
-            jingle_path = None
-        
-        # 3. Tüm sesleri mixle
-        if music_path or jingle_path:
-            success = create_full_audio_mix(
-                video_path=video_path,
-                tts_audio_path=None,  # TTS zaten video içinde
-                music_path=music_path if music_path and music_path.exists() else None,
-                jingle_path=jingle_path if jingle_path and jingle_path.exists() else None,
-                output_path=output_path,
-                music_volume=0.12  # TTS duyulsun diye düşük volume
-            )
-            
-            if success:
-                log("✅ Müzik başarıyla eklendi")
-                return True
-            else:
-                log("⚠️ Müzik ekleme başarısız, orijinal video kullanılıyor")
-        
-        # Fallback: Müzik yoksa videoyu kopyala
-        import shutil
-        shutil.copy(video_path, output_path)
-        return False
-        
-    except Exception as e:
-        log(f"⚠️ Müzik ekleme hatası: {e}", "WARN")
-        import shutil
-        shutil.copy(video_path, output_path)
-        return False
+    if await finish_video(
+        video_path, audio_segments, output_path,
+        music_path=music.get("music_path"),
+        music_duration=music.get("music_duration"),
+        jingle_path=music.get("jingle_path"),
+        music_volume=0.12,  # TTS duyulsun diye düşük volume
+        tail_duration=outro_duration
+    ):
+        log("✅ Final video hazır")
+        return True
+    
+    if music.get("music_path") or music.get("jingle_path"):
+        log("⚠️ Müzik ekleme başarısız, sadece TTS ile deneniyor", "WARN")
+        if await finish_video(video_path, audio_segments, output_path, tail_duration=outro_duration):
+            return True
+    
+    log("❌ Bitirme aşaması başarısız", "ERROR")
+    return False
 
 
 # ============================================================
@@ -715,82 +1116,81 @@ async def add_background_music_full(video_path: Path, output_path: Path,
 # ============================================================
 
 async def upload_to_supabase_storage(video_path: Path, question_id: str) -> Optional[str]:
-    """Video'yu Supabase Storage'a yükle"""
+    """
+    Video'yu Supabase Storage'a yükle
+    - TUS ile 6 MB parçalar halinde, hata olursa son onaylı offset'ten devam
+    """
     log("📤 Supabase Storage'a yükleniyor...")
     
     if not SUPABASE_URL or not SUPABASE_SERVICE_KEY:
         log("⚠️ Supabase credentials eksik", "WARN")
         return None
     
-    try:
-        with open(video_path, "rb") as f:
-            video_bytes = f.read()
-        
-        file_name = f"videos/{question_id}.mp4"
-        
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{SUPABASE_URL}/storage/v1/object/solution-videos/{file_name}",
-                headers={
-                    "Authorization": f"Bearer {SUPABASE_SERVICE_KEY}",
-                    "Content-Type": "video/mp4",
-                    "x-upsert": "true"
-                },
-                content=video_bytes,
-                timeout=300
-            )
-            
-            if response.status_code in [200, 201]:
-                video_url = f"{SUPABASE_URL}/storage/v1/object/public/solution-videos/{file_name}"
-                log(f"✅ Supabase'e yüklendi: {video_url}")
-                return video_url
-            else:
-                log(f"❌ Supabase hatası: {response.status_code}", "ERROR")
-                return None
-                
-    except Exception as e:
-        log(f"❌ Supabase upload hatası: {e}", "ERROR")
-        return None
+    file_name = f"videos/{question_id}.mp4"
+    
+    with timed("supabase_upload") as timer:
+        timer.ok = await upload_file_resumable(video_path, "solution-videos", file_name, content_type="video/mp4")
+    
+    if timer.ok:
+        video_url = f"{SUPABASE_URL}/storage/v1/object/public/solution-videos/{file_name}"
+        log(f"✅ Supabase'e yüklendi: {video_url}")
+        return video_url
+    
+    log("❌ Supabase upload hatası", "ERROR")
+    return None
 
 
 # ============================================================
 # YOUTUBE UPLOAD
 # ============================================================
 
-async def upload_to_youtube(video_path: Path, question: VideoRequest, scenario: dict) -> Optional[str]:
-    """YouTube'a yükle"""
-    log("📤 YouTube'a yükleniyor...")
+def build_youtube_metadata(question: VideoRequest) -> dict:
+    """YouTube endpoint'ine gönderilen video bilgileri"""
+    return {
+        "questionId": question.question_id,
+        "title": f"{question.grade}. Sınıf {question.subject_name} | {question.topic_name}",
+        "grade": question.grade,
+        "subject": question.subject_name,
+        "topicName": question.topic_name,
+        "questionText": question.question_text[:500]
+    }
+
+
+async def upload_to_youtube(video_path: Path, question: VideoRequest, scenario: dict,
+                            storage_url: Optional[str] = None) -> Optional[str]:
+    """
+    YouTube'a yükle
+    - url: Next.js endpoint'i videoyu az önce yüklenen Storage URL'inden çeker
+    - multipart: dosya diskten parça parça akıtılır (belleğe alınmaz)
+    """
+    mode = YOUTUBE_TRANSFER_MODE if storage_url else "multipart"
+    log(f"📤 YouTube'a yükleniyor ({mode})...")
     
     try:
-        with open(video_path, "rb") as f:
-            video_bytes = f.read()
+        client = get_client("teknokul")
+        url = f"{TEKNOKUL_API_BASE}/api/video/youtube-upload"
+        headers = {"Authorization": f"Bearer {API_SECRET}"}
+        metadata = build_youtube_metadata(question)
         
-        video_base64 = base64.b64encode(video_bytes).decode()
+        with timed(f"youtube_upload_{mode}") as timer:
+            if mode == "url":
+                response = await client.post(url, json={**metadata, "videoUrl": storage_url}, headers=headers)
+            else:
+                multipart_headers, body = multipart_file_body(
+                    {"metadata": json.dumps(metadata, ensure_ascii=False)},
+                    "video", video_path, f"{question.question_id}.mp4", "video/mp4"
+                )
+                response = await client.post(url, content=body, headers={**headers, **multipart_headers})
+            timer.ok = response.status_code == 200
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{TEKNOKUL_API_BASE}/api/video/youtube-upload",
-                json={
-                    "questionId": question.question_id,
-                    "videoBase64": video_base64,
-                    "title": f"{question.grade}. Sınıf {question.subject_name} | {question.topic_name}",
-                    "grade": question.grade,
-                    "subject": question.subject_name,
-                    "topicName": question.topic_name,
-                    "questionText": question.question_text[:500]
-                },
-                headers={"Authorization": f"Bearer {API_SECRET}"},
-                timeout=300
-            )
+        if response.status_code == 200:
+            data = response.json()
+            log(f"✅ YouTube'a yüklendi")
+            return data.get("videoUrl")
+        else:
+            log(f"⚠️ YouTube upload başarısız: {response.status_code}", "WARN")
+            return None
             
-            if response.status_code == 200:
-                data = response.json()
-                log(f"✅ YouTube'a yüklendi")
-                return data.get("videoUrl")
-            else:
-                log(f"⚠️ YouTube upload başarısız: {response.status_code}", "WARN")
-                return None
-                
     except Exception as e:
         log(f"⚠️ YouTube upload hatası: {e}", "WARN")
         return None
@@ -815,8 +1215,9 @@ async def update_question_in_db(question_id: str, storage_url: str, youtube_url:
         if youtube_url:
             update_data["video_solution_url"] = youtube_url
         
-        async with httpx.AsyncClient() as client:
-            await client.patch(
+        client = get_client("supabase")
+        with timed("db_update") as timer:
+            response = await client.patch(
                 f"{SUPABASE_URL}/rest/v1/questions?id=eq.{question_id}",
                 headers={
                     "Authorization": f"Bearer {SUPABASE_SERVICE_KEY}",
@@ -827,19 +1228,80 @@ async def update_question_in_db(question_id: str, storage_url: str, youtube_url:
                 json=update_data,
                 timeout=30
             )
-            log(f"✅ DB güncellendi: {question_id}")
-                
+            timer.ok = response.is_success
+        log(f"✅ DB güncellendi: {question_id}")
+            
     except Exception as e:
         log(f"⚠️ DB güncelleme hatası: {e}", "WARN")
 
 
+# ============================================================
+# TOPLU ÜRETİM: DERS GRUBU BAĞLAMI
+# ============================================================
+
+@dataclass
+class SubjectContext:
+    """Toplu üretimde ders grubu başına bir kez çözülen ortak kaynaklar"""
+    subject_name: str
+    voice: dict
+    system_prompt: str
+
+
+# Grup anahtarı → bağlam (son kullanılan SUBJECT_CONTEXTS_MAX grup tutulur)
+SUBJECT_CONTEXTS: "OrderedDict[str, SubjectContext]" = OrderedDict()
+SUBJECT_CONTEXTS_MAX = 32
+
+
+def find_voice(voice_id: str) -> Optional[dict]:
+    return next((v for v in TURKISH_VOICES.values() if v["id"] == voice_id), None)
+
+
+def resolve_subject_context(subject_name: Optional[str], voice_id: Optional[str] = None) -> SubjectContext:
+    """Ses ve sistem promptunu ders için bir kez seç"""
+    subject_name = subject_name or "Genel"
+    voice = (find_voice(voice_id) if voice_id else None) or get_voice_for_subject(subject_name)
+    return SubjectContext(
+        subject_name=subject_name,
+        voice=voice,
+        system_prompt=build_system_prompt(subject_name)
+    )
+
+
+def remember_subject_context(group_key: str, context: SubjectContext) -> None:
+    SUBJECT_CONTEXTS[group_key] = context
+    SUBJECT_CONTEXTS.move_to_end(group_key)
+    while len(SUBJECT_CONTEXTS) > SUBJECT_CONTEXTS_MAX:
+        SUBJECT_CONTEXTS.popitem(last=False)
+
+
+async def warm_subject_assets(subject_names: List[str], profile_names: Optional[List[str]] = None) -> None:
+    """Grupların müziklerini, jingle'ı ve kullanılan profillerin outro kliplerini ilk işler başlamadan hazırla"""
+    tasks = []
+    if SUPABASE_URL and SUPABASE_SERVICE_KEY:
+        paths = {resolve_music_path(get_music_type_for_subject(s)) for s in subject_names}
+        paths.add(MUSIC_CONFIG["outro_jingle"])
+        tasks.append(ASSET_CACHE.prefetch(paths))
+    if OUTRO_MODE == "clip":
+        formats = {(p.width, p.height, p.fps) for p in map(get_render_profile, profile_names or [None])}
+        tasks.extend(OUTRO_CLIPS.get(*fmt) for fmt in formats)
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
 # ============================================================
 # ANA İŞLEM FONKSİYONU
 # ============================================================
 
-async def process_video(request: VideoRequest):
-    """Ana video üretim işlemi"""
+async def process_video(request: VideoRequest, context: Optional[SubjectContext] = None):
+    """
+    Ana video üretim işlemi
+    - context: toplu üretimde ders grubunun ortak ses ve promptu
+    """
     start_time = time.time()
+    steps = start_job_steps()
+    # Aşamalar t=0'da birlikte başlar; ortak bütçe kod çağrısını senaryo bütçesine kırpardı
+    scenario_budget = DeadlineBudget(SCENARIO_DEADLINE_SECONDS)
+    code_budget = DeadlineBudget(CODE_DEADLINE_SECONDS)
+    profile = get_render_profile(request.render_profile)
     result = {
         "questionId": request.question_id,
         "success": False,
@@ -847,6 +1309,7 @@ async def process_video(request: VideoRequest):
         "youtubeUrl": None,
         "error": None,
         "generation_method": None,
+        "renderProfile": profile.name,
         "features": []
     }
     
@@ -859,26 +1322,88 @@ async def process_video(request: VideoRequest):
             audio_dir = temp_path / "audio"
             audio_dir.mkdir()
             
-            # 1. Senaryo üret
-            scenario = await generate_scenario_with_gemini(request)
+            # 1-4. Aşama grafiği: senaryo, Manim kodu ve TTS aynı anda başlar
+            # - Gemini 3 Pro kodu senaryoya ihtiyaç duymaz, t=0'da başlar
+            # - Fallback renderer senaryo + TTS sürelerini bekler
+            graph = StageGraph()
             
-            # 2. TTS sesleri oluştur (Türkçe profesyonel sesler)
-            log(f"🎤 Sesler oluşturuluyor... (Ders: {request.subject_name})")
-            audio_files, durations = await generate_tts_for_scenario(
-                scenario, audio_dir, subject_name=request.subject_name
-            )
-            log(f"✅ {len(audio_files)} ses dosyası oluşturuldu")
+            async def scenario_stage(ctx):
+                return await generate_scenario_with_gemini(request, scenario_budget)
             
-            # 3. Sesleri birleştir
-            combined_audio = temp_path / "combined_audio.mp3"
-            if audio_files:
-                concat_audios(audio_files, combined_audio)
+            # Klip modunda outro koda gömülmez, render sonrası eklenir
+            inline_outro = request.include_outro and OUTRO_MODE == "inline"
+            clip_outro = request.include_outro and OUTRO_MODE == "clip"
             
-            # 4. Video oluştur
-            video_path, generation_method = await create_manim_video(
-                request, scenario, temp_path, 
-                include_outro=request.include_outro
-            )
+            async def code_stage(ctx):
+                code = await generate_manim_code_with_gemini_pro(
+                    request, inline_outro,
+                    system_prompt=context.system_prompt if context else None,
+                    budget=code_budget
+                )
+                if code and validate_manim_code(code):
+                    return code
+                return None
+            
+            async def tts_stage(ctx):
+                scenario = await ctx.result("scenario")
+                log(f"🎤 Sesler oluşturuluyor... (Ders: {request.subject_name})")
+                audio_segments, durations = await generate_tts_for_scenario(
+                    scenario, audio_dir, subject_name=request.subject_name,
+                    voice=context.voice if context else None
+                )
+                log(f"✅ {len(audio_segments)} ses dosyası oluşturuldu")
+                return audio_segments, durations
+            
+            async def music_stage(ctx):
+                if not request.include_music:
+                    return {}
+                return await prepare_music(request.subject_name, temp_path)
+            
+            async def video_stage(ctx):
+                gemini_code = await ctx.result("code")
+                if gemini_code:
+                    log("🚀 Gemini 3 Pro kodu kullanılıyor")
+                    script_content = build_gemini_script(gemini_code)
+                    method = "gemini_3_pro"
+                    log(f"📝 Manim script oluşturuldu ({method})")
+                    video = await create_manim_video(script_content, temp_path, profile)
+                else:
+                    log("⚠️ Fallback template kullanılıyor")
+                    scenario = await ctx.result("scenario")
+                    _, durations = await ctx.result("tts")
+                    sectioned = build_fallback_sections(request, scenario, durations)
+                    method = "fallback"
+                    log(f"📝 Manim script oluşturuldu ({method}, {RENDER_MODE})")
+                    if RENDER_MODE == "sectioned":
+                        video = await create_sectioned_manim_video(sectioned, temp_path, profile)
+                    else:
+                        video = await create_manim_video(sectioned.to_scene_script(), temp_path, profile)
+                outro_duration = 0.0
+                if video and clip_outro:
+                    # Gemini ve fallback videolarına aynı klip eklenir; ana sahne TTS süresine kırpılır
+                    audio_segments, _ = await ctx.result("tts")
+                    tts_total = sum(duration for _, duration in audio_segments)
+                    video, outro_duration = await append_outro_clip(
+                        video, temp_path, profile, max_duration=tts_total or None
+                    )
+                return video, method, outro_duration
+            
+            graph.add("scenario", scenario_stage)
+            graph.add("code", code_stage)
+            graph.add("tts", tts_stage)
+            graph.add("music", music_stage)
+            graph.add("video", video_stage)
+            
+            stages = await graph.run()
+            log(f"⏱️ Aşama süreleri: {json.dumps(graph.timings)}")
+            result["stages"] = graph.timings
+            for stage_name, timing in graph.timings.items():
+                STAGE_SECONDS.observe(timing["duration"], stage=stage_name, profile=profile.name)
+            
+            scenario = stages["scenario"]
+            audio_segments, _ = stages["tts"]
+            music = stages["music"]
+            video_path, generation_method, outro_duration = stages["video"]
             
             result["generation_method"] = generation_method
             
@@ -889,55 +1414,49 @@ async def process_video(request: VideoRequest):
             if request.include_outro:
                 result["features"].append("outro_animation")
             
-            # 5. Ses ve videoyu birleştir
-            video_with_tts = temp_path / "video_with_tts.mp4"
-            if combined_audio.exists():
-                merge_audio_video(video_path, combined_audio, video_with_tts)
-            else:
-                video_with_tts = video_path
-            
-            if not video_with_tts.exists():
-                video_with_tts = video_path
-            
-            result["features"].append("tts_audio")
-            
-            # 6. Arka plan müziği ekle (opsiyonel)
+            # 5. Tek geçişte TTS + müzik + jingle
             final_video = temp_path / "final_video.mp4"
-            if request.include_music:
-                music_added = await add_background_music_full(
-                    video_path=video_with_tts,
-                    output_path=final_video,
-                    subject_name=request.subject_name,
-                    temp_dir=temp_path
-                )
-                if music_added:
+            if await finish_final_video(video_path, audio_segments, music, final_video, outro_duration):
+                if audio_segments:
+                    result["features"].append("tts_audio")
+                if music.get("music_path") and final_video.exists():
                     result["features"].append("background_music")
+                if music.get("jingle_path") and final_video.exists():
                     result["features"].append("outro_jingle")
             else:
-                import shutil
-                shutil.copy(video_with_tts, final_video)
-            
-            if not final_video.exists():
-                final_video = video_with_tts
+                final_video = video_path
             
             # 8. Supabase'e yükle
-            storage_url = await upload_to_supabase_storage(final_video, request.question_id)
+            # - draft (önizleme): ayrı isimle, soru kaydına ve YouTube'a gitmez
+            # - final: çözünürlük merdiveni tek geçişte üretilip birlikte yüklenir
+            object_name = request.question_id if profile.publish else f"{request.question_id}_{profile.name}"
+            renditions = await render_ladder(final_video, profile, temp_path)
+            storage_url, *rendition_urls = await asyncio.gather(
+                upload_to_supabase_storage(final_video, object_name),
+                *(upload_to_supabase_storage(path, f"{object_name}_{height}p") for height, path in renditions)
+            )
             
-            if storage_url:
-                result["storageUrl"] = storage_url
-                result["success"] = True
-                
+            if not storage_url:
+                raise Exception("Supabase upload başarısız")
+            
+            result["storageUrl"] = storage_url
+            result["success"] = True
+            if renditions:
+                result["renditions"] = {f"{profile.height}p": storage_url}
+                result["renditions"].update(
+                    {f"{height}p": url for (height, _), url in zip(renditions, rendition_urls) if url}
+                )
+            
+            if profile.publish:
                 await update_question_in_db(request.question_id, storage_url)
                 
                 # 9. YouTube'a yükle
-                youtube_url = await upload_to_youtube(final_video, request, scenario)
+                youtube_url = await upload_to_youtube(final_video, request, scenario, storage_url)
                 
                 if youtube_url:
                     result["youtubeUrl"] = youtube_url
                     result["features"].append("youtube_upload")
                     await update_question_in_db(request.question_id, storage_url, youtube_url)
-            else:
-                raise Exception("Supabase upload başarısız")
             
             log(f"✅ İşlem tamamlandı: {request.question_id}")
             
@@ -946,12 +1465,14 @@ async def process_video(request: VideoRequest):
         log(f"❌ İşlem hatası: {e}", "ERROR")
     
     result["duration"] = round(time.time() - start_time, 2)
+    result["timings"] = steps
+    JOB_SECONDS.observe(result["duration"], status="success" if result["success"] else "failed", profile=profile.name)
     
     # Callback
     if request.callback_url:
         try:
-            async with httpx.AsyncClient() as client:
-                await client.post(request.callback_url, json=result, timeout=30)
+            client = get_client("callback")
+            await client.post(request.callback_url, json=result)
         except:
             pass
     
@@ -962,6 +1483,73 @@ async def process_video(request: VideoRequest):
 # API ENDPOINTS
 # ============================================================
 
+async def run_video_job(payload: dict) -> dict:
+    """
+    Kuyruktaki iş → process_video
+    - Toplu işlerde ders grubu bağlamı kullanılır; instance yeniden başladıysa
+      aynı sesle yeniden oluşturulur
+    """
+    payload = dict(payload)
+    batch = payload.pop("batch", None)
+    context = None
+    if batch:
+        context = SUBJECT_CONTEXTS.get(batch["group"])
+        if context is None:
+            context = resolve_subject_context(payload.get("subject_name"), batch.get("voiceId"))
+            remember_subject_context(batch["group"], context)
+    return await process_video(VideoRequest(**payload), context)
+
+
+# Kalıcı iş kuyruğu: worker sayısı CPU sayısı kadar (manim render CPU-yoğun)
+JOB_QUEUE = JobQueue(
+    store=create_job_store(JOB_STORE_URL),
+    handler=run_video_job,
+    workers=JOB_WORKERS,
+    max_depth=JOB_QUEUE_MAX,
+    max_attempts=JOB_MAX_ATTEMPTS
+)
+
+_startup_tasks = set()
+
+
+@app.on_event("startup")
+async def startup():
+    """HTTP client havuzunu ve iş kuyruğunu aç, outro klibi, müzikleri, Manim worker'ını ve prompt önbelleğini arka planda hazırla"""
+    await http_clients.start()
+    await JOB_QUEUE.start()
+    
+    if ROUTING_FILE:
+        await asyncio.to_thread(load_routing_table)
+    
+    if SUPABASE_URL and SUPABASE_SERVICE_KEY:
+        task = asyncio.create_task(ASSET_CACHE.prefetch(get_prefetch_paths()))
+        _startup_tasks.add(task)
+        task.add_done_callback(_startup_tasks.discard)
+    
+    if OUTRO_MODE == "clip":
+        task = asyncio.create_task(OUTRO_CLIPS.get(VIDEO_WIDTH, VIDEO_HEIGHT, VIDEO_FPS))
+        _startup_tasks.add(task)
+        task.add_done_callback(_startup_tasks.discard)
+    
+    task = asyncio.create_task(warm_manim_pool())
+    _startup_tasks.add(task)
+    task.add_done_callback(_startup_tasks.discard)
+    
+    if PROMPT_CACHE and GEMINI_API_KEY:
+        task = asyncio.create_task(warm_prompt_cache())
+        _startup_tasks.add(task)
+        task.add_done_callback(_startup_tasks.discard)
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Worker'ları ve Manim süreçlerini durdur, açık bağlantıları kapat"""
+    await JOB_QUEUE.stop()
+    await http_clients.aclose()
+    if MANIM_POOL is not None:
+        await MANIM_POOL.close()
+
+
 @app.get("/", response_model=HealthResponse)
 @app.get("/health", response_model=HealthResponse)
 async def health():
@@ -1003,28 +1591,70 @@ async def info():
             "Doğru cevap vurgusu",
             "Teknokul outro",
             "TTS ses"
-        ]
+        ],
+        "cache": {
+            "render": RENDER_CACHE.stats(),
+            "tts": TTS_CACHE.stats()
+        },
+        "routing": len(ROUTING_TABLE) if ROUTING_TABLE else None,
+        "render_profiles": {
+            name: {
+                "resolution": f"{p.width}x{p.height}",
+                "fps": p.fps,
+                "ladder": [f"{w}x{h}" for w, h in p.ladder],
+                "publish": p.publish
+            }
+            for name, p in RENDER_PROFILES.items()
+        },
+        "render_mode": {"mode": RENDER_MODE, "section_workers": SECTION_WORKERS},
+        "manim_workers": MANIM_POOL.stats() if MANIM_POOL else None,
+        "hedging": {
+            "enabled": GEMINI_HEDGING,
+            "deadline_seconds": {"scenario": SCENARIO_DEADLINE_SECONDS, "code": CODE_DEADLINE_SECONDS},
+            "scenario": SCENARIO_LATENCY.stats(),
+            "code": CODE_LATENCY.stats()
+        },
+        "prompt_cache": PROMPT_CACHE.stats() if PROMPT_CACHE else None
     }
 
 
+def queue_full_response(e: QueueFullError) -> JSONResponse:
+    """Kuyruk dolu: 429 + Retry-After"""
+    log(f"⚠️ Kuyruk dolu ({e.depth} iş), Retry-After: {e.retry_after}s", "WARN")
+    return JSONResponse(
+        status_code=429,
+        headers={"Retry-After": str(e.retry_after)},
+        content={
+            "success": False,
+            "message": "Video kuyruğu dolu, daha sonra tekrar deneyin",
+            "queueDepth": e.depth,
+            "retryAfter": e.retry_after
+        }
+    )
+
+
 @app.post("/generate")
 async def generate_video(
     request: VideoRequest,
-    background_tasks: BackgroundTasks,
     authorization: str = Header(None)
 ):
-    """Video üretimini başlat (arka planda)"""
+    """Video üretimini kuyruğa al (arka planda)"""
     if API_SECRET and authorization != f"Bearer {API_SECRET}":
         raise HTTPException(status_code=401, detail="Unauthorized")
     
     log(f"📥 Video isteği: {request.question_id} | Ders: {request.subject_name}")
     
-    background_tasks.add_task(process_video, request)
+    try:
+        job_id = await JOB_QUEUE.submit(jsonable_encoder(request))
+    except QueueFullError as e:
+        return queue_full_response(e)
     
     return JSONResponse({
         "success": True,
-        "message": "Video üretimi başlatıldı",
+        "message": "Video üretimi kuyruğa alındı",
         "questionId": request.question_id,
+        "jobId": job_id,
+        "statusUrl": f"/jobs/{job_id}",
         "estimatedTime": "60-120 saniye"
     })
 
@@ -1034,18 +1664,192 @@ async def generate_video_sync(
     request: VideoRequest,
     authorization: str = Header(None)
 ):
-    """Video üretimi (senkron - bekle)"""
+    """Video üretimi (senkron - kuyruk üzerinden, bitene kadar bekle)"""
     if API_SECRET and authorization != f"Bearer {API_SECRET}":
         raise HTTPException(status_code=401, detail="Unauthorized")
     
     log(f"📥 Senkron video isteği: {request.question_id}")
     
-    result = await process_video(request)
+    try:
+        job_id = await JOB_QUEUE.submit(jsonable_encoder(request))
+    except QueueFullError as e:
+        return queue_full_response(e)
+    
+    job = await JOB_QUEUE.wait(job_id, timeout=SYNC_WAIT_TIMEOUT)
+    if job and job.status not in ("completed", "failed"):
+        log(f"⏳ Senkron bekleme {SYNC_WAIT_TIMEOUT}s'de doldu, iş sürüyor: {job_id}", "WARN")
+        return JSONResponse(status_code=202, content={
+            "success": False,
+            "message": "Video hâlâ işleniyor, durumu statusUrl'den takip edin",
+            "questionId": request.question_id,
+            "jobId": job_id,
+            "statusUrl": f"/jobs/{job_id}"
+        })
+    result = (job.result if job else None) or {}
     
     if result.get("success"):
         return JSONResponse(result)
     else:
-        raise HTTPException(status_code=500, detail=result.get("error", "Video üretilemedi"))
+        error = result.get("error") or (job.error if job else None)
+        raise HTTPException(status_code=500, detail=error or "Video üretilemedi")
+
+
+@app.post("/generate-batch")
+async def generate_batch(
+    request: BatchRequest,
+    authorization: str = Header(None)
+):
+    """
+    Toplu video üretimi (konu bankası yenileme)
+    - İstekler derse göre gruplanır; ses, sistem promptu, müzik ve outro grup başına bir kez hazırlanır
+    - Aynı dersin işleri kuyrukta art arda çalışır
+    - Kuyrukta yer yoksa istek sırasıyla baştan sığan kısmı kabul edilir; kalanı 429 + rejected aralığı
+    - İlerleme: GET /batches/{batchId}
+    """
+    if API_SECRET and authorization != f"Bearer {API_SECRET}":
+        raise HTTPException(status_code=401, detail="Unauthorized")
+    
+    if not request.items:
+        raise HTTPException(status_code=400, detail="Boş toplu istek")
+    if len(request.items) > BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"En fazla {BATCH_MAX_ITEMS} video gönderilebilir")
+    
+    groups = {}
+    for item in request.items:
+        groups.setdefault(item.subject_name or "Genel", []).append(item)
+    
+    log(f"📦 Toplu istek: {len(request.items)} video, {len(groups)} ders grubu")
+    
+    # Payload'lar istek sırasında: kabul edilmeyen kısım her zaman sondaki tek aralıktır
+    batch_groups = {}
+    group_order = {}
+    for subject_name in groups:
+        context = resolve_subject_context(subject_name)
+        group_key = uuid.uuid4().hex
+        remember_subject_context(group_key, context)
+        batch_groups[subject_name] = {"group": group_key, "voiceId": context.voice["id"]}
+        group_order[group_key] = len(group_order)
+    
+    payloads = []
+    for item in request.items:
+        payload = jsonable_encoder(item)
+        payload["batch"] = dict(batch_groups[item.subject_name or "Genel"])
+        payloads.append(payload)
+    
+    try:
+        batch_id, job_ids = await JOB_QUEUE.submit_batch(
+            payloads, key=lambda payload: group_order[payload["batch"]["group"]]
+        )
+    except QueueFullError as e:
+        return queue_full_response(e)
+    
+    accepted = payloads[:len(job_ids)]
+    accepted_groups = {}
+    for payload in accepted:
+        subject_name = payload.get("subject_name") or "Genel"
+        accepted_groups[subject_name] = accepted_groups.get(subject_name, 0) + 1
+    
+    task = asyncio.create_task(warm_subject_assets(
+        list(accepted_groups), list({payload["render_profile"] for payload in accepted})
+    ))
+    _startup_tasks.add(task)
+    task.add_done_callback(_startup_tasks.discard)
+    
+    content = {
+        "success": True,
+        "message": "Toplu video üretimi kuyruğa alındı",
+        "batchId": batch_id,
+        "statusUrl": f"/batches/{batch_id}",
+        "groups": accepted_groups,
+        "items": [
+            {"questionId": payload["question_id"], "jobId": job_id}
+            for payload, job_id in zip(accepted, job_ids)
+        ]
+    }
+    
+    # Kuyruk kapasitesi kadarı kabul edildi: kalan aralık 429 ile döner, istemci Retry-After sonra gönderir
+    if len(job_ids) < len(payloads):
+        depth = await JOB_QUEUE.depth()
+        retry_after = JOB_QUEUE.retry_after(depth)
+        log(f"⚠️ Kuyruk kapasitesi: {len(job_ids)}/{len(payloads)} video kabul edildi, Retry-After: {retry_after}s", "WARN")
+        content["success"] = False
+        content["message"] = (f"Video kuyruğu dolu: ilk {len(job_ids)}/{len(payloads)} video kabul edildi, "
+                              f"kalanını daha sonra tekrar gönderin")
+        content["rejected"] = {
+            "from": len(job_ids),
+            "to": len(payloads),
+            "questionIds": [payload["question_id"] for payload in payloads[len(job_ids):]]
+        }
+        content["queueDepth"] = depth
+        content["retryAfter"] = retry_after
+        return JSONResponse(status_code=429, headers={"Retry-After": str(retry_after)}, content=content)
+    
+    return JSONResponse(content)
+
+
+@app.get("/batches/{batch_id}")
+async def get_batch(batch_id: str, authorization: str = Header(None)):
+    """Toplu iş ilerlemesi: durum sayıları + iş bazında durum"""
+    if API_SECRET and authorization != f"Bearer {API_SECRET}":
+        raise HTTPException(status_code=401, detail="Unauthorized")
+    
+    jobs = await JOB_QUEUE.get_batch(batch_id)
+    if not jobs:
+        raise HTTPException(status_code=404, detail="Toplu iş bulunamadı")
+    
+    counts = {}
+    for job in jobs:
+        counts[job.status] = counts.get(job.status, 0) + 1
+    done = counts.get("completed", 0) + counts.get("failed", 0)
+    
+    return {
+        "batchId": batch_id,
+        "total": len(jobs),
+        "counts": counts,
+        "progress": round(done / len(jobs), 3),
+        "items": [job.to_dict() for job in jobs]
+    }
+
+
+QUEUE_DEPTH = METRICS.gauge("teknokul_queue_depth", "Bekleyen + çalışan iş sayısı")
+JOBS_IN_FLIGHT = METRICS.gauge("teknokul_jobs_in_flight", "Bu instance'ta çalışan iş sayısı")
+CACHE_HITS = METRICS.gauge("teknokul_cache_hits_total", "Cache isabetleri", "counter")
+CACHE_MISSES = METRICS.gauge("teknokul_cache_misses_total", "Cache ıskaları", "counter")
+CACHE_HIT_RATIO = METRICS.gauge("teknokul_cache_hit_ratio", "Cache isabet oranı")
+LLM_HEDGES = METRICS.gauge("teknokul_llm_hedges_total", "Başlatılan yedek LLM istekleri", "counter")
+LLM_HEDGE_WINS = METRICS.gauge("teknokul_llm_hedge_wins_total", "Yedeğin kazandığı LLM çağrıları", "counter")
+LLM_HEDGE_THRESHOLD = METRICS.gauge("teknokul_llm_hedge_threshold_seconds", "Yedek istek eşiği (p90)")
+
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrikleri: adım/aşama/iş süreleri, kuyruk, cache"""
+    QUEUE_DEPTH.set(await JOB_QUEUE.depth())
+    JOBS_IN_FLIGHT.set(JOB_QUEUE.in_flight)
+    caches = [("tts", TTS_CACHE), ("render", RENDER_CACHE)] + ([("gemini_prompt", PROMPT_CACHE)] if PROMPT_CACHE else [])
+    for cache_name, cache in caches:
+        stats = cache.stats()
+        CACHE_HITS.set(stats["hits"], cache=cache_name)
+        CACHE_MISSES.set(stats["misses"], cache=cache_name)
+        CACHE_HIT_RATIO.set(stats["hit_rate"], cache=cache_name)
+    for call, tracker in (("scenario", SCENARIO_LATENCY), ("code", CODE_LATENCY)):
+        LLM_HEDGES.set(tracker.hedges, call=call)
+        LLM_HEDGE_WINS.set(tracker.hedge_wins, call=call)
+        LLM_HEDGE_THRESHOLD.set(round(tracker.threshold(), 3), call=call)
+    return PlainTextResponse(METRICS.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str, authorization: str = Header(None)):
+    """İş durumu: queued / running / completed / failed"""
+    if API_SECRET and authorization != f"Bearer {API_SECRET}":
+        raise HTTPException(status_code=401, detail="Unauthorized")
+    
+    job = await JOB_QUEUE.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="İş bulunamadı")
+    
+    return job.to_dict()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,51 @@
+"""
+Teknokul Pipeline Modülü
+Video üretim hattının altyapı bileşenleri
+"""
+
+from .stages import StageGraph, StageContext
+from .http import HttpClients, UpstreamConfig, http_clients, get_client
+from .jobs import Job, JobStore, SQLiteJobStore, JobQueue, QueueFullError, create_job_store
+from .process import ProcessResult, run_process, probe_duration
+from .metrics import METRICS, MetricsRegistry, Histogram, Gauge, timed, record_step, start_job_steps
+from .gemini_stream import CodeStreamParser, iter_sse_text
+from .hedging import AttemptRejected, LatencyTracker, DeadlineBudget, hedged
+from .prompt_cache import GeminiPromptCache
+from .upload import ResumableUpload, ResumableUploadError, upload_file_resumable, iter_file, multipart_file_body
+
+__all__ = [
+    "StageGraph",
+    "StageContext",
+    "HttpClients",
+    "UpstreamConfig",
+    "http_clients",
+    "get_client",
+    "Job",
+    "JobStore",
+    "SQLiteJobStore",
+    "JobQueue",
+    "QueueFullError",
+    "create_job_store",
+    "ProcessResult",
+    "run_process",
+    "probe_duration",
+    "METRICS",
+    "MetricsRegistry",
+    "Histogram",
+    "Gauge",
+    "timed",
+    "record_step",
+    "start_job_steps",
+    "CodeStreamParser",
+    "iter_sse_text",
+    "AttemptRejected",
+    "LatencyTracker",
+    "DeadlineBudget",
+    "hedged",
+    "GeminiPromptCache",
+    "ResumableUpload",
+    "ResumableUploadError",
+    "upload_file_resumable",
+    "iter_file",
+    "multipart_file_body",
+]
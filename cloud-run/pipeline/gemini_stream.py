@@ -0,0 +1,161 @@
+"""
+Teknokul Gemini Akış Ayrıştırıcı
+📡 streamGenerateContent (SSE) yanıtını parça parça okur, Manim kod bloğunu gelirken ayrıştırır
+- Kapanış ``` görüldüğü an kod hazırdır: açıklama metninin gelmesi beklenmez
+- Çıktı açıkça bozuksa (kod bloğu yok, VideoScene yok, syntax hatası) erken hata: akış kesilir
+- Syntax kontrolü tamamlanmış satırlar üzerinde yapılır; yarım kalan son ifade hata sayılmaz
+"""
+
+import re
+import json
+from typing import AsyncIterator, Optional
+
+import httpx
+
+PYTHON_TAGS = {"", "python", "py", "python3"}
+
+# Kod öneki derlenirken "henüz gelmedi" anlamına gelen hatalar
+_INCOMPLETE_HINTS = (
+    "was never closed",
+    "unexpected EOF",
+    "unterminated triple-quoted",
+    "EOF while scanning",
+    "expected an indented block",
+    "expected 'except' or 'finally' block",
+)
+
+_FENCE_RE = re.compile(r"^[ \t]*```[ \t]*([\w+-]*)[ \t]*\n", re.MULTILINE)
+_CLOSING_FENCE_RE = re.compile(r"^[ \t]*```", re.MULTILINE)
+
+
+async def iter_sse_text(response: httpx.Response) -> AsyncIterator[str]:
+    """SSE olaylarındaki metin parçaları (candidates[0].content.parts[*].text)"""
+    async for line in response.aiter_lines():
+        if not line.startswith("data:"):
+            continue
+        payload = line[5:].strip()
+        if not payload or payload == "[DONE]":
+            continue
+        try:
+            event = json.loads(payload)
+        except json.JSONDecodeError:
+            continue
+        for candidate in event.get("candidates", [])[:1]:
+            for part in candidate.get("content", {}).get("parts", []):
+                if part.get("text"):
+                    yield part["text"]
+
+
+class CodeStreamParser:
+    """
+    Artımlı kod bloğu ayrıştırıcı
+    - feed(text): gelen parçayı ekle
+    - done: kod hazır (kapanış fence'i görüldü veya finish() çağrıldı), code dolu
+    - error: çıktı bozuk, beklemeye gerek yok
+    - Fence'siz yanıt: metin Manim koduna benziyorsa tamamı kod sayılır (eski davranış)
+    """
+
+    def __init__(self, max_preamble: int = 2000, scene_deadline: int = 6000, check_every: int = 40):
+        self.max_preamble = max_preamble
+        self.scene_deadline = scene_deadline
+        self.check_every = check_every
+        self.buffer = ""
+        self.code = ""
+        self.error: Optional[str] = None
+        self.done = False
+        self._code_start: Optional[int] = None
+        self._fenced = True
+        self._scan_from = 0
+        self._checked_lines = 0
+
+    @property
+    def in_code(self) -> bool:
+        return self._code_start is not None and len(self.buffer) > self._code_start
+
+    def feed(self, text: str) -> None:
+        if self.done or self.error:
+            return
+        self.buffer += text
+        if self._code_start is None:
+            self._find_opening()
+        if self._code_start is not None and self._fenced:
+            self._find_closing()
+        if self._code_start is not None and not self.done:
+            self._check_partial()
+
+    def finish(self) -> None:
+        """Akış bitti: kapanmamış blok veya fence'siz kod olduğu gibi alınır"""
+        if self.done or self.error:
+            return
+        if self._code_start is None:
+            if self._looks_like_code(self.buffer):
+                self._code_start, self._fenced = 0, False
+            else:
+                self.error = "Yanıtta kod bloğu yok"
+                return
+        self.code = self.buffer[self._code_start:]
+        self.done = True
+
+    @staticmethod
+    def _looks_like_code(text: str) -> bool:
+        return "class VideoScene" in text or "from manim import" in text
+
+    def _find_opening(self) -> None:
+        while True:
+            match = _FENCE_RE.search(self.buffer, self._scan_from)
+            if match is None:
+                break
+            if match.group(1).lower() in PYTHON_TAGS:
+                self._code_start = match.end()
+                return
+            # Başka dilde blok (örn. json): kapanışına kadar atla
+            closing = _CLOSING_FENCE_RE.search(self.buffer, match.end())
+            if closing is None:
+                return
+            self._scan_from = closing.end()
+
+        if len(self.buffer) > self.max_preamble:
+            if self._looks_like_code(self.buffer):
+                self._code_start, self._fenced = 0, False
+            else:
+                self.error = f"İlk {self.max_preamble} karakterde kod bloğu yok"
+
+    def _find_closing(self) -> None:
+        closing = _CLOSING_FENCE_RE.search(self.buffer, self._code_start)
+        if closing is not None:
+            self.code = self.buffer[self._code_start:closing.start()]
+            self.done = True
+
+    def _check_partial(self) -> None:
+        code = self.buffer[self._code_start:]
+        if "class VideoScene" not in code and len(code) > self.scene_deadline:
+            self.error = f"İlk {self.scene_deadline} karakterde class VideoScene yok"
+            return
+
+        complete = code[:code.rfind("\n") + 1]
+        lines = complete.count("\n")
+        if lines - self._checked_lines < self.check_every:
+            return
+        self._checked_lines = lines
+        self.error = syntax_error_before_tail(complete, lines)
+
+
+def syntax_error_before_tail(code: str, lines: int) -> Optional[str]:
+    """
+    Yarım kodu derle; hata son ifadeden önceyse (akışın devamı düzeltemez) mesajı döndür
+    """
+    try:
+        compile(code, "<gemini>", "exec", dont_inherit=True)
+        return None
+    except SyntaxError as e:
+        message = str(e.msg)
+        if any(hint in message for hint in _INCOMPLETE_HINTS):
+            return None
+        if e.lineno is None:
+            # Konumsuz hata (örn. null byte, Python 3.11+): akışın devamı düzeltemez
+            return f"Geçersiz kod: {message}"
+        if e.lineno >= lines - 1:
+            return None
+        return f"Syntax hatası (satır {e.lineno}): {message}"
+    except ValueError as e:
+        return f"Geçersiz kod: {e}"
@@ -0,0 +1,171 @@
+"""
+Teknokul İstek Yedekleme (Hedging)
+🏁 Geç kalan LLM çağrısını sonuna kadar beklemek yerine ikinci bir kopya başlatır, ilk dönen kazanır
+- Eşik: çağrı tipinin son yanıt sürelerinin p90'ı (yeterli örnek yoksa sabit varsayılan)
+- Yanıt dönen her deneme (kazanan, kaybeden, reddedilen) örneklenir; iptal edilen deneme en az eşik
+  süresiyle kaydedilir: yalnızca kazananları saymak p90'ı aşağı çeker, yedek giderek erken başlar
+- Bağlantı / HTTP hatası süre örneği değildir (hızlı hata gecikme ölçüsü olmaz)
+- Yedek aynı çağrı veya daha ucuz bir model olabilir (attempt(index) hangisi olduğunu seçer)
+- Hızlı hata (503, bağlantı hatası) yedeği beklemeden başlatır
+- Reddedilen yanıt (AttemptRejected: bozuk kod / JSON) yedek başlatmaz: aynı istek aynı çıktıyı verir
+- İş başına süre bütçesi: bütçe biterse çağrılar kesilir, çağıran fallback'e geçer
+"""
+
+import math
+import time
+import asyncio
+from collections import deque
+from typing import Awaitable, Callable, Dict, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+Attempt = Callable[[int], Awaitable[Optional[T]]]
+
+
+class AttemptRejected(Exception):
+    """Yanıt alındı ama içeriği reddedildi: yedek istek başlatılmaz, çağıran fallback'e geçer"""
+
+
+class LatencyTracker:
+    """
+    Çağrı tipi başına son yanıt sürelerinin kayan penceresi
+    - threshold(): yedek isteğin başlatılacağı süre (varsayılan p90)
+    """
+
+    def __init__(self, name: str, default: float, quantile: float = 0.9,
+                 window: int = 200, min_samples: int = 10):
+        self.name = name
+        self.default = default
+        self.quantile = quantile
+        self.min_samples = min_samples
+        self.samples: deque = deque(maxlen=window)
+        self.calls = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    def observe(self, seconds: float) -> None:
+        self.samples.append(seconds)
+
+    def threshold(self) -> float:
+        if len(self.samples) < self.min_samples:
+            return self.default
+        ordered = sorted(self.samples)
+        return ordered[max(0, math.ceil(self.quantile * len(ordered)) - 1)]
+
+    def stats(self) -> dict:
+        return {
+            "threshold": round(self.threshold(), 2),
+            "samples": len(self.samples),
+            "calls": self.calls,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+        }
+
+
+class DeadlineBudget:
+    """İşin LLM çağrılarına ayrılan toplam süre (iş başlangıcından itibaren)"""
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.deadline = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return max(0.0, self.deadline - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def timeout(self, limit: float) -> float:
+        """Çağrının kendi üst sınırı ile kalan bütçenin küçüğü"""
+        return min(limit, self.remaining())
+
+
+async def hedged(attempt: Attempt, tracker: LatencyTracker, timeout: float, hedges: int = 1) -> Optional[T]:
+    """
+    attempt(0) başlat; tracker eşiğinde dönmediyse veya başarısız olduysa attempt(1)...
+    - İlk None olmayan sonuç kazanır, diğer denemeler iptal edilir
+    - Hepsi başarısızsa None (son deneme istisna verdiyse o yükselir)
+    - AttemptRejected: yeni yedek başlatılmaz; zaten çalışan deneme yoksa hemen yükselir
+    - timeout dolarsa asyncio.TimeoutError
+    """
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    deadline = started + timeout
+    threshold = tracker.threshold()
+    hedge_at = started + threshold
+    pending: Dict[asyncio.Task, Tuple[int, float]] = {}
+    launched = 0
+    last_error: Optional[BaseException] = None
+    rejected: Optional[AttemptRejected] = None
+    tracker.calls += 1
+
+    def launch() -> None:
+        nonlocal launched, hedge_at
+        now = loop.time()
+        pending[asyncio.ensure_future(attempt(launched))] = (launched, now)
+        launched += 1
+        hedge_at = now + threshold
+
+    try:
+        launch()
+        while pending:
+            now = loop.time()
+            if now >= deadline:
+                raise asyncio.TimeoutError
+            wait = deadline - now
+            if rejected is None and launched <= hedges:
+                wait = min(wait, max(0.0, hedge_at - now))
+            done, _ = await asyncio.wait(pending, timeout=wait, return_when=asyncio.FIRST_COMPLETED)
+
+            winner = None
+            for task in done:
+                index, task_started = pending.pop(task)
+                elapsed = loop.time() - task_started
+                try:
+                    result = task.result()
+                    last_error = None
+                except AttemptRejected as e:
+                    tracker.observe(elapsed)
+                    rejected = e
+                    continue
+                except Exception as e:
+                    last_error = e
+                    continue
+                if result is None:
+                    continue
+                tracker.observe(elapsed)
+                if winner is None:
+                    winner = (index, result)
+
+            if winner is not None:
+                index, result = winner
+                if index > 0:
+                    tracker.hedge_wins += 1
+                return result
+
+            if rejected is not None and not pending:
+                raise rejected
+
+            # Eşik aşıldı veya tüm denemeler hızlı hata verdi: yedek başlat
+            if rejected is None and launched <= hedges and (not pending or loop.time() >= hedge_at):
+                if pending:
+                    print(f"🏁 {tracker.name}: {threshold:.1f}s'de yanıt yok, yedek istek başlatıldı")
+                else:
+                    print(f"🏁 {tracker.name}: deneme başarısız, yedek istek başlatıldı")
+                tracker.hedges += 1
+                launch()
+
+        if rejected is not None:
+            raise rejected
+        if last_error is not None:
+            raise last_error
+        return None
+    finally:
+        # Kesilen denemelerin süresi bilinmiyor: en az eşik kadar sürdüğü kaydedilir
+        now = loop.time()
+        for task, (_, task_started) in pending.items():
+            tracker.observe(max(now - task_started, threshold))
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
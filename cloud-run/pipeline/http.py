@@ -0,0 +1,111 @@
+"""
+Teknokul HTTP Client Havuzu
+🔌 Upstream başına uzun ömürlü httpx.AsyncClient
+- Keep-alive ile TCP+TLS el sıkışması her istekte tekrarlanmaz
+- Upstream başına bağlantı limiti ve varsayılan timeout
+- Opsiyonel HTTP/2 (h2 paketi kuruluysa)
+"""
+
+import os
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import httpx
+
+
+@dataclass(frozen=True)
+class UpstreamConfig:
+    max_connections: int
+    max_keepalive: int
+    timeout: float
+    connect_timeout: float = 10.0
+    http2: bool = False
+
+
+HTTP2_ENABLED = os.getenv("HTTP2_ENABLED", "false").lower() == "true"
+
+UPSTREAMS: Dict[str, UpstreamConfig] = {
+    # Gemini: senaryo + kod üretimi (kod çağrısı kendi 180 sn timeout'unu verir)
+    "gemini": UpstreamConfig(max_connections=10, max_keepalive=5, timeout=60, http2=HTTP2_ENABLED),
+    # ElevenLabs: TTS fan-out (TTS_CONCURRENCY ile ayrıca sınırlı)
+    "elevenlabs": UpstreamConfig(max_connections=8, max_keepalive=8, timeout=60, http2=HTTP2_ENABLED),
+    # Supabase: Storage + REST
+    "supabase": UpstreamConfig(max_connections=20, max_keepalive=10, timeout=60, http2=HTTP2_ENABLED),
+    # Teknokul Next.js API (YouTube upload)
+    "teknokul": UpstreamConfig(max_connections=4, max_keepalive=2, timeout=300),
+    # Callback URL'leri (farklı host'lar olabilir)
+    "callback": UpstreamConfig(max_connections=10, max_keepalive=5, timeout=30),
+}
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class HttpClients:
+    """
+    Uygulama ömrü boyunca yaşayan client kayıt defteri
+    - FastAPI startup'ta açılır, shutdown'da kapanır
+    - Açılmadan çağrılırsa (script/benchmark) ilk kullanımda oluşturulur
+    - use_transport ile tüm upstream'ler sahte bir transport'a yönlendirilebilir (benchmark)
+    """
+
+    def __init__(self, upstreams: Dict[str, UpstreamConfig]):
+        self.upstreams = upstreams
+        self.transport: Optional[httpx.AsyncBaseTransport] = None
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+
+    def _create(self, name: str) -> httpx.AsyncClient:
+        config = self.upstreams[name]
+        if self.transport is not None:
+            return httpx.AsyncClient(
+                transport=self.transport,
+                timeout=httpx.Timeout(config.timeout, connect=config.connect_timeout)
+            )
+
+        http2 = config.http2 and _http2_available()
+        if config.http2 and not http2:
+            print(f"⚠️ h2 paketi yok, {name} için HTTP/1.1 kullanılıyor")
+
+        return httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=config.max_connections,
+                max_keepalive_connections=config.max_keepalive,
+                keepalive_expiry=30
+            ),
+            timeout=httpx.Timeout(config.timeout, connect=config.connect_timeout),
+            http2=http2
+        )
+
+    def get(self, name: str) -> httpx.AsyncClient:
+        client = self._clients.get(name)
+        if client is None or client.is_closed:
+            client = self._create(name)
+            self._clients[name] = client
+        return client
+
+    async def start(self) -> None:
+        for name in self.upstreams:
+            self.get(name)
+
+    async def use_transport(self, transport: Optional[httpx.AsyncBaseTransport]) -> None:
+        """Mevcut client'ları kapat, sonrakiler verilen transport'u kullansın (None: gerçek ağ)"""
+        await self.aclose()
+        self.transport = transport
+
+    async def aclose(self) -> None:
+        clients, self._clients = self._clients, {}
+        for client in clients.values():
+            await client.aclose()
+
+
+http_clients = HttpClients(UPSTREAMS)
+
+
+def get_client(upstream: str) -> httpx.AsyncClient:
+    """Upstream için paylaşılan client'ı döndür"""
+    return http_clients.get(upstream)
@@ -0,0 +1,406 @@
+"""
+Teknokul İş Kuyruğu
+📥 Kalıcı kuyruk + sabit boyutlu worker havuzu + backpressure
+- Kuyruk doluysa 429 / Retry-After
+- Yeniden başlatmada yarım kalan işler tekrar kuyruğa alınır (max_attempts'e ulaşan iş failed olur)
+- Depolama arayüzü takılabilir (SQLite yerel, Postgres/Supabase için JobStore)
+"""
+
+import json
+import math
+import time
+import uuid
+import asyncio
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+
+
+@dataclass
+class Job:
+    id: str
+    status: str
+    payload: dict
+    result: Optional[dict] = None
+    error: Optional[str] = None
+    attempts: int = 0
+    created_at: float = 0.0
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    batch_id: Optional[str] = None
+
+    def to_dict(self) -> dict:
+        return {
+            "jobId": self.id,
+            "status": self.status,
+            "questionId": self.payload.get("question_id"),
+            "result": self.result,
+            "error": self.error,
+            "attempts": self.attempts,
+            "createdAt": self.created_at,
+            "startedAt": self.started_at,
+            "finishedAt": self.finished_at,
+            "batchId": self.batch_id,
+        }
+
+
+class QueueFullError(Exception):
+    """Kuyruk dolu - istemci retry_after saniye sonra tekrar denemeli"""
+
+    def __init__(self, depth: int, retry_after: int):
+        super().__init__(f"Kuyruk dolu ({depth} iş bekliyor)")
+        self.depth = depth
+        self.retry_after = retry_after
+
+
+class JobStore(ABC):
+    """
+    İş deposu arayüzü
+    Postgres/Supabase gibi paylaşılan bir depo için bu sınıftan türetilir;
+    claim_next atomik olmalı (aynı işi iki worker almamalı)
+    """
+
+    @abstractmethod
+    def create(self, job_id: str, payload: dict, batch_id: Optional[str] = None) -> Job: ...
+
+    @abstractmethod
+    def create_many(self, jobs: List[tuple], batch_id: str) -> List[Job]: ...
+
+    @abstractmethod
+    def claim_next(self) -> Optional[Job]: ...
+
+    @abstractmethod
+    def finish(self, job_id: str, status: str, result: Optional[dict] = None,
+               error: Optional[str] = None) -> None: ...
+
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[Job]: ...
+
+    @abstractmethod
+    def list_batch(self, batch_id: str) -> List[Job]: ...
+
+    @abstractmethod
+    def count(self, statuses: List[str]) -> int: ...
+
+    @abstractmethod
+    def requeue_running(self, max_attempts: int) -> Tuple[int, int]: ...
+
+
+class SQLiteJobStore(JobStore):
+    """Yerel SQLite deposu (WAL modu, tek bağlantı + kilit)"""
+
+    def __init__(self, path: Path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                result TEXT,
+                error TEXT,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL,
+                started_at REAL,
+                finished_at REAL,
+                batch_id TEXT
+            )
+        """)
+        columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        if "batch_id" not in columns:
+            self._conn.execute("ALTER TABLE jobs ADD COLUMN batch_id TEXT")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_status_created ON jobs (status, created_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_batch ON jobs (batch_id)")
+
+    @staticmethod
+    def _row_to_job(row: sqlite3.Row) -> Job:
+        return Job(
+            id=row["id"],
+            status=row["status"],
+            payload=json.loads(row["payload"]),
+            result=json.loads(row["result"]) if row["result"] else None,
+            error=row["error"],
+            attempts=row["attempts"],
+            created_at=row["created_at"],
+            started_at=row["started_at"],
+            finished_at=row["finished_at"],
+            batch_id=row["batch_id"],
+        )
+
+    def create(self, job_id: str, payload: dict, batch_id: Optional[str] = None) -> Job:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, status, payload, created_at, batch_id) VALUES (?, ?, ?, ?, ?)",
+                (job_id, JOB_QUEUED, json.dumps(payload, ensure_ascii=False), now, batch_id)
+            )
+        return Job(id=job_id, status=JOB_QUEUED, payload=payload, created_at=now, batch_id=batch_id)
+
+    def create_many(self, jobs: List[tuple], batch_id: str) -> List[Job]:
+        """[(job_id, payload)] tek transaction'da, verilen sırayla kuyruğa alınır"""
+        now = time.time()
+        # created_at sırası claim sırasıdır: mikro saniye farkla sırayı koru
+        rows = [(job_id, JOB_QUEUED, json.dumps(payload, ensure_ascii=False), now + i * 1e-6, batch_id)
+                for i, (job_id, payload) in enumerate(jobs)]
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(
+                    "INSERT INTO jobs (id, status, payload, created_at, batch_id) VALUES (?, ?, ?, ?, ?)",
+                    rows
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return [Job(id=r[0], status=JOB_QUEUED, payload=payload, created_at=r[3], batch_id=batch_id)
+                for r, (_, payload) in zip(rows, jobs)]
+
+    def claim_next(self) -> Optional[Job]:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT * FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1", (JOB_QUEUED,)
+                ).fetchone()
+                if row is None:
+                    self._conn.execute("COMMIT")
+                    return None
+                now = time.time()
+                self._conn.execute(
+                    "UPDATE jobs SET status = ?, started_at = ?, attempts = attempts + 1 WHERE id = ?",
+                    (JOB_RUNNING, now, row["id"])
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+        job = self._row_to_job(row)
+        job.status = JOB_RUNNING
+        job.started_at = now
+        job.attempts += 1
+        return job
+
+    def finish(self, job_id: str, status: str, result: Optional[dict] = None,
+               error: Optional[str] = None) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ? WHERE id = ?",
+                (status, json.dumps(result, ensure_ascii=False) if result is not None else None,
+                 error, time.time(), job_id)
+            )
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def list_batch(self, batch_id: str) -> List[Job]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM jobs WHERE batch_id = ? ORDER BY created_at", (batch_id,)
+            ).fetchall()
+        return [self._row_to_job(row) for row in rows]
+
+    def count(self, statuses: List[str]) -> int:
+        placeholders = ",".join("?" * len(statuses))
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT COUNT(*) FROM jobs WHERE status IN ({placeholders})", statuses
+            ).fetchone()
+        return row[0]
+
+    def requeue_running(self, max_attempts: int) -> Tuple[int, int]:
+        """
+        Yarım kalan işleri kuyruğa geri al, (tekrar kuyruğa alınan, failed işaretlenen) döndür
+        - max_attempts kez alınıp bitmeyen iş (instance'ı düşüren iş, örn. Manim OOM) tekrar denenmez
+        """
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                failed = self._conn.execute(
+                    "UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE status = ? AND attempts >= ?",
+                    (JOB_FAILED, f"İş {max_attempts} denemede tamamlanamadı (instance yeniden başladı)",
+                     time.time(), JOB_RUNNING, max_attempts)
+                ).rowcount
+                requeued = self._conn.execute(
+                    "UPDATE jobs SET status = ?, started_at = NULL WHERE status = ?",
+                    (JOB_QUEUED, JOB_RUNNING)
+                ).rowcount
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return requeued, failed
+
+
+def create_job_store(url: str) -> JobStore:
+    """
+    JOB_STORE_URL'den depo oluştur
+    - sqlite:///path/to/jobs.db
+    """
+    if url.startswith("sqlite:///"):
+        return SQLiteJobStore(Path(url[len("sqlite:///"):]))
+    raise ValueError(f"Desteklenmeyen JOB_STORE_URL: {url} (JobStore arayüzünü uygulayan bir depo ekleyin)")
+
+
+JobHandler = Callable[[dict], Awaitable[dict]]
+
+
+class JobQueue:
+    """
+    Kalıcı kuyruk üzerinde sabit boyutlu worker havuzu
+    - max_depth: bekleyen + çalışan iş sınırı, aşılırsa QueueFullError
+      (sayım + ekleme _admission kilidi altında: eşzamanlı submit'ler sınırı birlikte aşamaz)
+    - max_attempts: yeniden başlatmada tekrar kuyruğa alınma sınırı
+    - Worker'lar yeni iş gelince uyanır, diğer instance'ların eklediği
+      işler için poll_interval aralıkla da kontrol eder
+    """
+
+    def __init__(self, store: JobStore, handler: JobHandler, workers: int,
+                 max_depth: int, max_attempts: int = 3, poll_interval: float = 2.0):
+        self.store = store
+        self.handler = handler
+        self.workers = max(1, workers)
+        self.max_depth = max_depth
+        self.max_attempts = max(1, max_attempts)
+        self.poll_interval = poll_interval
+        self.in_flight = 0
+        self._avg_job_seconds = 90.0
+        self._wakeup = asyncio.Event()
+        self._admission = asyncio.Lock()
+        self._tasks: List[asyncio.Task] = []
+        self._waiters: Dict[str, asyncio.Future] = {}
+
+    async def start(self) -> None:
+        requeued, failed = await asyncio.to_thread(self.store.requeue_running, self.max_attempts)
+        if requeued:
+            print(f"♻️ Yarım kalan {requeued} iş tekrar kuyruğa alındı")
+        if failed:
+            print(f"⚠️ {self.max_attempts} denemede bitmeyen {failed} iş failed olarak işaretlendi")
+        self._tasks = [asyncio.create_task(self._worker(i), name=f"job-worker-{i}")
+                       for i in range(self.workers)]
+        print(f"👷 İş kuyruğu başladı ({self.workers} worker, max {self.max_depth} iş)")
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def depth(self) -> int:
+        return await asyncio.to_thread(self.store.count, [JOB_QUEUED, JOB_RUNNING])
+
+    def retry_after(self, depth: int) -> int:
+        """Kuyruğun bir worker'a yer açmasına kadar tahmini süre"""
+        waves = math.ceil(max(1, depth - self.max_depth + 1) / self.workers)
+        return max(5, int(waves * self._avg_job_seconds))
+
+    async def submit(self, payload: dict) -> str:
+        async with self._admission:
+            depth = await self.depth()
+            if depth >= self.max_depth:
+                raise QueueFullError(depth, self.retry_after(depth))
+
+            job_id = uuid.uuid4().hex
+            await asyncio.to_thread(self.store.create, job_id, payload)
+        self._wakeup.set()
+        return job_id
+
+    async def submit_batch(self, payloads: List[dict], key: Optional[Callable[[dict], Any]] = None) -> tuple:
+        """
+        Toplu işleri tek seferde kuyruğa al, (batch_id, [job_id]) döndür
+        - Yalnızca kuyrukta yer olan kadarı (baştan) kabul edilir: [job_id] payloads'ın ilk len([job_id])
+          elemanına karşılık gelir, kalanlar için istemci retry_after sonra tekrar gönderir
+        - Hiç yer yoksa QueueFullError
+        - key: kabul edilen işlerin çalışma sırası (aynı dersler art arda gelsin diye), eşitlikte verilen sıra
+        """
+        async with self._admission:
+            depth = await self.depth()
+            if depth >= self.max_depth:
+                raise QueueFullError(depth, self.retry_after(depth))
+
+            batch_id = uuid.uuid4().hex
+            jobs = [(uuid.uuid4().hex, payload) for payload in payloads[:self.max_depth - depth]]
+            ordered = sorted(jobs, key=lambda job: key(job[1])) if key else jobs
+            await asyncio.to_thread(self.store.create_many, ordered, batch_id)
+        self._wakeup.set()
+        return batch_id, [job_id for job_id, _ in jobs]
+
+    async def get_batch(self, batch_id: str) -> List[Job]:
+        return await asyncio.to_thread(self.store.list_batch, batch_id)
+
+    async def wait(self, job_id: str, timeout: float) -> Optional[Job]:
+        """
+        İş bitene kadar bekle, en fazla timeout saniye; son durumu döndür (bitmemiş olabilir)
+        - Future durum okunmadan önce kaydedilir: arada biten iş kaçırılmaz
+        - Başka instance'ta çalışan iş için poll_interval aralıkla durum okunur
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        future = self._waiters.setdefault(job_id, loop.create_future())
+        try:
+            while True:
+                job = await self.get(job_id)
+                remaining = deadline - loop.time()
+                if job is None or job.status in (JOB_COMPLETED, JOB_FAILED) or remaining <= 0:
+                    return job
+                try:
+                    await asyncio.wait_for(asyncio.shield(future), timeout=min(self.poll_interval, remaining))
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            if self._waiters.get(job_id) is future:
+                del self._waiters[job_id]
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        return await asyncio.to_thread(self.store.get, job_id)
+
+    async def _worker(self, index: int) -> None:
+        while True:
+            # claim_next'ten önce temizlenir: sorgu ile bekleme arasında gelen submit uyandırmayı kaybetmez
+            self._wakeup.clear()
+            job = await asyncio.to_thread(self.store.claim_next)
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            self.in_flight += 1
+            started = time.monotonic()
+            try:
+                result = await self.handler(job.payload)
+                success = bool(result.get("success")) if isinstance(result, dict) else True
+                await asyncio.to_thread(
+                    self.store.finish, job.id,
+                    JOB_COMPLETED if success else JOB_FAILED,
+                    result, None if success else (result or {}).get("error")
+                )
+            except asyncio.CancelledError:
+                # Kapanışta yarım kalan iş: bir sonraki başlangıçta requeue_running ile döner
+                raise
+            except Exception as e:
+                print(f"❌ İş hatası ({job.id}): {e}")
+                await asyncio.to_thread(self.store.finish, job.id, JOB_FAILED, None, str(e))
+            finally:
+                self.in_flight -= 1
+                elapsed = time.monotonic() - started
+                self._avg_job_seconds = 0.8 * self._avg_job_seconds + 0.2 * elapsed
+                future = self._waiters.pop(job.id, None)
+                if future and not future.done():
+                    future.set_result(None)
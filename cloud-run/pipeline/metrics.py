@@ -0,0 +1,154 @@
+"""
+Teknokul Metrikler
+📊 Adım süreleri (LLM, TTS, ffprobe, manim, ffmpeg, upload, DB) histogram olarak
+Prometheus text formatında /metrics'ten yayınlanır
+- Aynı süreler iş bazında toplanıp callback payload'una eklenir (contextvar)
+- Harici bağımlılık yok
+"""
+
+import time
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Saniye: kısa ffprobe'lardan uzun manim render'larına kadar
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300, 600)
+
+# Çalışan işin adım kayıtları (process_video başında start_job_steps ile set edilir)
+_job_steps: ContextVar[Optional[List[dict]]] = ContextVar("job_steps", default=None)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Tuple[Tuple[str, str], ...], **extra) -> str:
+    pairs = list(labels) + list(extra.items())
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+class Histogram:
+    """Etiketli kümülatif histogram"""
+
+    def __init__(self, name: str, help_text: str, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple[Tuple[str, str], ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # [bucket sayaçları..., toplam, adet]
+                series = self._series[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = [(key, list(series)) for key, series in sorted(self._series.items())]
+        for key, series in items:
+            for i, bound in enumerate(self.buckets):
+                lines.append(f"{self.name}_bucket{_format_labels(key, le=bound)} {series[i]}")
+            lines.append(f"{self.name}_bucket{_format_labels(key, le='+Inf')} {series[-1]}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {series[-2]:.6f}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {series[-1]}")
+        return lines
+
+
+class Gauge:
+    """Değeri okuma anında hesaplanan ölçüm (kuyruk derinliği, cache oranı)"""
+
+    def __init__(self, name: str, help_text: str, metric_type: str = "gauge"):
+        self.name = name
+        self.help_text = help_text
+        self.metric_type = metric_type
+        self._values: Dict[Tuple[Tuple[str, str], ...], float] = {}
+
+    def set(self, value: float, **labels) -> None:
+        self._values[tuple(sorted(labels.items()))] = value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.metric_type}"]
+        for key, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(key)} {value}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+
+    def histogram(self, name: str, help_text: str, buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._metrics.setdefault(name, Histogram(name, help_text, buckets))
+
+    def gauge(self, name: str, help_text: str, metric_type: str = "gauge") -> Gauge:
+        return self._metrics.setdefault(name, Gauge(name, help_text, metric_type))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+METRICS = MetricsRegistry()
+
+STEP_SECONDS = METRICS.histogram(
+    "teknokul_step_seconds", "Dış çağrı ve alt süreç adımlarının süresi (LLM, TTS, ffmpeg, manim, upload, DB)"
+)
+STAGE_SECONDS = METRICS.histogram("teknokul_stage_seconds", "process_video aşama süreleri")
+JOB_SECONDS = METRICS.histogram("teknokul_job_seconds", "Video işinin toplam süresi")
+
+
+def record_step(step: str, seconds: float, ok: bool = True) -> None:
+    """Adım süresini histograma ve (varsa) çalışan işin kayıtlarına ekle"""
+    STEP_SECONDS.observe(seconds, step=step, status="ok" if ok else "error")
+    steps = _job_steps.get()
+    if steps is not None:
+        steps.append({"step": step, "seconds": round(seconds, 3), "ok": ok})
+
+
+class StepTimer:
+    def __init__(self, step: str):
+        self.step = step
+        self.ok = True
+
+
+@contextmanager
+def timed(step: str) -> Iterator[StepTimer]:
+    """
+    Bir adımı ölç
+    - İstisna yükselirse hata olarak kaydedilir
+    - Dönüş değeriyle başarısızlık bildiren çağrılar timer.ok = False yapar
+    """
+    timer = StepTimer(step)
+    started = time.monotonic()
+    try:
+        yield timer
+    except BaseException:
+        timer.ok = False
+        raise
+    finally:
+        record_step(step, time.monotonic() - started, timer.ok)
+
+
+def start_job_steps() -> List[dict]:
+    """
+    Çalışan iş için yeni adım listesi başlat
+    - Aşama görevleri bağlamı devraldığı için alt görevlerdeki adımlar da buraya düşer
+    - Her worker görevi kendi bağlamında çalışır; bir sonraki iş listeyi yeniler
+    """
+    steps: List[dict] = []
+    _job_steps.set(steps)
+    return steps
@@ -0,0 +1,131 @@
+"""
+Teknokul Async Process Runner
+⚙️ ffmpeg / ffprobe / manim çağrıları event loop'u bloklamadan çalışır
+- asyncio.create_subprocess_exec + ayrı process grubu
+- Timeout veya iptalde tüm process grubu öldürülür
+- stdout/stderr sınırlı tamponlarla akış halinde okunur
+- Her adımın süresi ölçülür
+"""
+
+import os
+import time
+import signal
+import asyncio
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Sequence, Union
+
+from .metrics import record_step
+
+# Tampon sınırları: stdout baştan (ffprobe çıktısı), stderr sondan (hata mesajı sonda)
+MAX_STDOUT_BYTES = 256 * 1024
+MAX_STDERR_BYTES = 64 * 1024
+
+
+@dataclass
+class ProcessResult:
+    returncode: int
+    stdout: str
+    stderr: str
+    duration: float
+    timed_out: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.returncode == 0 and not self.timed_out
+
+
+async def _read_head(stream: asyncio.StreamReader, limit: int) -> bytes:
+    buffer = bytearray()
+    while True:
+        chunk = await stream.read(65536)
+        if not chunk:
+            return bytes(buffer)
+        if len(buffer) < limit:
+            buffer.extend(chunk[:limit - len(buffer)])
+
+
+async def _read_tail(stream: asyncio.StreamReader, limit: int) -> bytes:
+    buffer = bytearray()
+    while True:
+        chunk = await stream.read(65536)
+        if not chunk:
+            return bytes(buffer)
+        buffer.extend(chunk)
+        if len(buffer) > limit:
+            del buffer[:len(buffer) - limit]
+
+
+def _kill_group(process: asyncio.subprocess.Process) -> None:
+    """Process grubunu öldür (manim'in alt process'leri dahil)"""
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+async def run_process(cmd: Sequence[Union[str, Path]], timeout: float,
+                      cwd: Optional[Path] = None, step: Optional[str] = None) -> ProcessResult:
+    """
+    Komutu çalıştır ve bitmesini bekle
+    - Çalıştırılamazsa (örn. binary yok) OSError yükselir
+    - Timeout'ta process grubu öldürülür, timed_out=True döner
+    - Görev iptal edilirse process grubu öldürülüp CancelledError yeniden yükselir
+    """
+    step = step or Path(str(cmd[0])).name
+    started = time.monotonic()
+
+    process = await asyncio.create_subprocess_exec(
+        *[str(c) for c in cmd],
+        cwd=str(cwd) if cwd else None,
+        stdin=asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        start_new_session=True
+    )
+
+    readers = asyncio.gather(
+        _read_head(process.stdout, MAX_STDOUT_BYTES),
+        _read_tail(process.stderr, MAX_STDERR_BYTES)
+    )
+    timed_out = False
+
+    try:
+        await asyncio.wait_for(process.wait(), timeout=timeout)
+    except asyncio.TimeoutError:
+        timed_out = True
+        _kill_group(process)
+        await process.wait()
+    except asyncio.CancelledError:
+        _kill_group(process)
+        await process.wait()
+        readers.cancel()
+        raise
+
+    stdout, stderr = await readers
+    duration = time.monotonic() - started
+
+    status = "timeout" if timed_out else process.returncode
+    print(f"⏱️ {step}: {duration:.2f}s (exit: {status})")
+    record_step(step, duration, ok=process.returncode == 0 and not timed_out)
+
+    return ProcessResult(
+        returncode=process.returncode,
+        stdout=stdout.decode("utf-8", errors="replace"),
+        stderr=stderr.decode("utf-8", errors="replace"),
+        duration=duration,
+        timed_out=timed_out
+    )
+
+
+async def probe_duration(media_path: Path) -> Optional[float]:
+    """FFprobe ile dosya süresini al"""
+    try:
+        result = await run_process(
+            ["ffprobe", "-v", "error", "-show_entries", "format=duration",
+             "-of", "default=noprint_wrappers=1:nokey=1", media_path],
+            timeout=30, step="ffprobe"
+        )
+        return float(result.stdout.strip())
+    except Exception:
+        return None
@@ -0,0 +1,141 @@
+"""
+Teknokul Gemini Prompt Önbelleği
+📦 Ders başına sabit prompt önekini (SUPER_MANIM_PROMPT + ders ipuçları) Gemini context cache'e
+(cachedContents) bir kez kaydeder; çağrılar öneki tekrar göndermek yerine handle ile referans verir
+- Anahtar: (model, önek hash'i); önek değişirse yeni kayıt açılır
+- Kayıt arka planda yapılır: handle hazır olana kadar (veya kayıt başarısızsa) önek inline gider
+- TTL dolmadan refresh_margin kala yeni kayıt açılır; başarısız kayıt retry_after boyunca denenmez
+- Açılışta load(): başka instance'ların açtığı geçerli kayıtlar (displayName = teknokul-<hash>) devralınır
+"""
+
+import time
+import asyncio
+import hashlib
+from datetime import datetime, timezone
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from .http import get_client
+
+GEMINI_API_BASE = "https://generativelanguage.googleapis.com/v1beta"
+DISPLAY_PREFIX = "teknokul-"
+
+
+def _seconds_until(expire_time: str) -> float:
+    """RFC 3339 expireTime'a kalan süre (kesirli saniye yok sayılır)"""
+    expires = datetime.strptime(expire_time[:19], "%Y-%m-%dT%H:%M:%S").replace(tzinfo=timezone.utc)
+    return (expires - datetime.now(timezone.utc)).total_seconds()
+
+
+@dataclass
+class CachedPrefix:
+    name: Optional[str]
+    expires: float
+
+
+class GeminiPromptCache:
+    """(model, önek) → cachedContents handle kayıt defteri (instance başına, bellekte)"""
+
+    def __init__(self, api_key: str, ttl: int = 3600, refresh_margin: int = 300, retry_after: int = 600):
+        self.api_key = api_key
+        self.ttl = ttl
+        self.refresh_margin = refresh_margin
+        self.retry_after = retry_after
+        self._entries: Dict[Tuple[str, str], CachedPrefix] = {}
+        self._pending: Dict[Tuple[str, str], asyncio.Task] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(model: str, prefix: str) -> Tuple[str, str]:
+        return model, hashlib.sha256(prefix.encode("utf-8")).hexdigest()
+
+    def handle(self, model: str, prefix: str, label: str = "") -> Optional[str]:
+        """
+        Önek için geçerli cachedContents adı; yoksa None (çağıran öneki inline gönderir)
+        - Eksik / süresi dolmak üzere olan kayıt arka planda yenilenir
+        """
+        key = self._key(model, prefix)
+        entry = self._entries.get(key)
+        now = time.monotonic()
+        if entry is not None and entry.expires - now > self.refresh_margin:
+            if entry.name:
+                self.hits += 1
+                return entry.name
+            # Kayıt yakın zamanda başarısız oldu: retry_after dolana kadar inline
+            self.misses += 1
+            return None
+
+        self.misses += 1
+        if key not in self._pending:
+            task = asyncio.create_task(self._register(key, model, prefix, label))
+            self._pending[key] = task
+            task.add_done_callback(lambda _: self._pending.pop(key, None))
+        return None
+
+    def invalidate(self, name: str) -> None:
+        """Gemini handle'ı tanımadı (silinmiş / süresi dolmuş): sonraki çağrı yeniden kaydeder"""
+        for key, entry in list(self._entries.items()):
+            if entry.name == name:
+                del self._entries[key]
+
+    async def _register(self, key: Tuple[str, str], model: str, prefix: str, label: str) -> None:
+        try:
+            response = await get_client("gemini").post(
+                f"{GEMINI_API_BASE}/cachedContents?key={self.api_key}",
+                json={
+                    "model": f"models/{model}",
+                    "displayName": DISPLAY_PREFIX + key[1],
+                    "contents": [{"role": "user", "parts": [{"text": prefix}]}],
+                    "ttl": f"{self.ttl}s",
+                },
+            )
+            if response.status_code == 200:
+                self._entries[key] = CachedPrefix(response.json()["name"], time.monotonic() + self.ttl)
+                print(f"📦 Prompt öneki önbelleğe alındı ({label or model}, {len(prefix)} karakter)")
+                return
+            error = f"{response.status_code} - {response.text[:200]}"
+        except Exception as e:
+            error = str(e)
+        print(f"⚠️ Prompt öneki önbelleğe alınamadı ({label or model}), inline devam: {error}")
+        self._entries[key] = CachedPrefix(None, time.monotonic() + self.retry_after + self.refresh_margin)
+
+    async def load(self) -> int:
+        """Gemini'de hâlâ geçerli olan önceki kayıtları devral (instance yeniden başladığında tekrar ödeme yok)"""
+        client = get_client("gemini")
+        adopted, page_token = 0, ""
+        try:
+            while True:
+                response = await client.get(
+                    f"{GEMINI_API_BASE}/cachedContents",
+                    params={"key": self.api_key, "pageSize": 100, "pageToken": page_token},
+                )
+                if response.status_code != 200:
+                    print(f"⚠️ Prompt önbelleği listelenemedi: {response.status_code}")
+                    break
+                data = response.json()
+                for item in data.get("cachedContents", []):
+                    display_name = item.get("displayName", "")
+                    if not display_name.startswith(DISPLAY_PREFIX) or "expireTime" not in item:
+                        continue
+                    key = (item["model"].split("/", 1)[-1], display_name[len(DISPLAY_PREFIX):])
+                    remaining = _seconds_until(item["expireTime"])
+                    entry = self._entries.get(key)
+                    if remaining > self.refresh_margin and (entry is None or entry.expires < time.monotonic() + remaining):
+                        self._entries[key] = CachedPrefix(item["name"], time.monotonic() + remaining)
+                        adopted += 1
+                page_token = data.get("nextPageToken", "")
+                if not page_token:
+                    break
+        except Exception as e:
+            print(f"⚠️ Prompt önbelleği listelenemedi: {e}")
+        return adopted
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "entries": sum(1 for entry in self._entries.values() if entry.name),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+        }
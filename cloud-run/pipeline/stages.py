@@ -0,0 +1,90 @@
+"""
+Teknokul Stage Graph - Eşzamanlı Aşama Yürütücü
+⚡ Pipeline aşamalarını t=0'da başlatır, her aşama yalnızca
+gerçekten ihtiyaç duyduğu sonuçları bekler
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+StageFunc = Callable[["StageContext"], Awaitable[Any]]
+
+
+class StageContext:
+    """Aşamaların birbirinin sonucuna eriştiği bağlam"""
+
+    def __init__(self, graph: "StageGraph"):
+        self._graph = graph
+
+    async def result(self, name: str) -> Any:
+        """
+        Başka bir aşamanın sonucunu bekle
+        - Koşullu join: aşama yalnızca ihtiyaç duyduğu dalda bekler
+        """
+        if name not in self._graph._tasks:
+            raise KeyError(f"Bilinmeyen aşama: {name}")
+        return await asyncio.shield(self._graph._tasks[name])
+
+
+class StageGraph:
+    """
+    Aşama grafiği
+    - Tüm aşamalar run() çağrısında aynı anda başlar
+    - Bağımlılıklar ctx.result(...) ile çalışma anında çözülür
+    - Her aşamanın başlangıç/bitiş zamanı kaydedilir
+    """
+
+    def __init__(self):
+        self._stages: Dict[str, StageFunc] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self.timings: Dict[str, dict] = {}
+
+    def add(self, name: str, func: StageFunc) -> "StageGraph":
+        if name in self._stages:
+            raise ValueError(f"Aşama zaten tanımlı: {name}")
+        self._stages[name] = func
+        return self
+
+    async def _run_stage(self, name: str, func: StageFunc, ctx: StageContext, t0: float) -> Any:
+        started = time.monotonic()
+        try:
+            return await func(ctx)
+        finally:
+            finished = time.monotonic()
+            self.timings[name] = {
+                "start": round(started - t0, 3),
+                "end": round(finished - t0, 3),
+                "duration": round(finished - started, 3),
+            }
+
+    async def run(self, until: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Grafiği çalıştır
+        - until verilirse o aşama bitince döner, bekleyen diğer aşamalar iptal edilir
+        - Bir aşama hata verirse kalan aşamalar iptal edilip hata yükseltilir
+        """
+        ctx = StageContext(self)
+        t0 = time.monotonic()
+        self._tasks = {
+            name: asyncio.create_task(self._run_stage(name, func, ctx, t0), name=f"stage:{name}")
+            for name, func in self._stages.items()
+        }
+
+        try:
+            if until:
+                await self._tasks[until]
+            else:
+                await asyncio.gather(*self._tasks.values())
+        finally:
+            pending = [t for t in self._tasks.values() if not t.done()]
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+        return {
+            name: task.result()
+            for name, task in self._tasks.items()
+            if task.done() and not task.cancelled() and task.exception() is None
+        }
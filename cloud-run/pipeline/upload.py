@@ -0,0 +1,193 @@
+"""
+Teknokul Supabase Storage Yükleme
+📤 TUS protokolü ile parça parça, kaldığı yerden devam eden yükleme
+- Dosya tek seferde belleğe okunmaz (bellek kullanımı video boyutundan bağımsız)
+- Geçici hatada sunucudaki son onaylı offset'ten devam edilir
+- Yükleme hızı raporlanır
+"""
+
+import os
+import time
+import uuid
+import base64
+import asyncio
+from pathlib import Path
+from typing import AsyncIterator, Dict, Optional, Tuple
+from urllib.parse import urljoin
+
+from .http import get_client
+
+SUPABASE_URL = os.getenv("SUPABASE_URL", "")
+SUPABASE_SERVICE_KEY = os.getenv("SUPABASE_SERVICE_KEY", "")
+
+# Supabase resumable upload 6 MB parça bekler (son parça hariç)
+TUS_CHUNK_SIZE = 6 * 1024 * 1024
+TUS_MAX_RETRIES = 5
+TUS_VERSION = "1.0.0"
+
+
+class ResumableUploadError(Exception):
+    """Yükleme tekrar denemelere rağmen tamamlanamadı"""
+
+
+async def iter_file(path: Path, chunk_size: int = 256 * 1024) -> AsyncIterator[bytes]:
+    """Dosyayı parça parça oku (httpx streaming body için)"""
+    with open(path, "rb") as f:
+        while True:
+            chunk = await asyncio.to_thread(f.read, chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+
+def multipart_file_body(fields: Dict[str, str], file_field: str, path: Path, filename: str,
+                        content_type: str = "application/octet-stream") -> Tuple[dict, AsyncIterator[bytes]]:
+    """
+    multipart/form-data gövdesi: metin alanları + tek dosya, dosya iter_file ile akıtılır
+    - httpx files= senkron dosya nesnesini event loop'ta okur; bu gövde okumaları thread'de yapar
+    - (headers, gövde) döndürür; Content-Length önceden hesaplanır
+    """
+    boundary = uuid.uuid4().hex
+    head = b"".join(
+        f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n'.encode("utf-8")
+        + value.encode("utf-8") + b"\r\n"
+        for name, value in fields.items()
+    ) + (
+        f'--{boundary}\r\nContent-Disposition: form-data; name="{file_field}"; filename="{filename}"\r\n'
+        f"Content-Type: {content_type}\r\n\r\n"
+    ).encode("utf-8")
+    tail = f"\r\n--{boundary}--\r\n".encode("ascii")
+    headers = {
+        "Content-Type": f"multipart/form-data; boundary={boundary}",
+        "Content-Length": str(len(head) + Path(path).stat().st_size + len(tail)),
+    }
+
+    async def body() -> AsyncIterator[bytes]:
+        yield head
+        async for chunk in iter_file(path):
+            yield chunk
+        yield tail
+
+    return headers, body()
+
+
+def _read_chunk(path: Path, offset: int, size: int) -> bytes:
+    with open(path, "rb") as f:
+        f.seek(offset)
+        return f.read(size)
+
+
+def _encode_metadata(values: dict) -> str:
+    return ",".join(
+        f"{key} {base64.b64encode(str(value).encode('utf-8')).decode('ascii')}"
+        for key, value in values.items()
+    )
+
+
+class ResumableUpload:
+    """
+    Tek dosya için TUS yüklemesi
+    1. POST /storage/v1/upload/resumable → Location (yükleme URL'i)
+    2. PATCH ile parçalar, her yanıtta Upload-Offset onaylanır
+    3. Hata olursa HEAD ile sunucudaki offset okunup oradan devam edilir
+    """
+
+    def __init__(self, path: Path, bucket: str, object_name: str,
+                 content_type: str = "application/octet-stream", upsert: bool = True,
+                 chunk_size: int = TUS_CHUNK_SIZE, max_retries: int = TUS_MAX_RETRIES):
+        self.path = Path(path)
+        self.bucket = bucket
+        self.object_name = object_name
+        self.content_type = content_type
+        self.upsert = upsert
+        self.chunk_size = chunk_size
+        self.max_retries = max_retries
+        self.size = self.path.stat().st_size
+        self.upload_url: Optional[str] = None
+        self.offset = 0
+
+    def _headers(self, **extra) -> dict:
+        headers = {
+            "Authorization": f"Bearer {SUPABASE_SERVICE_KEY}",
+            "Tus-Resumable": TUS_VERSION,
+        }
+        headers.update(extra)
+        return headers
+
+    async def _create(self) -> None:
+        client = get_client("supabase")
+        endpoint = f"{SUPABASE_URL}/storage/v1/upload/resumable"
+        response = await client.post(endpoint, headers=self._headers(**{
+            "Upload-Length": str(self.size),
+            "Upload-Metadata": _encode_metadata({
+                "bucketName": self.bucket,
+                "objectName": self.object_name,
+                "contentType": self.content_type,
+                "cacheControl": "3600",
+            }),
+            "x-upsert": "true" if self.upsert else "false",
+        }), timeout=30)
+        if response.status_code != 201 or "location" not in response.headers:
+            raise ResumableUploadError(f"Yükleme başlatılamadı: {response.status_code}")
+        self.upload_url = urljoin(endpoint, response.headers["location"])
+
+    async def _server_offset(self) -> int:
+        client = get_client("supabase")
+        response = await client.head(self.upload_url, headers=self._headers(), timeout=30)
+        if response.status_code not in (200, 204) or "upload-offset" not in response.headers:
+            raise ResumableUploadError(f"Offset okunamadı: {response.status_code}")
+        return int(response.headers["upload-offset"])
+
+    async def _send_chunk(self) -> None:
+        chunk = await asyncio.to_thread(_read_chunk, self.path, self.offset, self.chunk_size)
+        client = get_client("supabase")
+        response = await client.patch(self.upload_url, headers=self._headers(**{
+            "Upload-Offset": str(self.offset),
+            "Content-Type": "application/offset+octet-stream",
+        }), content=chunk, timeout=120)
+        if response.status_code != 204:
+            raise ResumableUploadError(f"Parça reddedildi: {response.status_code}")
+        self.offset = int(response.headers.get("upload-offset", self.offset + len(chunk)))
+
+    async def run(self) -> float:
+        """Yüklemeyi tamamla, saniye cinsinden süreyi döndür"""
+        started = time.monotonic()
+        failures = 0
+
+        while True:
+            try:
+                if self.upload_url is None:
+                    await self._create()
+                elif failures:
+                    # Sunucunun onayladığı son offset'ten devam
+                    self.offset = await self._server_offset()
+                if self.offset >= self.size:
+                    break
+                await self._send_chunk()
+                failures = 0
+            except Exception as e:
+                failures += 1
+                if failures > self.max_retries:
+                    raise ResumableUploadError(f"{self.object_name}: {e}") from e
+                delay = min(2 ** failures, 30)
+                print(f"⚠️ Yükleme hatası ({e}), {self.offset}/{self.size} byte'tan "
+                      f"{delay}s sonra devam edilecek")
+                await asyncio.sleep(delay)
+
+        elapsed = time.monotonic() - started
+        mb = self.size / (1024 * 1024)
+        print(f"📤 {self.object_name}: {mb:.1f} MB, {elapsed:.1f}s, "
+              f"{mb / elapsed if elapsed > 0 else 0:.2f} MB/s")
+        return elapsed
+
+
+async def upload_file_resumable(path: Path, bucket: str, object_name: str,
+                                content_type: str = "application/octet-stream",
+                                upsert: bool = True) -> bool:
+    """Dosyayı TUS ile yükle, başarılıysa True"""
+    try:
+        await ResumableUpload(path, bucket, object_name, content_type, upsert).run()
+        return True
+    except ResumableUploadError as e:
+        print(f"⚠️ Resumable upload başarısız: {e}")
+        return False
@@ -4,7 +4,7 @@ Her ders için özelleştirilmiş AI prompt'ları
 """
 
 # Super prompt sistemini import et
-from .super_prompt import get_full_prompt, SUPER_MANIM_PROMPT, create_user_prompt, get_subject_hints
+from .super_prompt import get_full_prompt, build_system_prompt, SUPER_MANIM_PROMPT, create_user_prompt, get_subject_hints, get_subject_hint_key
 
 # Varyasyon sistemini import et
 from .variations import (
@@ -17,6 +17,7 @@ from .variations import (
     get_step_count_variation,
     should_add_emoji,
     get_varied_system_prompt,
+    get_variation_directives,
 )
 
 # Matematik Prompt
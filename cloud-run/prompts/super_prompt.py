@@ -4,10 +4,12 @@ Teknokul Video Fabrikası - Süper Prompt Sistemi v1.1
 🎨 Varyasyon sistemi entegre - AI pattern önleme
 """
 
+from typing import Optional
+
 from .variations import (
     get_random_hook,
     get_random_closing,
-    get_varied_system_prompt,
+    get_variation_directives,
     should_add_emoji,
     SUBJECT_SPECIFIC_PHRASES
 )
@@ -351,36 +353,57 @@ GÖRSEL İPUÇLARI:
 }
 
 
+def get_subject_hint_key(subject_name: str) -> Optional[str]:
+    """Ders adının eşleştiği SUBJECT_HINTS anahtarı ("10. Sınıf Matematik" → "Matematik"), yoksa None"""
+    subject = subject_name or ""
+    # "MATEMATİK" gibi Türkçe büyük harfler: İ→i, I→ı (ASCII "FIZIK" için düz lower da denenir)
+    candidates = (subject.lower(), subject.replace("İ", "i").replace("I", "ı").lower())
+    for key in SUBJECT_HINTS:
+        if any(key.lower() in candidate for candidate in candidates):
+            return key
+    return None
+
+
 def get_subject_hints(subject_name: str) -> str:
     """Ders bazlı ek ipuçları döndür"""
-    for key in SUBJECT_HINTS:
-        if key.lower() in subject_name.lower():
-            return SUBJECT_HINTS[key]
-    return ""
+    key = get_subject_hint_key(subject_name)
+    return SUBJECT_HINTS[key] if key else ""
 
 
 # =============================================================================
 # ANA FONKSİYON
 # =============================================================================
 
+def build_system_prompt(subject_name: str) -> str:
+    """
+    Ders için sistem promptu: SUPER_MANIM_PROMPT + ders ipuçları
+    📦 Rastgelelik içermez: aynı ders için her çağrıda birebir aynı önek
+    - Gemini context cache'e ders başına bir kez kaydedilip handle ile kullanılır
+    - Başlıkta ham ders adı değil eşleşen SUBJECT_HINTS anahtarı kullanılır:
+      "matematik", "Matematik 9" vb. aynı öneki (aynı önbellek kaydını) paylaşır
+    - Ton/format varyasyonları get_full_prompt'ta kullanıcı promptuna eklenir
+    """
+    system_prompt = SUPER_MANIM_PROMPT
+    
+    # Ders ipuçları ekle
+    key = get_subject_hint_key(subject_name)
+    if key:
+        system_prompt += f"\n\n📚 {key.upper()} İÇİN EK İPUÇLARI:\n{SUBJECT_HINTS[key]}"
+    
+    return system_prompt
+
+
 def get_full_prompt(question_text: str, options: dict, correct_answer: str,
                     subject_name: str, topic_name: str, grade: int,
-                    explanation: str = None) -> tuple:
+                    explanation: str = None, system_prompt: str = None) -> tuple:
     """
     Tam prompt döndür: (system_prompt, user_prompt)
-    🎨 Her çağrıda farklı varyasyonlar uygulanır
+    - system_prompt: ders başına sabit önek (önbelleklenebilir); verilirse (toplu üretim) yeniden oluşturulmaz
+    - user_prompt: soru + 🎨 bu çağrının varyasyonları (ton, hook, kapanış, emoji)
     """
     
-    # Sistem promptu
-    system_prompt = SUPER_MANIM_PROMPT
-    
-    # 🎨 Varyasyon: Sistem promptuna ton/format varyasyonu ekle
-    system_prompt = get_varied_system_prompt(system_prompt, subject_name)
-    
-    # Ders ipuçları ekle
-    hints = get_subject_hints(subject_name)
-    if hints:
-        system_prompt += f"\n\n📚 {subject_name.upper()} İÇİN EK İPUÇLARI:\n{hints}"
+    if system_prompt is None:
+        system_prompt = build_system_prompt(subject_name)
     
     # 🎨 Varyasyon: Hook ve kapanış cümleleri
     hook_text = get_random_hook(subject=subject_name)
@@ -406,7 +429,8 @@ Her adımda farklı ifadeler tercih et. Monotonluktan kaçın.
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 """
     
-    user_prompt = user_prompt + variation_block
+    # 🎨 Varyasyon: Ton/format direktifleri önekte değil burada (önek her çağrıda aynı kalsın)
+    user_prompt = user_prompt + get_variation_directives(subject_name) + variation_block
     
     return system_prompt, user_prompt
 
@@ -419,6 +443,8 @@ __all__ = [
     'SUPER_MANIM_PROMPT',
     'create_user_prompt',
     'get_subject_hints',
+    'get_subject_hint_key',
     'get_full_prompt',
+    'build_system_prompt',
     'SUBJECT_HINTS'
 ]
@@ -304,6 +304,14 @@ def get_varied_system_prompt(base_prompt: str, subject: str = None) -> str:
     - Farklı ton direktifleri
     - Farklı format talepleri
     """
+    return base_prompt + get_variation_directives(subject)
+
+
+def get_variation_directives(subject: str = None) -> str:
+    """
+    Rastgele ton + format direktifi bloğu
+    - Sabit prompt önekinin arkasına (kullanıcı promptuna) eklenir, önek önbelleklenebilir kalır
+    """
     
     tone_variations = [
         "Samimi ve arkadaşça bir dil kullan.",
@@ -334,7 +342,7 @@ UYARILAR:
 - Doğal ve akıcı bir anlatım tercih et.
 """
     
-    return base_prompt + variation_addition
+    return variation_addition
 
 
 # =============================================================================
@@ -351,6 +359,7 @@ __all__ = [
     'get_step_count_variation',
     'should_add_emoji',
     'get_varied_system_prompt',
+    'get_variation_directives',
     'HOOK_VARIATIONS',
     'TIPS_VARIATIONS',
     'CLOSING_VARIATIONS',
@@ -4,13 +4,31 @@ Her ders için özelleştirilmiş Manim animasyonları
 """
 
 from .base import get_template_for_subject
-from .outro import get_outro_code, get_outro_integration_code
-from .smart_renderer import generate_smart_script, detect_animations
+from .outro import (
+    get_outro_code,
+    get_outro_integration_code,
+    get_outro_render_script,
+    get_ffmpeg_concat_command,
+    get_ffmpeg_concat_copy_command,
+    OUTRO_STYLE_VERSION
+)
+from .smart_renderer import generate_smart_script, generate_smart_sections, detect_animations, detect_animations_batch
+from .sections import ScriptSection, SectionedScript
+from .prewarm import get_prewarm_script
 
 __all__ = [
     'get_template_for_subject',
     'get_outro_code',
     'get_outro_integration_code',
+    'get_outro_render_script',
+    'get_ffmpeg_concat_command',
+    'get_ffmpeg_concat_copy_command',
+    'OUTRO_STYLE_VERSION',
     'generate_smart_script',
-    'detect_animations'
+    'generate_smart_sections',
+    'ScriptSection',
+    'SectionedScript',
+    'get_prewarm_script',
+    'detect_animations',
+    'detect_animations_batch'
 ]
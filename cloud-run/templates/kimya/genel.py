@@ -116,7 +116,7 @@ class VideoScene(Scene):
         color = color_map.get(color_name.upper(), "WHITE")
         
         # Her adımda farklı element göster
-        elements = [("H", BLUE, 0.3), ("O", RED, 0.4), ("C", PURPLE, 0.4), ("N", GREEN, 0.35), ("Na", ORANGE, 0.4), ("Cl", YELLOW, 0.35)]
+        elements = [("H", "BLUE", 0.3), ("O", "RED", 0.4), ("C", "PURPLE", 0.4), ("N", "GREEN", 0.35), ("Na", "ORANGE", 0.4), ("Cl", "YELLOW", 0.35)]
         elem = elements[i % len(elements)]
         
         script += f'''
@@ -129,7 +129,7 @@ class VideoScene(Scene):
         step_num.to_edge(UP, buff=1)
         
         # Element sembolü
-        element_circle = Circle(radius={elem[2]}, color="{elem[1]}", fill_opacity=0.9, stroke_width=0)
+        element_circle = Circle(radius={elem[2]}, color={elem[1]}, fill_opacity=0.9, stroke_width=0)
         element_circle.move_to(UP * 3.5)
         element_label = Text("{elem[0]}", font_size=28, color=WHITE, weight=BOLD)
         element_label.move_to(element_circle.get_center())
@@ -0,0 +1,163 @@
+"""
+Teknokul Animasyon Eşleştirici
+🔎 ANIMATION_PATTERNS tablosunu import anında derler, metni tek geçişte puanlar
+- Anahtar kelimeler: Aho-Corasick otomatı (küçük harfe çevrilmiş metin üzerinde)
+- Sayı ile başlayan kalıplar (\\d+ ...): tek birleşik regex, kalıp eşleşen her rakamda hepsi birden
+- Diğer kalıplar: bir kez derlenir, aynı kalıp birden fazla kategoride olsa da bir kez aranır
+- Puanlar eski döngüyle birebir aynı: kelime başına +2, kalıp başına +3
+"""
+
+import re
+import json
+import hashlib
+from collections import deque
+from typing import Dict, Iterable, List, Tuple
+
+KEYWORD_SCORE = 2
+PATTERN_SCORE = 3
+
+_NUMBER_PREFIX = r"\d+"
+
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick otomatı
+    - Geçişler fail zinciriyle önceden tamamlanır (DFA): karakter başına tek dict araması
+    - Çıktı: metinde geçen anahtar kelimelerin indeksleri
+    """
+
+    def __init__(self, keywords: List[str]):
+        self.keywords = keywords
+        goto: List[Dict[str, int]] = [{}]
+        outputs: List[Tuple[int, ...]] = [()]
+
+        for index, keyword in enumerate(keywords):
+            state = 0
+            for ch in keyword:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    goto.append({})
+                    outputs.append(())
+                    nxt = goto[state][ch] = len(goto) - 1
+                state = nxt
+            outputs[state] += (index,)
+
+        # BFS ile fail bağlantıları; her durum fail durumunun geçişlerini ve çıktılarını devralır
+        fail = [0] * len(goto)
+        delta = [dict(edges) for edges in goto]
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in delta[fail[state]].items():
+                delta[state].setdefault(ch, nxt)
+            for ch, nxt in goto[state].items():
+                fail[nxt] = delta[fail[state]].get(ch, 0) if state else 0
+                outputs[nxt] += outputs[fail[nxt]]
+                queue.append(nxt)
+
+        self._delta = delta
+        self._outputs = outputs
+
+    def find(self, text: str) -> set:
+        """Metinde geçen anahtar kelimelerin indeksleri"""
+        delta = self._delta
+        outputs = self._outputs
+        found = set()
+        state = 0
+        for ch in text:
+            state = delta[state].get(ch, 0)
+            if outputs[state]:
+                found.update(outputs[state])
+        return found
+
+
+class AnimationMatcher:
+    """
+    Kategori tablosundan derlenmiş puanlayıcı
+    - score(text): {kategori: puan}, sadece pozitifler, tablo sırasıyla
+    - score_many(texts): toplu puanlama (soru bankası sınıflandırma)
+    - fingerprint: tablo özeti (önceden hesaplanmış puanlar yalnızca aynı tabloyla geçerli)
+    """
+
+    def __init__(self, patterns: Dict[str, dict]):
+        self.categories = list(patterns)
+        self.fingerprint = hashlib.sha256(
+            json.dumps(patterns, sort_keys=True, ensure_ascii=False).encode("utf-8")
+        ).hexdigest()[:16]
+        category_index = {name: i for i, name in enumerate(self.categories)}
+
+        # Anahtar kelime -> kategoriler (tekrar eden kelime tekrar puanlanır, eski döngüdeki gibi)
+        keyword_ids: Dict[str, int] = {}
+        keyword_targets: List[List[int]] = []
+        # Kalıp -> kategoriler
+        pattern_targets: Dict[str, List[int]] = {}
+
+        for name, config in patterns.items():
+            cat = category_index[name]
+            for keyword in config["keywords"]:
+                key = keyword.lower()
+                if key not in keyword_ids:
+                    keyword_ids[key] = len(keyword_targets)
+                    keyword_targets.append([])
+                keyword_targets[keyword_ids[key]].append(cat)
+            for pattern in config["patterns"]:
+                pattern_targets.setdefault(pattern, []).append(cat)
+
+        self._automaton = KeywordAutomaton(list(keyword_ids))
+        self._keyword_targets = keyword_targets
+
+        # "\d+R" bir yerde eşleşir <=> bir rakamdan hemen sonra R eşleşir:
+        # her rakamda tüm R'ler isteğe bağlı lookahead gruplarıyla tek seferde denenir
+        # (önce "en az biri" lookahead'i: hiçbirinin eşleşmediği rakamlar C içinde atlanır)
+        suffixes, self._number_targets = [], []
+        self._other_patterns: List[Tuple[re.Pattern, List[int]]] = []
+        for pattern, targets in pattern_targets.items():
+            if pattern.startswith(_NUMBER_PREFIX):
+                suffixes.append(pattern[len(_NUMBER_PREFIX):])
+                self._number_targets.append(targets)
+            else:
+                self._other_patterns.append((re.compile(pattern, re.IGNORECASE), targets))
+
+        self._number_re = None
+        self._number_groups: List[int] = []
+        if suffixes:
+            any_suffix = "(?=" + "|".join(f"(?:{suffix})" for suffix in suffixes) + ")"
+            each_suffix = "".join(f"(?=(?P<n{i}>{suffix})?)" for i, suffix in enumerate(suffixes))
+            self._number_re = re.compile(r"\d" + any_suffix + each_suffix, re.IGNORECASE)
+            self._number_groups = [self._number_re.groupindex[f"n{i}"] for i in range(len(suffixes))]
+
+    def _number_hits(self, text: str) -> List[int]:
+        """Metinde eşleşen sayı kalıplarının indeksleri"""
+        pending = dict(enumerate(self._number_groups))
+        hits = []
+        for match in self._number_re.finditer(text):
+            for i, group in list(pending.items()):
+                if match.group(group) is not None:
+                    hits.append(i)
+                    del pending[i]
+            if not pending:
+                break
+        return hits
+
+    def score(self, text: str) -> Dict[str, int]:
+        totals = [0] * len(self.categories)
+
+        for keyword in self._automaton.find(text.lower()):
+            for cat in self._keyword_targets[keyword]:
+                totals[cat] += KEYWORD_SCORE
+
+        if self._number_re is not None:
+            for i in self._number_hits(text):
+                for cat in self._number_targets[i]:
+                    totals[cat] += PATTERN_SCORE
+
+        for regex, targets in self._other_patterns:
+            if regex.search(text):
+                for cat in targets:
+                    totals[cat] += PATTERN_SCORE
+
+        return {name: total for name, total in zip(self.categories, totals) if total > 0}
+
+    def score_many(self, texts: Iterable[str]) -> List[Dict[str, int]]:
+        score = self.score
+        return [score(text) for text in texts]
@@ -10,6 +10,9 @@ import os
 SUPABASE_URL = os.getenv("SUPABASE_URL", "")
 LOGO_PATH = "assets/teknokul-logo.png"
 
+# Outro tasarımı değiştiğinde artırılmalı (önceden render edilmiş klipleri geçersiz kılar)
+OUTRO_STYLE_VERSION = "2"
+
 OUTRO_SCENE_CODE = '''
 class OutroScene(Scene):
     def construct(self):
@@ -124,16 +127,56 @@ def get_outro_code() -> str:
     return OUTRO_SCENE_CODE
 
 
+def get_outro_render_script(width: int = 1080, height: int = 1920, fps: int = 30) -> str:
+    """Outro'yu tek başına render etmek için tam Manim script'i"""
+    return f'''from manim import *
+import numpy as np
+
+config.frame_width = 9
+config.frame_height = 16
+config.pixel_width = {width}
+config.pixel_height = {height}
+config.frame_rate = {fps}
+config.background_color = "#0f0f23"
+Text.set_default(font="Noto Sans")
+''' + OUTRO_SCENE_CODE
+
+
 # FFmpeg ile outro ekleme komutu
-def get_ffmpeg_concat_command(main_video: str, outro_video: str, output: str) -> list:
-    """İki videoyu birleştirmek için FFmpeg komutu"""
+def get_ffmpeg_concat_command(main_video: str, outro_video: str, output: str,
+                              with_audio: bool = True) -> list:
+    """İki videoyu birleştirmek için FFmpeg komutu (yeniden encode eder)"""
+    if with_audio:
+        filter_complex = "[0:v][0:a][1:v][1:a]concat=n=2:v=1:a=1[outv][outa]"
+        maps = ["-map", "[outv]", "-map", "[outa]"]
+        codecs = ["-c:v", "libx264", "-c:a", "aac"]
+    else:
+        filter_complex = "[0:v][1:v]concat=n=2:v=1:a=0[outv]"
+        maps = ["-map", "[outv]"]
+        codecs = ["-c:v", "libx264", "-pix_fmt", "yuv420p"]
+    
     return [
         "ffmpeg", "-y",
         "-i", main_video,
         "-i", outro_video,
-        "-filter_complex", "[0:v][0:a][1:v][1:a]concat=n=2:v=1:a=1[outv][outa]",
-        "-map", "[outv]", "-map", "[outa]",
-        "-c:v", "libx264", "-c:a", "aac",
+        "-filter_complex", filter_complex,
+        *maps,
+        *codecs,
+        output
+    ]
+
+
+def get_ffmpeg_concat_copy_command(list_file: str, output: str) -> list:
+    """
+    Codec parametreleri aynı videoları yeniden encode etmeden birleştir
+    (concat demuxer + stream copy)
+    """
+    return [
+        "ffmpeg", "-y",
+        "-f", "concat", "-safe", "0",
+        "-i", list_file,
+        "-c", "copy",
+        "-movflags", "+faststart",
         output
     ]
 
@@ -0,0 +1,79 @@
+"""
+Teknokul Text Önbelleği Isıtma
+🔥 Her videoda tekrar eden Text / MathTex'ler (logo, slogan, SONUÇ, ADIM 1-6, ders badge'leri,
+outro metinleri) container açılışında bir kez üretilir, render'lar Manim'in text önbelleğinden okur
+- Çağrılar template'lerin ürettiği koddan çıkarılır: template değişince liste de değişir
+- Manim önbellek anahtarı çağrının kendisidir (metin, font, boyut, kalınlık, renk): birebir aynı kalmalı
+"""
+
+import ast
+import textwrap
+from typing import List
+
+from .outro import get_outro_code, get_outro_integration_code
+from .smart_renderer import SMART_SCRIPT_HEADER, generate_smart_sections
+
+TEXT_CLASSES = {"Text", "MarkupText", "MathTex", "Tex"}
+
+# /info'daki desteklenen dersler: badge metni ders adının büyük harfi
+PREWARM_SUBJECTS = ["Matematik", "Fizik", "Kimya", "Biyoloji", "Türkçe", "Tarih", "Coğrafya"]
+
+# Soruya özgü metinler için yer tutucu: bunu içeren çağrılar ısıtılmaz
+_PLACEHOLDER = "__teknokul_prewarm__"
+
+# Gemini'ye verilen örnek koddaki (SUPER_MANIM_PROMPT) sabit metinler
+PROMPT_TEXTS = [
+    'Text("teknokul.com.tr", font_size=24, color="#8B5CF6", font="Noto Sans")',
+    'Text("💡 PÜF NOKTASI", font="Noto Sans", font_size=24, color="#EAB308", weight=BOLD)',
+]
+
+
+def constant_text_calls(code: str) -> List[str]:
+    """Koddaki argümanları sabit / isim olan Text, MathTex... çağrıları (kaynak sırasıyla, tekrarsız)"""
+    calls = []
+    for node in ast.walk(ast.parse(textwrap.dedent(code))):
+        if not (isinstance(node, ast.Call) and isinstance(node.func, ast.Name)
+                and node.func.id in TEXT_CLASSES):
+            continue
+        args = list(node.args) + [keyword.value for keyword in node.keywords]
+        if all(isinstance(arg, (ast.Constant, ast.Name)) for arg in args):
+            source = ast.unparse(node)
+            if _PLACEHOLDER not in source and source not in calls:
+                calls.append(source)
+    return calls
+
+
+def _smart_renderer_calls(subject: str) -> List[str]:
+    steps = [{"ekranda_gosterilecek_metin": _PLACEHOLDER, "tts_metni": _PLACEHOLDER} for _ in range(6)]
+    scenario = {"video_senaryosu": {"hook_cumlesi": _PLACEHOLDER, "adimlar": steps}}
+    question = {"subject_name": subject, "question_text": _PLACEHOLDER}
+    sectioned = generate_smart_sections(scenario, question, {})
+    return constant_text_calls(sectioned.to_scene_script())
+
+
+def get_prewarm_calls() -> List[str]:
+    calls = []
+    sources = [_smart_renderer_calls(subject) for subject in PREWARM_SUBJECTS]
+    sources += [constant_text_calls(get_outro_code()), constant_text_calls(get_outro_integration_code()), PROMPT_TEXTS]
+    for source in sources:
+        calls.extend(call for call in source if call not in calls)
+    return calls
+
+
+def get_prewarm_script() -> str:
+    """
+    Render edilmeden çalıştırılacak script: her çağrı ayrı denenir
+    (LaTeX yoksa MathTex atlanır, diğerleri ısınır)
+    """
+    makers = "\n".join(f"    lambda: {call}," for call in get_prewarm_calls())
+    return SMART_SCRIPT_HEADER + f'''
+PREWARM_TEXTS = [
+{makers}
+]
+
+for make in PREWARM_TEXTS:
+    try:
+        make()
+    except Exception as e:
+        print(f"⚠️ Text önbelleği ısıtılamadı: {{e}}")
+'''
@@ -0,0 +1,295 @@
+"""
+Teknokul Toplu Soru Sınıflandırma
+🗂️ Soru bankası export'unu (JSONL) baştan sona okuyup her soruya template id ve
+animasyon profili atar; sonuç kolon bazlı kompakt bir dosyaya yazılır
+- template: get_template_for_subject(subject_name, topic_name)
+- animations: soru metninin kategori puanları, adlarıyla ("mathtex:7,geometri:2", puan sırasıyla)
+- Girdi render sırasındakiyle aynı: yalnızca question_text (senaryo render sırasında ayrı puanlanıp eklenir)
+- Her satırda soru metninin hash'i: soru bankada düzenlendiyse satır yok sayılır
+- Satırlar parça parça okunur, parçalar çekirdekler arasında paylaştırılır (multiprocessing)
+- Çıktı: .parquet (pyarrow kuruluysa) veya .json.gz (sözlük kodlu kolonlar)
+- Render sırasında RoutingTable ile soru bazında okunur, soru metni yeniden taranmaz
+
+    python -m templates.routing questions.jsonl -o routing.json.gz --workers 8
+"""
+
+import os
+import sys
+import gzip
+import json
+import time
+import hashlib
+import argparse
+import multiprocessing
+from collections import Counter
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .base import get_template_for_subject
+from .smart_renderer import ANIMATION_MATCHER, rank_animations
+
+# Dosya biçimi değişince artırılır: eski tablolar yok sayılır
+ROUTING_VERSION = 3
+
+DEFAULT_CHUNK_SIZE = 2000
+
+COLUMNS = ("question_id", "content_hash", "template", "animations")
+
+
+def content_hash(question_text: str) -> str:
+    """Profilin hesaplandığı soru metninin kısa hash'i"""
+    return hashlib.sha256((question_text or "").encode("utf-8")).hexdigest()[:16]
+
+
+def encode_profile(scores: Dict[str, int]) -> str:
+    """{kategori: puan} → "mathtex:7,geometri:2" (yüksek puan önce, eşitlikte tablo sırası)"""
+    ranked = sorted(scores.items(), key=lambda x: x[1], reverse=True)
+    return ",".join(f"{name}:{score}" for name, score in ranked)
+
+
+def decode_profile(value: str) -> Dict[str, int]:
+    scores = {}
+    for item in value.split(",") if value else []:
+        name, _, score = item.rpartition(":")
+        scores[name] = int(score)
+    return scores
+
+
+def classify_rows(rows: List[dict]) -> List[Tuple[str, str, str, str]]:
+    """(question_id, soru metni hash'i, template id, animasyon profili)"""
+    results = []
+    for row in rows:
+        question_text = row.get("question_text") or ""
+        results.append((
+            str(row.get("question_id") or row.get("id") or ""),
+            content_hash(question_text),
+            get_template_for_subject(row.get("subject_name"), row.get("topic_name")),
+            encode_profile(ANIMATION_MATCHER.score(question_text)),
+        ))
+    return results
+
+
+def _classify_lines(lines: List[str]) -> List[Tuple[str, str, str, str]]:
+    """Worker: JSON çözümleme de worker'da yapılır"""
+    rows = []
+    for line in lines:
+        line = line.strip()
+        if line:
+            rows.append(json.loads(line))
+    return classify_rows(rows)
+
+
+def _open_text(path: str, mode: str = "rt"):
+    if path.endswith(".gz"):
+        return gzip.open(path, mode, encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def iter_chunks(path: str, chunk_size: int) -> Iterator[List[str]]:
+    """JSONL dosyasını chunk_size satırlık parçalar halinde oku"""
+    with _open_text(path) as f:
+        while True:
+            chunk = list(islice(f, chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
+
+# ============================================================
+# KOLON BAZLI ÇIKTI
+# ============================================================
+
+def _encode(values: List[str]) -> Dict[str, list]:
+    """Sözlük kodlama: tekrarlı değerler bir kez yazılır"""
+    dictionary: Dict[str, int] = {}
+    codes = [dictionary.setdefault(value, len(dictionary)) for value in values]
+    return {"dictionary": list(dictionary), "codes": codes}
+
+
+def _decode(column: Dict[str, list]) -> List[str]:
+    dictionary = column["dictionary"]
+    return [dictionary[code] for code in column["codes"]]
+
+
+def _pyarrow_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def write_routing(path: str, columns: Dict[str, List[str]]) -> str:
+    """
+    Kolonları yaz
+    - .parquet: pyarrow ile, template/animasyon kolonları dictionary tipinde
+    - diğer: gzip'li JSON, template/animasyon kolonları sözlük kodlu
+    - Sürümle birlikte ANIMATION_PATTERNS özeti yazılır: puanlar yalnızca aynı tabloyla render'da kullanılır
+    """
+    if path.endswith(".parquet"):
+        if not _pyarrow_available():
+            raise RuntimeError("Parquet çıktısı için pyarrow gerekli (veya .json.gz kullanın)")
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        table = pa.table({
+            "question_id": pa.array(columns["question_id"], pa.string()),
+            "content_hash": pa.array(columns["content_hash"], pa.string()),
+            "template": pa.array(columns["template"], pa.string()).dictionary_encode(),
+            "animations": pa.array(columns["animations"], pa.string()).dictionary_encode(),
+        }).replace_schema_metadata({
+            "routing_version": str(ROUTING_VERSION),
+            "matcher": ANIMATION_MATCHER.fingerprint,
+        })
+        pq.write_table(table, path, compression="zstd")
+        return path
+
+    data = {
+        "version": ROUTING_VERSION,
+        "matcher": ANIMATION_MATCHER.fingerprint,
+        "count": len(columns["question_id"]),
+        "columns": {
+            "question_id": columns["question_id"],
+            "content_hash": columns["content_hash"],
+            "template": _encode(columns["template"]),
+            "animations": _encode(columns["animations"]),
+        },
+    }
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+    return path
+
+
+def _check_version(version: str) -> None:
+    if version != str(ROUTING_VERSION):
+        raise ValueError(f"Routing sürümü uyumsuz: {version or None} (beklenen {ROUTING_VERSION})")
+
+
+def read_routing(path: str) -> Tuple[Dict[str, List[str]], str]:
+    """(kolonlar, üretildiği ANIMATION_PATTERNS özeti)"""
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+        table = pq.read_table(path)
+        metadata = table.schema.metadata or {}
+        _check_version(metadata.get(b"routing_version", b"").decode())
+        columns = {name: [str(v) for v in table.column(name).to_pylist()] for name in COLUMNS}
+        return columns, metadata.get(b"matcher", b"").decode()
+
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        data = json.load(f)
+    _check_version(str(data.get("version") or ""))
+    columns = data["columns"]
+    return {
+        "question_id": columns["question_id"],
+        "content_hash": columns["content_hash"],
+        "template": _decode(columns["template"]),
+        "animations": _decode(columns["animations"]),
+    }, data.get("matcher") or ""
+
+
+# ============================================================
+# TOPLU SINIFLANDIRMA
+# ============================================================
+
+def classify_file(src: str, dst: str, workers: Optional[int] = None,
+                  chunk_size: int = DEFAULT_CHUNK_SIZE) -> dict:
+    """
+    JSONL export'u sınıflandırıp kolon dosyasına yaz
+    - workers=1: tek süreç (küçük dosyalar / debug)
+    - Parça sırası korunur (imap)
+    """
+    workers = workers or os.cpu_count() or 1
+    columns: Dict[str, List[str]] = {name: [] for name in COLUMNS}
+    started = time.monotonic()
+
+    def collect(results: Iterable[List[Tuple[str, str, str, str]]]) -> None:
+        for chunk in results:
+            for row in chunk:
+                for name, value in zip(COLUMNS, row):
+                    columns[name].append(value)
+
+    chunks = iter_chunks(src, chunk_size)
+    if workers == 1:
+        collect(map(_classify_lines, chunks))
+    else:
+        with multiprocessing.Pool(workers) as pool:
+            collect(pool.imap(_classify_lines, chunks))
+
+    write_routing(dst, columns)
+    elapsed = time.monotonic() - started
+    return {
+        "rows": len(columns["question_id"]),
+        "seconds": round(elapsed, 2),
+        "rows_per_second": round(len(columns["question_id"]) / elapsed) if elapsed else 0,
+        "templates": dict(Counter(columns["template"]).most_common()),
+        "output": dst,
+        "output_bytes": os.path.getsize(dst),
+    }
+
+
+class RoutingTable:
+    """
+    Önceden hesaplanmış yönlendirme kararları
+    - get(question_id, question_text): {"template", "animations": [...], "scores": {...}};
+      soru yoksa veya metni değiştiyse None
+    - scores yalnızca tablo güncel ANIMATION_PATTERNS ile üretildiyse dolu (değilse None: render yeniden puanlar)
+    """
+
+    def __init__(self, columns: Dict[str, List[str]], matcher: str = ""):
+        self.current = matcher == ANIMATION_MATCHER.fingerprint
+        # Aynı profil dizgisi tek sözlüğü paylaşır
+        profiles: Dict[str, Dict[str, int]] = {}
+        self._index: Dict[str, Tuple[str, str, Dict[str, int]]] = {}
+        for question_id, digest, template, animations in zip(*(columns[name] for name in COLUMNS)):
+            if animations not in profiles:
+                profiles[animations] = decode_profile(animations)
+            self._index[question_id] = (digest, template, profiles[animations])
+        self.stale = 0
+
+    @classmethod
+    def load(cls, path: str) -> "RoutingTable":
+        table = cls(*read_routing(path))
+        if not table.current:
+            print("⚠️ Routing tablosu farklı bir ANIMATION_PATTERNS ile üretilmiş: "
+                  "animasyon puanları render sırasında yeniden hesaplanacak (yeniden sınıflandırın)")
+        return table
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def get(self, question_id: str, question_text: str) -> Optional[dict]:
+        entry = self._index.get(question_id)
+        if entry is None:
+            return None
+        digest, template, scores = entry
+        if digest != content_hash(question_text):
+            self.stale += 1
+            return None
+        return {
+            "template": template,
+            "animations": rank_animations(scores),
+            "scores": dict(scores) if self.current else None,
+        }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Soru bankası için toplu template / animasyon sınıflandırması")
+    parser.add_argument("input", help="Soru export'u (JSONL, .gz olabilir)")
+    parser.add_argument("-o", "--output", default="routing.json.gz",
+                        help="Çıktı (.json.gz veya pyarrow kuruluysa .parquet)")
+    parser.add_argument("--workers", type=int, default=None, help="Süreç sayısı (varsayılan: CPU sayısı)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Worker başına satır parçası")
+    return parser.parse_args(argv)
+
+
+def main_cli(argv=None) -> int:
+    args = parse_args(argv)
+    stats = classify_file(args.input, args.output, args.workers, args.chunk_size)
+    print(f"✅ {stats['rows']} soru sınıflandırıldı: {stats['seconds']}s "
+          f"({stats['rows_per_second']}/s) → {stats['output']} ({stats['output_bytes'] / 1024:.1f} KB)")
+    for template, count in stats["templates"].items():
+        print(f"   {template:<22} {count}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
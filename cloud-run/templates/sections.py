@@ -0,0 +1,49 @@
+"""
+Teknokul Bölümlü Script
+🧩 Template çıktısını bağımsız render edilebilir bölümler (hook, adımlar, kapanış) olarak taşır
+- Tek sahne: bölümler sırayla tek VideoScene içinde (eski çıktıyla birebir aynı)
+- Bölümlü: her bölüm ayrı bir Scene sınıfı; önceki bölümlerden ekranda kalan
+  mobject'ler (logo, badge) bölümün başında yeniden kurulur
+- Bölümler ayrı süreçlerde paralel render edilip stream copy ile birleştirilir
+"""
+
+from dataclasses import dataclass, field
+from typing import List
+
+SCENE_HEAD = "class {name}(Scene):\n    def construct(self):\n"
+
+
+@dataclass
+class ScriptSection:
+    # Sahne sınıfı adı (bölümlü script'te)
+    name: str
+    # construct gövdesi (8 boşluk girintili)
+    body: str
+    # Tek başına render edilirken gövdeden önce çalışır: ekranda kalan durumun kurulumu
+    setup: str = ""
+
+
+@dataclass
+class SectionedScript:
+    # Import'lar, config ve renk sabitleri
+    header: str
+    # Her sahnenin başında ortak kurulum (logo)
+    prelude: str = ""
+    sections: List[ScriptSection] = field(default_factory=list)
+
+    @property
+    def scene_names(self) -> List[str]:
+        return [section.name for section in self.sections]
+
+    def to_scene_script(self, scene_name: str = "VideoScene") -> str:
+        """Tüm bölümler tek sahnede"""
+        return (self.header + SCENE_HEAD.format(name=scene_name) + self.prelude
+                + "".join(section.body for section in self.sections))
+
+    def to_sectioned_script(self) -> str:
+        """Bölüm başına bir sahne; sahne sırası = video sırası"""
+        scenes = [
+            SCENE_HEAD.format(name=section.name) + self.prelude + section.setup + section.body
+            for section in self.sections
+        ]
+        return self.header + "\n\n".join(scenes)
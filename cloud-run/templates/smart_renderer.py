@@ -4,7 +4,10 @@ Soru içeriğine göre otomatik animasyon seçimi
 """
 
 import re
-from typing import List, Tuple
+from typing import Dict, Iterable, List, Tuple
+
+from .matcher import AnimationMatcher
+from .sections import ScriptSection, SectionedScript
 
 # Animasyon tipleri ve anahtar kelimeleri
 ANIMATION_PATTERNS = {
@@ -71,39 +74,56 @@ ANIMATION_PATTERNS = {
 }
 
 
-def detect_animations(text: str) -> List[str]:
+# Tablo import anında bir kez derlenir (Aho-Corasick + birleşik regex)
+ANIMATION_MATCHER = AnimationMatcher(ANIMATION_PATTERNS)
+
+
+def rank_animations(scores: Dict[str, int]) -> List[str]:
     """
-    Metin içeriğine göre uygun animasyon tiplerini tespit et
+    Puanlardan animasyon tiplerini seç
+    - En yüksek skorlu max 3 tip (eşitlikte tablo sırası)
+    - Hiç tespit edilmediyse varsayılan: hesaplama
     """
-    text_lower = text.lower()
-    detected = []
-    scores = {}
-    
-    for anim_type, config in ANIMATION_PATTERNS.items():
-        score = 0
-        
-        # Anahtar kelime kontrolü
-        for keyword in config['keywords']:
-            if keyword.lower() in text_lower:
-                score += 2
-        
-        # Pattern kontrolü
-        for pattern in config['patterns']:
-            if re.search(pattern, text, re.IGNORECASE):
-                score += 3
-        
-        if score > 0:
-            scores[anim_type] = score
-    
-    # En yüksek skorlu animasyonları seç (max 3)
     sorted_anims = sorted(scores.items(), key=lambda x: x[1], reverse=True)
     detected = [anim for anim, score in sorted_anims[:3] if score >= 2]
-    
-    # Hiç tespit edilmediyse varsayılan
-    if not detected:
-        detected = ['hesaplama']
-    
-    return detected
+    return detected or ['hesaplama']
+
+
+def merge_scores(*parts: Dict[str, int]) -> Dict[str, int]:
+    """Ayrı puanlanan metin parçalarının kategori puanlarını topla (tablo sırası korunur)"""
+    totals = {name: sum(part.get(name, 0) for part in parts) for name in ANIMATION_MATCHER.categories}
+    return {name: total for name, total in totals.items() if total > 0}
+
+
+def detect_animations(text: str) -> List[str]:
+    """
+    Metin içeriğine göre uygun animasyon tiplerini tespit et
+    """
+    return rank_animations(ANIMATION_MATCHER.score(text))
+
+
+def detect_animations_batch(texts: Iterable[str]) -> List[List[str]]:
+    """
+    Birden fazla metin için animasyon tespiti (soru bankası toplu sınıflandırma)
+    """
+    return [rank_animations(scores) for scores in ANIMATION_MATCHER.score_many(texts)]
+
+
+# extract_* kalıpları (import anında derlenir)
+_EQUATION_RE = re.compile(r'[xyz]\s*=\s*[\d\w\+\-\*\/\s]+')
+_OPERATION_RE = re.compile(r'\d+\s*[+\-×÷=]\s*\d+')
+_FRACTION_RE = re.compile(r'\d+/\d+')
+
+_UNIT_PATTERNS = [
+    (re.compile(r'(\d+(?:\.\d+)?)\s*(cm|m|km|mm)'), 'uzunluk'),
+    (re.compile(r'(\d+(?:\.\d+)?)\s*(m²|cm²|km²)'), 'alan'),
+    (re.compile(r'(\d+(?:\.\d+)?)\s*(m/s|km/h)'), 'hız'),
+    (re.compile(r'(\d+(?:\.\d+)?)\s*(kg|g|mg)'), 'kütle'),
+    (re.compile(r'(\d+(?:\.\d+)?)\s*(N)'), 'kuvvet'),
+    (re.compile(r'(\d+(?:\.\d+)?)\s*(V|A|Ω)'), 'elektrik'),
+    (re.compile(r'(\d+(?:\.\d+)?)\s*°'), 'açı'),
+    (re.compile(r'(\d+(?:\.\d+)?)\s*%'), 'yüzde'),
+]
 
 
 def extract_math_expressions(text: str) -> List[str]:
@@ -113,16 +133,13 @@ def extract_math_expressions(text: str) -> List[str]:
     expressions = []
     
     # Basit denklemler: x = 5, y = 2x + 3
-    eq_pattern = r'[xyz]\s*=\s*[\d\w\+\-\*\/\s]+'
-    expressions.extend(re.findall(eq_pattern, text))
+    expressions.extend(_EQUATION_RE.findall(text))
     
     # Sayısal işlemler: 5 + 3, 10 × 2
-    op_pattern = r'\d+\s*[+\-×÷=]\s*\d+'
-    expressions.extend(re.findall(op_pattern, text))
+    expressions.extend(_OPERATION_RE.findall(text))
     
     # Kesirler: 3/4, 1/2
-    frac_pattern = r'\d+/\d+'
-    expressions.extend(re.findall(frac_pattern, text))
+    expressions.extend(_FRACTION_RE.findall(text))
     
     return expressions[:5]  # Max 5 expression
 
@@ -134,19 +151,8 @@ def extract_numbers(text: str) -> List[Tuple[float, str]]:
     numbers = []
     
     # Birimli sayılar
-    patterns = [
-        (r'(\d+(?:\.\d+)?)\s*(cm|m|km|mm)', 'uzunluk'),
-        (r'(\d+(?:\.\d+)?)\s*(m²|cm²|km²)', 'alan'),
-        (r'(\d+(?:\.\d+)?)\s*(m/s|km/h)', 'hız'),
-        (r'(\d+(?:\.\d+)?)\s*(kg|g|mg)', 'kütle'),
-        (r'(\d+(?:\.\d+)?)\s*(N)', 'kuvvet'),
-        (r'(\d+(?:\.\d+)?)\s*(V|A|Ω)', 'elektrik'),
-        (r'(\d+(?:\.\d+)?)\s*°', 'açı'),
-        (r'(\d+(?:\.\d+)?)\s*%', 'yüzde'),
-    ]
-    
-    for pattern, unit_type in patterns:
-        matches = re.findall(pattern, text)
+    for pattern, unit_type in _UNIT_PATTERNS:
+        matches = pattern.findall(text)
         for match in matches:
             numbers.append((float(match[0]), unit_type))
     
@@ -394,9 +400,37 @@ def generate_animation_code(anim_type: str, content: str, step_num: int, color:
 '''
 
 
-def generate_smart_script(scenario: dict, question: dict, durations: dict) -> str:
+# Smart renderer script başlığı: config, renkler, varsayılan font (Text önbelleği ısıtma da kullanır)
+SMART_SCRIPT_HEADER = '''
+from manim import *
+import numpy as np
+
+config.frame_width = 9
+config.frame_height = 16
+config.pixel_width = 1080
+config.pixel_height = 1920
+config.frame_rate = 30
+config.background_color = "#1a1a2e"
+
+PURPLE = "#8B5CF6"
+ORANGE = "#F97316"
+GREEN = "#22C55E"
+BLUE = "#3B82F6"
+YELLOW = "#EAB308"
+RED = "#EF4444"
+CYAN = "#06B6D4"
+PINK = "#EC4899"
+DARK_BG = "#16213e"
+
+Text.set_default(font="Noto Sans")
+
+'''
+
+
+def generate_smart_sections(scenario: dict, question: dict, durations: dict) -> SectionedScript:
     """
     Akıllı Manim script üret - içeriğe göre animasyon seç
+    - Hook, her adım ve kapanış ayrı bölüm: tek sahne veya bölümlü render edilebilir
     """
     
     video_data = scenario.get("video_senaryosu", {})
@@ -412,9 +446,14 @@ def generate_smart_script(scenario: dict, question: dict, durations: dict) -> st
     topic = question.get("topic_name", "Genel")
     question_text = question.get("question_text", "")
     
-    # Tüm içeriği birleştir ve animasyonları tespit et
-    all_content = f"{question_text} {hook} " + " ".join([a.get("ekranda_gosterilecek_metin", "") + " " + a.get("tts_metni", "") for a in adimlar])
-    detected_anims = detect_animations(all_content)
+    # Soru metni ve senaryo ayrı puanlanır, puanlar toplanıp animasyonlar seçilir
+    # (soru puanları routing tablosunda önceden hesaplandıysa soru metni yeniden taranmaz)
+    question_scores = question.get("animation_scores")
+    if question_scores is None:
+        question_scores = ANIMATION_MATCHER.score(question_text)
+    scenario_content = f"{hook} " + " ".join([a.get("ekranda_gosterilecek_metin", "") + " " + a.get("tts_metni", "") for a in adimlar])
+    all_content = f"{question_text} {scenario_content}"
+    detected_anims = rank_animations(merge_scores(question_scores, ANIMATION_MATCHER.score(scenario_content)))
     
     def escape(s):
         return str(s).replace('\\', '\\\\').replace('"', '\\"').replace("'", "\\'").replace('\n', ' ')
@@ -426,45 +465,31 @@ def generate_smart_script(scenario: dict, question: dict, durations: dict) -> st
     }
     subject_color = subject_colors.get(subject.lower(), 'PURPLE')
     
-    script = f'''
-from manim import *
-import numpy as np
-
-config.frame_width = 9
-config.frame_height = 16
-config.pixel_width = 1080
-config.pixel_height = 1920
-config.frame_rate = 30
-config.background_color = "#1a1a2e"
-
-PURPLE = "#8B5CF6"
-ORANGE = "#F97316"
-GREEN = "#22C55E"
-BLUE = "#3B82F6"
-YELLOW = "#EAB308"
-RED = "#EF4444"
-CYAN = "#06B6D4"
-PINK = "#EC4899"
-DARK_BG = "#16213e"
-
-Text.set_default(font="Noto Sans")
-
-class VideoScene(Scene):
-    def construct(self):
-        # Logo
+    header = SMART_SCRIPT_HEADER
+    
+    prelude = '''        # Logo
         logo = Text("teknokul.com.tr", font_size=24, color=PURPLE)
         logo.to_edge(DOWN, buff=0.3)
         self.add(logo)
         
-        # ===== HOOK =====
-        # Ders badge
-        badge = VGroup(
+'''
+    
+    badge_code = f'''        badge = VGroup(
             RoundedRectangle(width=3.5, height=0.8, corner_radius=0.2, fill_color={subject_color}, fill_opacity=1, stroke_width=0),
             Text("{escape(subject.upper())}", font_size=22, color=WHITE, weight=BOLD)
         )
         badge[1].move_to(badge[0].get_center())
         badge.to_edge(UP, buff=0.5)
-        
+'''
+    
+    # Hook sonrası ekranda kalan durum: köşedeki küçük badge
+    badge_setup = badge_code + '''        badge.scale(0.7).to_corner(UL, buff=0.3)
+        self.add(badge)
+'''
+    
+    hook_body = '''        # ===== HOOK =====
+        # Ders badge
+''' + badge_code + f'''        
         hook_text = Text("{escape(hook)}", font_size=32, color=WHITE, weight=BOLD)
         hook_text.move_to(DOWN * 4)
         if hook_text.width > 8:
@@ -478,9 +503,9 @@ class VideoScene(Scene):
     # Hook için animasyon ekle
     if detected_anims:
         hook_anim_code = generate_animation_code(detected_anims[0], all_content, 0, subject_color)
-        script += hook_anim_code
+        hook_body += hook_anim_code
     
-    script += f'''
+    hook_body += f'''
         self.play(Write(hook_text), run_time=0.5)
         self.wait({max(0.3, hook_dur - 1.5)})
         
@@ -493,6 +518,7 @@ class VideoScene(Scene):
         badge.scale(0.7).to_corner(UL, buff=0.3)
         self.add(badge)
 '''
+    sections = [ScriptSection("HookSection", hook_body)]
     
     # Her adım için
     for i, adim in enumerate(adimlar):
@@ -508,7 +534,7 @@ class VideoScene(Scene):
         step_content = f"{display} {tts}"
         step_anims = detect_animations(step_content)
         
-        script += f'''
+        step_body = f'''
         # ===== ADIM {i+1} =====
         step_num = VGroup(
             Circle(radius=0.45, color={subject_color}, fill_opacity=1, stroke_width=0),
@@ -526,9 +552,9 @@ class VideoScene(Scene):
         # Adım animasyonu ekle
         if step_anims:
             step_anim_code = generate_animation_code(step_anims[0], step_content, i+1, color)
-            script += step_anim_code
+            step_body += step_anim_code
         
-        script += f'''
+        step_body += f'''
         # İçerik kutusu
         content_box = RoundedRectangle(
             width=8, height=4, corner_radius=0.3,
@@ -555,9 +581,10 @@ class VideoScene(Scene):
         )
         self.add(logo, badge)
 '''
+        sections.append(ScriptSection(f"Step{i+1}Section", step_body, setup=badge_setup))
     
     # Kapanış
-    script += f'''
+    closing_body = f'''
         # ===== KAPANIŞ =====
         result_banner = RoundedRectangle(
             width=7, height=1.5, corner_radius=0.3,
@@ -583,5 +610,13 @@ class VideoScene(Scene):
         self.play(FadeIn(big_logo, scale=1.1), FadeIn(slogan), run_time=0.5)
         self.wait({max(0.5, kapanis_dur - 1.3)})
 '''
+    sections.append(ScriptSection("ClosingSection", closing_body, setup=badge_setup))
     
-    return script
+    return SectionedScript(header=header, prelude=prelude, sections=sections)
+
+
+def generate_smart_script(scenario: dict, question: dict, durations: dict) -> str:
+    """
+    Akıllı Manim script üret - tüm bölümler tek VideoScene içinde
+    """
+    return generate_smart_sections(scenario, question, durations).to_scene_script()
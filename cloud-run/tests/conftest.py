@@ -0,0 +1,12 @@
+"""
+Teknokul cloud-run testleri
+🧪 Saf Python katmanı: Manim, ffmpeg ve dış servis gerektirmez
+
+    cd cloud-run && python -m pytest -q tests
+"""
+
+import sys
+from pathlib import Path
+
+# Modüller servisteki gibi cloud-run kökünden import edilir (main.py ile aynı)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,102 @@
+"""build_finishing_command: N segment için tek geçişli filter_complex"""
+
+from pathlib import Path
+
+import pytest
+
+from audio.finishing import JINGLE_LEAD_SECONDS, build_finishing_command
+
+VIDEO = Path("/tmp/raw.mp4")
+OUTPUT = Path("/tmp/final.mp4")
+
+
+def segments(durations):
+    return [(Path(f"/tmp/seg{i}.mp3"), d) for i, d in enumerate(durations)]
+
+
+def option(cmd, flag):
+    return cmd[cmd.index(flag) + 1]
+
+
+def inputs(cmd):
+    return [cmd[i + 1] for i, arg in enumerate(cmd) if arg == "-i"]
+
+
+@pytest.mark.parametrize("count", [2, 3, 6])
+def test_segments_are_delayed_to_their_offsets_and_mixed(count):
+    durations = [1.5 + i for i in range(count)]
+    cmd = build_finishing_command(VIDEO, segments(durations), OUTPUT, video_duration=100.0)
+
+    assert inputs(cmd) == [str(VIDEO)] + [f"/tmp/seg{i}.mp3" for i in range(count)]
+
+    offsets = [int(sum(durations[:i]) * 1000) for i in range(count)]
+    expected = [f"[{i + 1}:a]adelay={offsets[i]}:all=1[s{i}]" for i in range(count)]
+    expected.append("".join(f"[s{i}]" for i in range(count))
+                    + f"amix=inputs={count}:duration=longest:normalize=0[tts]")
+    assert option(cmd, "-filter_complex") == ";".join(expected)
+
+    assert option(cmd, "-map") == "0:v"
+    assert cmd[cmd.index("-map", cmd.index("-map") + 1) + 1] == "[tts]"
+    assert option(cmd, "-c:v") == "copy"
+    # Final süre: min(video, toplam TTS)
+    assert option(cmd, "-t") == f"{sum(durations):.3f}"
+    assert cmd.count("ffmpeg") == 1 and cmd[-1] == str(OUTPUT)
+
+
+def test_music_and_jingle_follow_tts_inputs():
+    durations = [2.0, 3.0, 4.0]
+    cmd = build_finishing_command(
+        VIDEO, segments(durations), OUTPUT, video_duration=8.0,
+        music_path=Path("/tmp/music.mp3"), music_duration=5.0,
+        jingle_path=Path("/tmp/jingle.mp3"), music_volume=0.2,
+    )
+    parts = option(cmd, "-filter_complex").split(";")
+    final = 8.0  # video TTS'ten kısa
+
+    assert parts[3] == "[s0][s1][s2]amix=inputs=3:duration=longest:normalize=0[tts]"
+    assert parts[4] == f"[4:a]volume=0.2,atrim=0:{final}[bg]"
+    jingle_ms = int((final - JINGLE_LEAD_SECONDS) * 1000)
+    assert parts[5] == f"[5:a]adelay={jingle_ms}:all=1,afade=t=in:st=0:d=0.3,volume=0.7[jingle]"
+    assert parts[6] == "[tts][bg][jingle]amix=inputs=3:duration=first[aout]"
+    assert len(parts) == 7
+    assert option(cmd, "-t") == "8.000"
+
+    # Müzik final süreden kısa: sonsuz loop, -stream_loop müzik girdisinin hemen önünde
+    music_at = cmd.index("/tmp/music.mp3")
+    assert cmd[music_at - 3:music_at] == ["-stream_loop", "-1", "-i"]
+
+
+@pytest.mark.parametrize("main, tts, expected", [
+    (12.0, 20.0, 17.0),   # ana sahne TTS'ten kısa: tamamı + outro
+    (12.0, 12.0, 17.0),   # ana sahne önceden TTS'e kırpılmış
+    (12.0, 8.0, 13.0),    # kırpılmamış ana sahne: sınır TTS + outro (kırpma çağıranın işi)
+])
+def test_tts_cap_does_not_cut_appended_outro(main, tts, expected):
+    cmd = build_finishing_command(
+        VIDEO, segments([tts / 2, tts / 2]), OUTPUT, video_duration=main + 5.0,
+        jingle_path=Path("/tmp/jingle.mp3"), tail_duration=5.0,
+    )
+    assert option(cmd, "-t") == f"{expected:.3f}"
+    jingle_ms = int((expected - JINGLE_LEAD_SECONDS) * 1000)
+    assert f"[3:a]adelay={jingle_ms}:all=1" in option(cmd, "-filter_complex")
+
+
+def test_long_music_is_not_looped():
+    cmd = build_finishing_command(
+        VIDEO, segments([2.0, 2.0]), OUTPUT, video_duration=10.0,
+        music_path=Path("/tmp/music.mp3"), music_duration=60.0,
+    )
+    assert "-stream_loop" not in cmd
+    assert option(cmd, "-filter_complex").endswith("[tts][bg]amix=inputs=2:duration=first[aout]")
+
+
+def test_single_segment_is_mapped_directly():
+    cmd = build_finishing_command(VIDEO, segments([3.0]), OUTPUT, video_duration=10.0)
+    assert option(cmd, "-filter_complex") == "[1:a]adelay=0:all=1[s0]"
+    assert "[s0]" in cmd and "amix" not in option(cmd, "-filter_complex")
+
+
+def test_no_audio_is_a_plain_remux():
+    cmd = build_finishing_command(VIDEO, [], OUTPUT, video_duration=10.0)
+    assert "-filter_complex" not in cmd
+    assert cmd == ["ffmpeg", "-y", "-i", str(VIDEO), "-c", "copy", "-movflags", "+faststart", str(OUTPUT)]
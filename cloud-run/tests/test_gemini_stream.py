@@ -0,0 +1,131 @@
+"""CodeStreamParser: artımlı ayrıştırma, yarım kod (henüz gelmedi) ile gerçek syntax hatasının ayrımı"""
+
+import pytest
+
+from pipeline.gemini_stream import CodeStreamParser, syntax_error_before_tail
+
+SCENE = '''from manim import *
+
+class VideoScene(Scene):
+    def construct(self):
+        title = Text(
+            "Soru",
+            font_size=48,
+        )
+        self.play(Write(title))
+        notes = """
+        çok satırlı
+        metin
+        """
+        for i in range(3):
+            self.wait(0.1)
+'''
+
+
+def feed_in_chunks(parser, text, size=7):
+    for i in range(0, len(text), size):
+        parser.feed(text[i:i + size])
+        if parser.done or parser.error:
+            return i + size
+    return len(text)
+
+
+def test_code_is_ready_at_closing_fence():
+    parser = CodeStreamParser(check_every=1)
+    response = f"İşte kod:\n```python\n{SCENE}```\nAçıklama: bu sahne başlığı yazar.\n" * 2
+    consumed = feed_in_chunks(parser, response)
+
+    assert parser.done and parser.error is None
+    assert parser.code == SCENE
+    # Kapanış fence'inden sonrası beklenmez
+    assert consumed < len(response) // 2 + 10
+
+
+@pytest.mark.parametrize("size", [1, 3, 64])
+def test_incomplete_prefixes_are_never_errors(size):
+    # Her satırda kontrol: açık parantez, açık üç tırnak, gövdesiz def/for "henüz gelmedi" sayılır
+    parser = CodeStreamParser(check_every=1)
+    feed_in_chunks(parser, f"```python\n{SCENE}", size)
+    assert parser.error is None
+    assert not parser.done and parser.in_code
+
+    parser.finish()
+    assert parser.done and parser.code == SCENE
+
+
+def test_syntax_error_before_the_tail_aborts_the_stream():
+    broken = SCENE.replace("self.play(Write(title))", "self.play(Write(title)))")
+    tail = "".join(f"        self.wait({i})\n" for i in range(60))
+    parser = CodeStreamParser(check_every=5)
+    response = f"```python\n{broken}{tail}```"
+    consumed = feed_in_chunks(parser, response)
+
+    assert parser.error is not None and parser.error.startswith("Syntax hatası (satır 9)")
+    assert not parser.done
+    assert consumed < len(response)
+    # Hatadan sonra gelen parçalar yok sayılır
+    parser.feed("```")
+    assert not parser.done
+
+
+def test_error_on_last_complete_line_waits_for_more_input():
+    # Son tamamlanmış satırdaki hata akışın devamıyla düzelebilir (örn. devam eden ifade)
+    code = "x = 1\ny = (x +\n"
+    assert syntax_error_before_tail(code, code.count("\n")) is None
+
+
+@pytest.mark.parametrize("code", [
+    "def f():\n",
+    "x = [1,\n 2,\n",
+    's = """abc\n',
+    "try:\n    x = 1\n",
+    "if True:\n    pass\nelse:\n",
+])
+def test_incomplete_hints_are_not_errors(code):
+    assert syntax_error_before_tail(code, code.count("\n")) is None
+
+
+@pytest.mark.parametrize("code", [
+    "x = 1\ny = )\nz = 3\nw = 4\n",
+    "def f(:\n    pass\nx = 1\ny = 2\n",
+    "class A\n    pass\nx = 1\ny = 2\n",
+])
+def test_real_errors_are_reported(code):
+    assert syntax_error_before_tail(code, code.count("\n")).startswith("Syntax hatası")
+
+
+def test_null_bytes_are_invalid_code():
+    assert syntax_error_before_tail("x = 1\0\n", 1).startswith("Geçersiz kod")
+
+
+def test_other_language_block_is_skipped():
+    parser = CodeStreamParser()
+    feed_in_chunks(parser, '```json\n{"a": "```python"}\n```\nŞimdi kod:\n```py\nfrom manim import *\n```')
+    assert parser.done and parser.code == "from manim import *\n"
+
+
+def test_missing_code_block_fails_early():
+    parser = CodeStreamParser(max_preamble=200)
+    feed_in_chunks(parser, "Bu soruyu şöyle düşünelim. " * 20)
+    assert parser.error == "İlk 200 karakterde kod bloğu yok"
+
+
+def test_unfenced_manim_code_is_accepted():
+    parser = CodeStreamParser(max_preamble=50)
+    feed_in_chunks(parser, SCENE)
+    assert parser.error is None
+    parser.finish()
+    assert parser.done and parser.code == SCENE
+
+
+def test_missing_video_scene_fails_early():
+    parser = CodeStreamParser(scene_deadline=300, check_every=1000)
+    feed_in_chunks(parser, "```python\nfrom manim import *\n" + "x = 1\n" * 100)
+    assert parser.error == "İlk 300 karakterde class VideoScene yok"
+
+
+def test_finish_without_code_is_an_error():
+    parser = CodeStreamParser()
+    parser.feed("Üzgünüm, yardımcı olamam.")
+    parser.finish()
+    assert parser.error == "Yanıtta kod bloğu yok" and not parser.done
@@ -0,0 +1,181 @@
+"""hedged(): yedek isteğin başlatılması, kazananın seçimi ve kaybedenin iptali"""
+
+import time
+import asyncio
+
+import pytest
+
+from pipeline.hedging import AttemptRejected, DeadlineBudget, LatencyTracker, hedged
+
+
+class Attempts:
+    """attempt(index) davranışlarını tanımlar, başlatılan ve iptal edilen denemeleri kaydeder"""
+
+    def __init__(self, *behaviours):
+        self.behaviours = behaviours
+        self.started = []
+        self.cancelled = []
+
+    async def __call__(self, index):
+        self.started.append(index)
+        delay, outcome = self.behaviours[index]
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self.cancelled.append(index)
+            raise
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+def run_hedged(attempts, threshold=0.05, timeout=2.0, hedges=1):
+    tracker = LatencyTracker("test", default=threshold)
+    result = asyncio.run(hedged(attempts, tracker, timeout, hedges=hedges))
+    return result, tracker
+
+
+def test_fast_primary_wins_without_hedge():
+    attempts = Attempts((0.01, "primary"), (0.01, "hedge"))
+    result, tracker = run_hedged(attempts)
+    assert result == "primary"
+    assert attempts.started == [0]
+    assert (tracker.calls, tracker.hedges, tracker.hedge_wins) == (1, 0, 0)
+    assert len(tracker.samples) == 1
+
+
+def test_slow_primary_is_hedged_and_cancelled_when_hedge_wins():
+    attempts = Attempts((1.0, "primary"), (0.02, "hedge"))
+    started = time.monotonic()
+    result, tracker = run_hedged(attempts, threshold=0.05)
+    assert result == "hedge"
+    assert time.monotonic() - started < 0.5
+    assert attempts.started == [0, 1]
+    assert attempts.cancelled == [0]
+    assert (tracker.hedges, tracker.hedge_wins) == (1, 1)
+
+
+def test_primary_finishing_after_hedge_launch_cancels_hedge():
+    attempts = Attempts((0.08, "primary"), (1.0, "hedge"))
+    result, tracker = run_hedged(attempts, threshold=0.05)
+    assert result == "primary"
+    assert attempts.cancelled == [1]
+    assert (tracker.hedges, tracker.hedge_wins) == (1, 0)
+
+
+@pytest.mark.parametrize("failure", [None, RuntimeError("503")])
+def test_fast_failure_hedges_immediately(failure):
+    attempts = Attempts((0.0, failure), (0.01, "hedge"))
+    started = time.monotonic()
+    result, tracker = run_hedged(attempts, threshold=1.0)
+    assert result == "hedge"
+    # Eşik (1s) beklenmeden başlatıldı
+    assert time.monotonic() - started < 0.5
+    assert tracker.hedges == 1
+
+
+def test_rejected_output_does_not_hedge():
+    attempts = Attempts((0.0, AttemptRejected("syntax")), (0.01, "hedge"))
+    started = time.monotonic()
+    with pytest.raises(AttemptRejected, match="syntax"):
+        run_hedged(attempts, threshold=0.05)
+    assert attempts.started == [0]
+    assert time.monotonic() - started < 0.05
+
+
+def test_rejection_does_not_discard_attempt_already_in_flight():
+    # Asıl istek yavaş kaldığı için yedek zaten başlamıştı; asıl reddedilince yedek beklenir
+    attempts = Attempts((0.1, AttemptRejected("syntax")), (0.1, "hedge"))
+    result, tracker = run_hedged(attempts, threshold=0.05)
+    assert result == "hedge"
+    assert attempts.started == [0, 1] and tracker.hedges == 1
+
+    attempts = Attempts((0.1, AttemptRejected("first")), (0.1, None))
+    with pytest.raises(AttemptRejected, match="first"):
+        run_hedged(attempts, threshold=0.05, hedges=2)
+    assert attempts.started == [0, 1]
+
+
+def test_cancelled_loser_is_recorded_at_least_at_threshold():
+    attempts = Attempts((1.0, "primary"), (0.02, "hedge"))
+    result, tracker = run_hedged(attempts, threshold=0.05)
+    assert result == "hedge"
+    assert len(tracker.samples) == 2
+    winner, loser = sorted(tracker.samples)
+    assert winner < 0.05
+    assert loser >= 0.05
+
+
+def test_hedge_cancelled_right_after_launch_is_recorded_at_threshold():
+    attempts = Attempts((0.06, "primary"), (1.0, "hedge"))
+    result, tracker = run_hedged(attempts, threshold=0.05)
+    assert result == "primary"
+    assert attempts.cancelled == [1]
+    assert min(tracker.samples) == 0.05
+
+
+def test_rejected_attempt_is_a_latency_sample_but_transport_failure_is_not():
+    _, tracker = run_hedged(Attempts((0.01, None), (0.01, "hedge")))
+    assert len(tracker.samples) == 1
+    tracker = LatencyTracker("test", default=0.05)
+    with pytest.raises(AttemptRejected):
+        asyncio.run(hedged(Attempts((0.01, AttemptRejected("bozuk"))), tracker, 2.0))
+    assert len(tracker.samples) == 1
+
+
+def test_all_attempts_failing():
+    result, _ = run_hedged(Attempts((0.0, None), (0.0, None)))
+    assert result is None
+
+    with pytest.raises(RuntimeError, match="second"):
+        run_hedged(Attempts((0.0, RuntimeError("first")), (0.0, RuntimeError("second"))))
+
+
+def test_timeout_cancels_every_attempt():
+    attempts = Attempts((1.0, "primary"), (1.0, "hedge"))
+    with pytest.raises(asyncio.TimeoutError):
+        run_hedged(attempts, threshold=0.02, timeout=0.1)
+    assert sorted(attempts.cancelled) == [0, 1]
+
+
+def test_hedging_disabled():
+    attempts = Attempts((0.1, "primary"), (0.0, "hedge"))
+    result, tracker = run_hedged(attempts, threshold=0.01, hedges=0)
+    assert result == "primary"
+    assert attempts.started == [0] and tracker.hedges == 0
+
+
+def test_caller_cancellation_cancels_attempts():
+    attempts = Attempts((1.0, "primary"), (1.0, "hedge"))
+
+    async def main():
+        task = asyncio.create_task(hedged(attempts, LatencyTracker("test", default=0.02), 5.0))
+        await asyncio.sleep(0.1)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(main())
+    assert sorted(attempts.cancelled) == [0, 1]
+
+
+def test_latency_tracker_threshold():
+    tracker = LatencyTracker("test", default=7.0, min_samples=10)
+    for seconds in range(1, 10):
+        tracker.observe(float(seconds))
+    assert tracker.threshold() == 7.0  # yeterli örnek yok
+
+    tracker.observe(10.0)
+    # nearest-rank p90: 10 örnekte 9. sıradaki
+    assert tracker.threshold() == 9.0
+    tracker.observe(11.0)
+    assert tracker.threshold() == 10.0
+
+
+def test_deadline_budget():
+    budget = DeadlineBudget(0.05)
+    assert not budget.expired
+    assert budget.timeout(10) <= 0.05
+    assert budget.timeout(0.01) == 0.01
+    time.sleep(0.06)
+    assert budget.expired and budget.remaining() == 0.0
@@ -0,0 +1,228 @@
+"""JobQueue: wait / finish yarışı, bekleme süresi sınırı, requeue deneme sınırı ve toplu kabul"""
+
+import time
+import asyncio
+import threading
+
+import pytest
+
+from pipeline.jobs import (
+    JOB_COMPLETED, JOB_FAILED, JOB_QUEUED, JOB_RUNNING,
+    JobQueue, QueueFullError, SQLiteJobStore,
+)
+
+
+class SlowReadStore(SQLiteJobStore):
+    """get() yavaş: iş, wait() durumu okurken biter (kayıp uyandırma penceresi)"""
+
+    read_delay = 0.0
+
+    def get(self, job_id):
+        job = super().get(job_id)
+        time.sleep(self.read_delay)
+        return job
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SlowReadStore(tmp_path / "jobs.db")
+
+
+def test_wait_sees_job_that_finishes_while_status_is_read(store):
+    async def main():
+        gate = asyncio.Event()
+
+        async def handler(payload):
+            await gate.wait()
+            return {"success": True, "videoUrl": "x"}
+
+        # poll_interval büyük: uyandırma kaçarsa wait timeout'a kadar takılır
+        queue = JobQueue(store, handler, workers=1, max_depth=10, poll_interval=30)
+        await queue.start()
+        try:
+            job_id = await queue.submit({"question_id": "q1"})
+            store.read_delay = 0.2
+            waiter = asyncio.create_task(queue.wait(job_id, timeout=10))
+            await asyncio.sleep(0.05)  # wait() ilk get() içinde (iş hâlâ running okunacak)
+            gate.set()
+            started = time.monotonic()
+            job = await waiter
+            return job, time.monotonic() - started, queue._waiters
+        finally:
+            await queue.stop()
+
+    job, elapsed, waiters = asyncio.run(main())
+    assert job.status == JOB_COMPLETED
+    assert job.result == {"success": True, "videoUrl": "x"}
+    assert elapsed < 2
+    assert waiters == {}
+
+
+def test_wait_returns_unfinished_job_after_timeout(store):
+    async def main():
+        async def handler(payload):
+            await asyncio.sleep(10)
+            return {"success": True}
+
+        queue = JobQueue(store, handler, workers=1, max_depth=10, poll_interval=0.05)
+        await queue.start()
+        try:
+            job_id = await queue.submit({"question_id": "q1"})
+            started = time.monotonic()
+            job = await queue.wait(job_id, timeout=0.3)
+            return job, time.monotonic() - started, queue._waiters
+        finally:
+            await queue.stop()
+
+    job, elapsed, waiters = asyncio.run(main())
+    assert job.status == JOB_RUNNING
+    assert 0.3 <= elapsed < 2
+    assert waiters == {}
+
+
+def test_wait_for_unknown_job_returns_none(store):
+    async def main():
+        queue = JobQueue(store, handler=None, workers=1, max_depth=10)
+        return await queue.wait("missing", timeout=5)
+
+    assert asyncio.run(main()) is None
+
+
+def test_requeue_running_respects_max_attempts(store):
+    store.create("job-1", {"question_id": "q1"})
+
+    assert store.claim_next().attempts == 1
+    assert store.requeue_running(max_attempts=2) == (1, 0)
+    assert store.get("job-1").status == JOB_QUEUED
+
+    assert store.claim_next().attempts == 2
+    assert store.requeue_running(max_attempts=2) == (0, 1)
+
+    job = store.get("job-1")
+    assert job.status == JOB_FAILED
+    assert "2 denemede" in job.error
+    assert store.claim_next() is None
+
+
+def test_queue_start_fails_exhausted_jobs_instead_of_running_them(store):
+    # crasher her alındığında instance'ı düşürdü: 3. denemede yine running kaldı
+    store.create("crasher", {"question_id": "q1"})
+    for _ in range(2):
+        store.claim_next()
+        store.requeue_running(max_attempts=10)
+    assert store.claim_next().attempts == 3
+    store.create("ok", {"question_id": "q2"})
+
+    handled = []
+
+    async def main():
+        async def handler(payload):
+            handled.append(payload["question_id"])
+            return {"success": True}
+
+        queue = JobQueue(store, handler, workers=1, max_depth=10, max_attempts=3, poll_interval=0.05)
+        await queue.start()
+        try:
+            return await queue.wait("ok", timeout=5)
+        finally:
+            await queue.stop()
+
+    ok = asyncio.run(main())
+    assert ok.status == JOB_COMPLETED
+    assert handled == ["q2"]
+    assert store.get("crasher").status == JOB_FAILED
+
+
+def test_submit_batch_admits_only_free_capacity(store):
+    async def main():
+        queue = JobQueue(store, handler=None, workers=2, max_depth=5)
+        await queue.submit({"question_id": "q0"})
+        await queue.submit({"question_id": "q1"})
+
+        batch_id, job_ids = await queue.submit_batch([{"question_id": f"b{i}"} for i in range(8)])
+        batch = await queue.get_batch(batch_id)
+        with pytest.raises(QueueFullError) as full:
+            await queue.submit_batch([{"question_id": "late"}])
+        return job_ids, batch, full.value, await queue.depth()
+
+    job_ids, batch, full, depth = asyncio.run(main())
+    assert len(job_ids) == 3
+    assert [job.payload["question_id"] for job in batch] == ["b0", "b1", "b2"]
+    assert depth == 5
+    assert full.depth == 5 and full.retry_after >= 5
+
+
+def test_submit_batch_admits_request_prefix_and_orders_it_by_key(store):
+    async def main():
+        queue = JobQueue(store, handler=None, workers=2, max_depth=4)
+        payloads = [{"question_id": f"b{i}", "subject": subject}
+                    for i, subject in enumerate(["mat", "fiz", "mat", "fiz", "mat"])]
+        order = {"mat": 0, "fiz": 1}
+        batch_id, job_ids = await queue.submit_batch(payloads, key=lambda p: order[p["subject"]])
+        return job_ids, await queue.get_batch(batch_id)
+
+    job_ids, batch = asyncio.run(main())
+    # Kabul edilen kısım istek sırasının başı; job_ids payload sırasıyla eşleşir
+    assert len(job_ids) == 4
+    by_id = {job.id: job.payload["question_id"] for job in batch}
+    assert [by_id[job_id] for job_id in job_ids] == ["b0", "b1", "b2", "b3"]
+    # Çalışma sırası ders grubuna göre, grup içinde istek sırası
+    assert [job.payload["question_id"] for job in batch] == ["b0", "b2", "b1", "b3"]
+
+
+def test_concurrent_submits_do_not_overshoot_max_depth(store):
+    async def main():
+        queue = JobQueue(store, handler=None, workers=1, max_depth=5)
+        results = await asyncio.gather(
+            *(queue.submit({"question_id": f"q{i}"}) for i in range(12)),
+            queue.submit_batch([{"question_id": f"b{i}"} for i in range(4)]),
+            return_exceptions=True
+        )
+        return results, await queue.depth()
+
+    results, depth = asyncio.run(main())
+    admitted = [r for r in results[:12] if isinstance(r, str)]
+    batch = results[12]
+    batch_admitted = 0 if isinstance(batch, QueueFullError) else len(batch[1])
+    assert depth == 5
+    assert len(admitted) + batch_admitted == 5
+    assert all(isinstance(r, (str, QueueFullError)) for r in results[:12])
+
+
+class PausedClaimStore(SQLiteJobStore):
+    """İlk claim_next boş sorgudan sonra bekletilir: submit tam sorgu ile uyku arasına denk gelir"""
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.entered = threading.Event()
+        self.release = threading.Event()
+
+    def claim_next(self):
+        job = super().claim_next()
+        if not self.release.is_set():
+            self.entered.set()
+            self.release.wait(5)
+        return job
+
+
+def test_worker_does_not_miss_submit_during_empty_claim(tmp_path):
+    store = PausedClaimStore(tmp_path / "jobs.db")
+    handled = []
+
+    async def handler(payload):
+        handled.append(payload["question_id"])
+        return {"success": True}
+
+    async def main():
+        queue = JobQueue(store, handler=handler, workers=1, max_depth=5, poll_interval=5.0)
+        await queue.start()
+        await asyncio.to_thread(store.entered.wait, 5)
+        job_id = await queue.submit({"question_id": "q1"})
+        store.release.set()
+        job = await queue.wait(job_id, timeout=1.5)
+        await queue.stop()
+        return job
+
+    job = asyncio.run(main())
+    assert job.status == JOB_COMPLETED
+    assert handled == ["q1"]
@@ -0,0 +1,106 @@
+"""AnimationMatcher: kategori başına eski döngüyle (kelime +2, kalıp +3) birebir aynı puanlar"""
+
+import re
+import json
+import random
+from pathlib import Path
+
+import pytest
+
+from templates.matcher import AnimationMatcher
+from templates.smart_renderer import (
+    ANIMATION_MATCHER, ANIMATION_PATTERNS, detect_animations, merge_scores, rank_animations,
+)
+
+CORPUS = Path(__file__).resolve().parent.parent / "benchmarks" / "corpus.json"
+
+
+def reference_scores(patterns, text):
+    """user-017 öncesi detect_animations döngüsü"""
+    text_lower = text.lower()
+    scores = {}
+    for anim_type, config in patterns.items():
+        score = 0
+        for keyword in config["keywords"]:
+            if keyword.lower() in text_lower:
+                score += 2
+        for pattern in config["patterns"]:
+            if re.search(pattern, text, re.IGNORECASE):
+                score += 3
+        if score > 0:
+            scores[anim_type] = score
+    return scores
+
+
+def sample_texts():
+    rng = random.Random(17)
+    texts = ["", "   ", "Soruyu çözelim!", "DENKLEM ve Üçgen", "5 x 3 = 15", "12cm 7 m² 45°",
+             "v = 20 m/s, t = 4 saniye", "10 N kuvvet 3 kg", "12 V, 2 A, 6 Ω", "%40 ve 40% ve 3/4",
+             "(2, 3) noktası f(x) = 2x + 1", "2x^2", "x", "H2O molekülü", "12\n cm", "9 KM/H"]
+    for config in ANIMATION_PATTERNS.values():
+        texts.extend(config["keywords"])
+        texts.extend(keyword.upper() for keyword in config["keywords"])
+    keywords = [k for config in ANIMATION_PATTERNS.values() for k in config["keywords"]]
+    for _ in range(300):
+        words = rng.sample(keywords, rng.randint(1, 6)) + [str(rng.randint(0, 999)) for _ in range(2)]
+        words += rng.sample(["cm", "m²", "°", "%", "/4", "m/s", "km/h", "saniye", "N", "kg", "V", "A", "Ω", "x"], 3)
+        rng.shuffle(words)
+        texts.append(rng.choice([" ", "", "\n"]).join(words))
+
+    corpus = [json.dumps(q, ensure_ascii=False) for q in json.loads(CORPUS.read_text(encoding="utf-8"))]
+    texts.extend(corpus)
+    for _ in range(300):
+        source = rng.choice(corpus)
+        start = rng.randrange(len(source))
+        texts.append(source[start:start + rng.randint(1, 120)])
+    return texts
+
+
+TEXTS = sample_texts()
+
+
+def test_scores_match_reference_loop():
+    mismatches = [t for t in TEXTS if ANIMATION_MATCHER.score(t) != reference_scores(ANIMATION_PATTERNS, t)]
+    assert mismatches == []
+
+
+def test_detect_animations_matches_reference_ranking():
+    for text in TEXTS:
+        scores = reference_scores(ANIMATION_PATTERNS, text)
+        ordered = sorted(scores.items(), key=lambda x: x[1], reverse=True)
+        expected = [anim for anim, score in ordered[:3] if score >= 2] or ["hesaplama"]
+        assert detect_animations(text) == expected, text
+
+
+def test_merge_scores_sums_parts_in_table_order():
+    question = ANIMATION_MATCHER.score("üçgenin alanı 12 cm")
+    scenario = ANIMATION_MATCHER.score("x = 4 ise denklem")
+    merged = merge_scores(question, scenario)
+    assert list(merged) == [name for name in ANIMATION_MATCHER.categories if name in merged]
+    for name in set(question) | set(scenario):
+        assert merged[name] == question.get(name, 0) + scenario.get(name, 0)
+    assert merge_scores({}, {}) == {}
+
+
+@pytest.mark.parametrize("text", [
+    "kare", "3 cm kare", "12kg ve 7 N", "x = 4", "5 km/h 5 m/s", "Kare kare KARE", "",
+])
+def test_custom_table_with_shared_keywords_and_patterns(text):
+    # Aynı kelime iki kategoride (ve bir kategoride iki kez), aynı kalıp iki kategoride,
+    # sayı önekli ve öneksiz kalıplar karışık
+    patterns = {
+        "a": {"keywords": ["kare", "KARE", "x ="], "patterns": [r"\d+\s*cm", r"\d+\s*kg", r"x\s*="]},
+        "b": {"keywords": ["kare", "km/h"], "patterns": [r"\d+\s*cm", r"\d+\s*m/s"]},
+        "c": {"keywords": [], "patterns": [r"\d+\s*N", r"[xyz]\s*="]},
+    }
+    matcher = AnimationMatcher(patterns)
+    assert matcher.score(text) == reference_scores(patterns, text)
+    assert rank_animations(matcher.score(text)) == rank_animations(reference_scores(patterns, text))
+
+
+def test_fingerprint_tracks_the_table():
+    same = AnimationMatcher(json.loads(json.dumps(ANIMATION_PATTERNS)))
+    changed = json.loads(json.dumps(ANIMATION_PATTERNS))
+    changed["mathtex"]["keywords"].append("yeni")
+    assert same.fingerprint == ANIMATION_MATCHER.fingerprint
+    assert AnimationMatcher(changed).fingerprint != ANIMATION_MATCHER.fingerprint
@@ -0,0 +1,89 @@
+"""templates.routing: template + adlı animasyon profili, içerik hash'i ve tablo özeti kontrolü"""
+
+import gzip
+import json
+
+import pytest
+
+from templates.base import get_template_for_subject
+from templates.routing import (
+    RoutingTable, classify_file, classify_rows, decode_profile, encode_profile, read_routing,
+)
+from templates.smart_renderer import ANIMATION_MATCHER, rank_animations
+
+ROWS = [
+    {"question_id": "q1", "subject_name": "Matematik", "topic_name": "Üçgenler",
+     "question_text": "Bir üçgenin kenarları 3 cm ve 4 cm ise alanı kaçtır?"},
+    {"question_id": "q2", "subject_name": "Fizik", "topic_name": "Hareket",
+     "question_text": "20 m/s hızla giden araç 5 saniyede ne kadar yol alır?"},
+    {"id": 3, "subject_name": "Tarih", "topic_name": "Osmanlı", "question_text": ""},
+]
+
+
+@pytest.fixture
+def routing_file(tmp_path):
+    src = tmp_path / "questions.jsonl"
+    src.write_text("\n".join(json.dumps(row, ensure_ascii=False) for row in ROWS) + "\n", encoding="utf-8")
+    dst = tmp_path / "routing.json.gz"
+    stats = classify_file(str(src), str(dst), workers=1)
+    assert stats["rows"] == len(ROWS)
+    return dst
+
+
+def test_rows_get_template_and_named_profile():
+    for row, (question_id, _, template, animations) in zip(ROWS, classify_rows(ROWS)):
+        assert question_id == str(row.get("question_id") or row["id"])
+        assert template == get_template_for_subject(row["subject_name"], row["topic_name"])
+        scores = ANIMATION_MATCHER.score(row["question_text"])
+        assert decode_profile(animations) == scores
+        assert all(name in ANIMATION_MATCHER.categories for name in decode_profile(animations))
+
+
+def test_profile_round_trip_keeps_ranking():
+    scores = {"mathtex": 2, "geometri": 9, "molekul": 3, "dna": 2}
+    encoded = encode_profile(scores)
+    assert encoded == "geometri:9,molekul:3,mathtex:2,dna:2"
+    assert rank_animations(decode_profile(encoded)) == rank_animations(scores)
+    assert decode_profile("") == {}
+
+
+def test_table_lookup_checks_question_text(routing_file):
+    table = RoutingTable.load(str(routing_file))
+    assert len(table) == 3 and table.current
+
+    route = table.get("q1", ROWS[0]["question_text"])
+    assert route["template"] == "matematik_geometri"
+    assert route["scores"] == ANIMATION_MATCHER.score(ROWS[0]["question_text"])
+    assert route["animations"] == rank_animations(route["scores"])
+
+    assert table.get("q1", ROWS[0]["question_text"] + " (düzenlendi)") is None
+    assert table.stale == 1
+    assert table.get("missing", "") is None
+
+
+def test_table_from_other_pattern_table_keeps_names_but_drops_scores(routing_file, tmp_path):
+    with gzip.open(routing_file, "rt", encoding="utf-8") as f:
+        data = json.load(f)
+    data["matcher"] = "eski"
+    other = tmp_path / "old.json.gz"
+    with gzip.open(other, "wt", encoding="utf-8") as f:
+        json.dump(data, f)
+
+    table = RoutingTable.load(str(other))
+    route = table.get("q2", ROWS[1]["question_text"])
+    assert not table.current
+    assert route["template"] == "fizik_mekanik" and "hareket" in route["animations"]
+    assert route["scores"] is None
+
+
+def test_old_version_is_rejected(routing_file, tmp_path):
+    columns, _ = read_routing(str(routing_file))
+    assert set(columns) == {"question_id", "content_hash", "template", "animations"}
+    with gzip.open(routing_file, "rt", encoding="utf-8") as f:
+        data = json.load(f)
+    data["version"] = 1
+    old = tmp_path / "v1.json.gz"
+    with gzip.open(old, "wt", encoding="utf-8") as f:
+        json.dump(data, f)
+    with pytest.raises(ValueError):
+        RoutingTable.load(str(old))
@@ -0,0 +1,135 @@
+"""StageGraph: bağımlılık sırası, until ile erken dönüş ve hata / iptal yayılımı"""
+
+import asyncio
+
+import pytest
+
+from pipeline.stages import StageGraph
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_dependent_stage_waits_for_result():
+    events = []
+
+    async def scenario(ctx):
+        events.append("scenario:start")
+        await asyncio.sleep(0.05)
+        events.append("scenario:end")
+        return {"steps": 3}
+
+    async def tts(ctx):
+        events.append("tts:start")
+        scenario_result = await ctx.result("scenario")
+        events.append("tts:got-scenario")
+        return scenario_result["steps"] * 2
+
+    graph = StageGraph().add("scenario", scenario).add("tts", tts)
+    results = run(graph.run())
+
+    assert results == {"scenario": {"steps": 3}, "tts": 6}
+    # Tüm aşamalar t=0'da başlar, bağımlı aşama yalnızca join noktasında bekler
+    assert events.index("tts:start") < events.index("scenario:end") < events.index("tts:got-scenario")
+    assert graph.timings["tts"]["start"] < graph.timings["scenario"]["end"] <= graph.timings["tts"]["end"]
+
+
+def test_independent_stages_run_concurrently():
+    async def slow(ctx):
+        await asyncio.sleep(0.1)
+        return True
+
+    graph = StageGraph().add("a", slow).add("b", slow).add("c", slow)
+    loop_time = []
+
+    async def main():
+        started = asyncio.get_running_loop().time()
+        results = await graph.run()
+        loop_time.append(asyncio.get_running_loop().time() - started)
+        return results
+
+    assert run(main()) == {"a": True, "b": True, "c": True}
+    assert loop_time[0] < 0.25
+
+
+def test_until_returns_early_and_cancels_pending_stages():
+    cancelled = []
+
+    async def code(ctx):
+        await asyncio.sleep(0.01)
+        return "code"
+
+    async def optional_asset(ctx):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append("optional_asset")
+            raise
+
+    graph = StageGraph().add("code", code).add("optional_asset", optional_asset)
+    results = run(graph.run(until="code"))
+
+    assert results == {"code": "code"}
+    assert cancelled == ["optional_asset"]
+
+
+def test_failing_stage_cancels_all_pending_stages():
+    cancelled = []
+
+    async def scenario(ctx):
+        await asyncio.sleep(0.01)
+        raise RuntimeError("gemini down")
+
+    async def tts(ctx):
+        try:
+            await ctx.result("scenario")
+        except asyncio.CancelledError:
+            cancelled.append("tts")
+            raise
+
+    async def music(ctx):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append("music")
+            raise
+
+    graph = StageGraph().add("scenario", scenario).add("tts", tts).add("music", music)
+    with pytest.raises(RuntimeError, match="gemini down"):
+        run(graph.run())
+
+    # Hata run()'dan yükselmeden önce bekleyen tüm aşamalar iptal edilip sonlanmış olur
+    assert sorted(cancelled) == ["music", "tts"]
+    assert set(graph.timings) == {"scenario", "tts", "music"}
+
+
+def test_cancelled_dependent_does_not_cancel_shared_stage():
+    async def shared(ctx):
+        await asyncio.sleep(0.05)
+        return "shared"
+
+    async def impatient(ctx):
+        try:
+            return await asyncio.wait_for(ctx.result("shared"), timeout=0.01)
+        except asyncio.TimeoutError:
+            return "gave up"
+
+    async def patient(ctx):
+        return await ctx.result("shared")
+
+    # impatient'ın beklemeyi bırakması shared'ı iptal etmez (ctx.result shield'lı)
+    graph = StageGraph().add("shared", shared).add("impatient", impatient).add("patient", patient)
+    assert run(graph.run()) == {"shared": "shared", "impatient": "gave up", "patient": "shared"}
+
+
+def test_unknown_and_duplicate_stages():
+    async def bad(ctx):
+        return await ctx.result("missing")
+
+    with pytest.raises(KeyError):
+        run(StageGraph().add("bad", bad).run())
+
+    graph = StageGraph().add("a", bad)
+    with pytest.raises(ValueError):
+        graph.add("a", bad)
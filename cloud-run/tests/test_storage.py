@@ -0,0 +1,57 @@
+"""SupabaseStorageTier.get: veri geçici dosyaya akıtılıp yerine taşınır"""
+
+import asyncio
+
+import httpx
+import pytest
+
+import cache.storage as storage
+from cache.storage import SupabaseStorageTier
+
+PAYLOAD = bytes(range(256)) * 4096  # 1 MB, birden çok parça
+
+
+@pytest.fixture
+def tier(monkeypatch):
+    monkeypatch.setattr(storage, "SUPABASE_URL", "https://example.supabase.co")
+    monkeypatch.setattr(storage, "SUPABASE_SERVICE_KEY", "key")
+    return SupabaseStorageTier("bucket", "tts", suffix=".mp3")
+
+
+def serve(monkeypatch, handler):
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(storage, "get_client", lambda name: client)
+
+
+def test_get_streams_data_into_dest(tier, monkeypatch, tmp_path):
+    def handler(request):
+        if request.url.path.endswith(".json"):
+            return httpx.Response(200, json={"duration": 1.5})
+        return httpx.Response(200, content=PAYLOAD)
+
+    serve(monkeypatch, handler)
+    dest = tmp_path / "out" / "clip.mp3"
+    meta = asyncio.run(tier.get("abc", dest))
+
+    assert meta == {"duration": 1.5}
+    assert dest.read_bytes() == PAYLOAD
+    assert [p.name for p in dest.parent.iterdir()] == ["clip.mp3"]
+    assert (tier.hits, tier.misses) == (1, 0)
+
+
+def test_interrupted_download_leaves_no_partial_dest(tier, monkeypatch, tmp_path):
+    class Broken(httpx.AsyncByteStream):
+        async def __aiter__(self):
+            yield PAYLOAD[:1000]
+            raise httpx.ReadError("bağlantı koptu")
+
+    def handler(request):
+        if request.url.path.endswith(".json"):
+            return httpx.Response(200, json={})
+        return httpx.Response(200, stream=Broken())
+
+    serve(monkeypatch, handler)
+    dest = tmp_path / "clip.mp3"
+    assert asyncio.run(tier.get("abc", dest)) is None
+    assert list(tmp_path.iterdir()) == []
+    assert tier.misses == 1
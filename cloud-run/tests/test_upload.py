@@ -0,0 +1,30 @@
+"""multipart_file_body: httpx files= ile aynı gövde, dosya thread'de parça parça okunur"""
+
+import asyncio
+
+import httpx
+
+from pipeline.upload import multipart_file_body
+
+
+async def collect(body):
+    return b"".join([chunk async for chunk in body])
+
+
+def test_multipart_body_matches_httpx_encoding(tmp_path):
+    video = tmp_path / "video.mp4"
+    video.write_bytes(b"\x00\x01video" * 100_000)
+    fields = {"metadata": '{"title": "Çözüm videosu"}'}
+
+    headers, body = multipart_file_body(fields, "video", video, "q1.mp4", "video/mp4")
+    content = asyncio.run(collect(body))
+
+    with open(video, "rb") as f:
+        expected = httpx.Request(
+            "POST", "https://example.com/upload", data=fields,
+            files={"video": ("q1.mp4", f, "video/mp4")},
+            headers={"Content-Type": headers["Content-Type"]},
+        ).read()
+
+    assert content == expected
+    assert int(headers["Content-Length"]) == len(content)
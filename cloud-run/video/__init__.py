@@ -0,0 +1,34 @@
+"""
+Teknokul Video Modülü
+Render sonrası video işlemleri, render profilleri, render önbellekleri ve Manim worker havuzu
+"""
+
+from .ffmpeg import probe_video_stream, has_audio_stream, can_stream_copy, concat_videos, trim_video
+from .outro_clip import OutroClipCache
+from .profiles import (
+    RenderProfile,
+    RENDER_PROFILES,
+    DEFAULT_RENDER_PROFILE,
+    get_render_profile,
+    apply_render_profile,
+    render_ladder,
+)
+from .render_pool import ManimWorkerPool, RenderResult, WorkerStartError
+
+__all__ = [
+    "probe_video_stream",
+    "has_audio_stream",
+    "can_stream_copy",
+    "concat_videos",
+    "trim_video",
+    "OutroClipCache",
+    "RenderProfile",
+    "RENDER_PROFILES",
+    "DEFAULT_RENDER_PROFILE",
+    "get_render_profile",
+    "apply_render_profile",
+    "render_ladder",
+    "ManimWorkerPool",
+    "RenderResult",
+    "WorkerStartError",
+]
@@ -0,0 +1,108 @@
+"""
+Teknokul Video FFmpeg Yardımcıları
+🎞️ Stream özelliklerini okuma, kırpma ve video birleştirme
+"""
+
+import json
+import asyncio
+from pathlib import Path
+from typing import List, Optional
+
+from pipeline.process import run_process
+from templates import get_ffmpeg_concat_command, get_ffmpeg_concat_copy_command
+
+# Stream copy ile birleştirmek için eşleşmesi gereken alanlar
+CONCAT_COMPAT_FIELDS = ("codec_name", "profile", "width", "height", "pix_fmt", "r_frame_rate", "time_base")
+
+
+async def probe_video_stream(video_path: Path) -> Optional[dict]:
+    """FFprobe ile ilk video stream'inin codec parametrelerini oku"""
+    try:
+        result = await run_process(
+            ["ffprobe", "-v", "error", "-select_streams", "v:0",
+             "-show_entries", "stream=" + ",".join(CONCAT_COMPAT_FIELDS),
+             "-of", "json", video_path],
+            timeout=30, step="ffprobe video"
+        )
+        streams = json.loads(result.stdout).get("streams", [])
+        return streams[0] if streams else None
+    except Exception as e:
+        print(f"⚠️ FFprobe hatası: {e}")
+        return None
+
+
+async def has_audio_stream(video_path: Path) -> bool:
+    """Videoda ses stream'i var mı?"""
+    try:
+        result = await run_process(
+            ["ffprobe", "-v", "error", "-select_streams", "a",
+             "-show_entries", "stream=index", "-of", "csv=p=0", video_path],
+            timeout=30, step="ffprobe audio"
+        )
+        return bool(result.stdout.strip())
+    except Exception:
+        return False
+
+
+async def can_stream_copy(videos: List[Path]) -> bool:
+    """Tüm videoların codec parametreleri aynı mı? (ses stream'i olmamalı)"""
+    params = await asyncio.gather(*[probe_video_stream(v) for v in videos])
+    if any(p is None for p in params):
+        return False
+    audio = await asyncio.gather(*[has_audio_stream(v) for v in videos])
+    if any(audio):
+        return False
+    first = {k: params[0].get(k) for k in CONCAT_COMPAT_FIELDS}
+    return all({k: p.get(k) for k in CONCAT_COMPAT_FIELDS} == first for p in params[1:])
+
+
+async def concat_videos(videos: List[Path], output_path: Path) -> bool:
+    """
+    Videoları sırayla birleştir
+    - Codec parametreleri aynıysa: concat demuxer + stream copy (encode yok)
+    - Değilse: concat filtresi ile yeniden encode (sadece iki video)
+    """
+    if await can_stream_copy(videos):
+        list_file = output_path.with_suffix(".concat.txt")
+        with open(list_file, "w") as f:
+            for video in videos:
+                f.write(f"file '{video.resolve()}'\n")
+        cmd = get_ffmpeg_concat_copy_command(str(list_file), str(output_path))
+        mode = "stream copy"
+    elif len(videos) == 2:
+        cmd = get_ffmpeg_concat_command(
+            str(videos[0]), str(videos[1]), str(output_path),
+            with_audio=all(await asyncio.gather(has_audio_stream(videos[0]), has_audio_stream(videos[1])))
+        )
+        mode = "re-encode"
+    else:
+        print("⚠️ Codec parametreleri farklı, birleştirme atlandı")
+        return False
+
+    try:
+        result = await run_process(cmd, timeout=180, step=f"ffmpeg concat ({mode})")
+        if result.ok and output_path.exists():
+            print(f"✅ Videolar birleştirildi ({mode})")
+            return True
+        print(f"⚠️ Video birleştirme hatası: {result.stderr[-500:]}")
+        return False
+    except Exception as e:
+        print(f"⚠️ Video birleştirme hatası: {e}")
+        return False
+
+
+
+async def trim_video(video_path: Path, output_path: Path, duration: float) -> bool:
+    """Videoyu ilk duration saniyeye kırp (stream copy, encode yok)"""
+    try:
+        result = await run_process(
+            ["ffmpeg", "-y", "-i", video_path, "-t", f"{duration:.3f}", "-c", "copy", output_path],
+            timeout=60, step="ffmpeg trim"
+        )
+        if result.ok and output_path.exists():
+            return True
+        print(f"⚠️ Video kırpma hatası: {result.stderr[-500:]}")
+        return False
+    except Exception as e:
+        print(f"⚠️ Video kırpma hatası: {e}")
+        return False
@@ -0,0 +1,78 @@
+"""
+Teknokul Outro Klip Önbelleği
+🎬 Outro (çözünürlük, fps, stil versiyonu) başına bir kez render edilir,
+sonraki videolarda stream copy ile ana sahnenin arkasına eklenir
+"""
+
+import asyncio
+import tempfile
+from pathlib import Path
+from typing import Dict, Optional
+
+from cache import DiskCache, content_key
+from pipeline.process import run_process
+from templates import get_outro_render_script, get_outro_code, OUTRO_STYLE_VERSION
+
+
+class OutroClipCache:
+    """Önceden render edilmiş outro klipleri"""
+
+    def __init__(self, root: Path, max_bytes: int = 200 * 1024 * 1024):
+        self.disk = DiskCache(root, max_bytes=max_bytes, suffix=".mp4")
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    @staticmethod
+    def cache_key(width: int, height: int, fps: int) -> str:
+        # Stil versiyonu + sahne kodu: tasarım değişince eski klipler kullanılmaz
+        return content_key("outro", OUTRO_STYLE_VERSION, width, height, fps, get_outro_code())
+
+    async def get(self, width: int = 1080, height: int = 1920, fps: int = 30) -> Optional[Path]:
+        """
+        Outro klibini döndür, yoksa render et (aynı anda tek render)
+        - Disk önbelleği okuma / yazma thread'de: event loop'u bloklamaz
+        """
+        key = self.cache_key(width, height, fps)
+
+        entry = await asyncio.to_thread(self.disk.get, key)
+        if entry:
+            return entry[0]
+
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            entry = await asyncio.to_thread(self.disk.get, key)
+            if entry:
+                return entry[0]
+
+            print(f"🎬 Outro klibi render ediliyor ({width}x{height} @{fps}fps)...")
+            clip = await self._render(width, height, fps, key)
+            return clip
+
+    async def _render(self, width: int, height: int, fps: int, key: str) -> Optional[Path]:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_path = Path(temp_dir)
+            script_path = temp_path / "outro_scene.py"
+            script_path.write_text(get_outro_render_script(width, height, fps), encoding="utf-8")
+
+            try:
+                result = await run_process(
+                    ["manim", "render", "--format=mp4", script_path, "OutroScene"],
+                    timeout=180, cwd=temp_path, step="manim outro"
+                )
+            except Exception as e:
+                print(f"⚠️ Outro render hatası: {e}")
+                return None
+
+            if not result.ok:
+                print(f"⚠️ Outro render hatası: {result.stderr[-500:]}")
+                return None
+
+            for video_file in temp_path.rglob("OutroScene.mp4"):
+                cached = await asyncio.to_thread(self.disk.put, key, video_file, {
+                    "width": width, "height": height, "fps": fps,
+                    "style_version": OUTRO_STYLE_VERSION
+                })
+                print("✅ Outro klibi önbelleğe alındı")
+                return cached
+
+            print("⚠️ Outro klibi bulunamadı")
+            return None
@@ -0,0 +1,114 @@
+"""
+Teknokul Render Profilleri
+🎚️ Render maliyeti ile kalite arasında istek bazında seçim
+- draft: önizleme (540x960 @15fps), yayınlanmaz
+- standard: yayın kalitesi (1080x1920 @30fps)
+- final: standard + tek geçişte çözünürlük merdiveni (adaptif dağıtım)
+Script'lerdeki config satırları profile göre yeniden yazılır; Manim bayrakları aynı
+değerleri taşır, böylece script ile komut satırı çelişmez
+"""
+
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from pipeline.process import run_process
+
+
+@dataclass(frozen=True)
+class RenderProfile:
+    name: str
+    width: int
+    height: int
+    fps: int
+    # Ek çözünürlükler (genişlik, yükseklik): ana videodan tek ffmpeg geçişinde üretilir
+    ladder: Tuple[Tuple[int, int], ...] = ()
+    # False: önizleme, DB / YouTube'a gitmez
+    publish: bool = True
+
+    @property
+    def manim_flags(self) -> List[str]:
+        return ["--resolution", f"{self.width},{self.height}", "--fps", str(self.fps), "--format=mp4"]
+
+
+RENDER_PROFILES: Dict[str, RenderProfile] = {
+    "draft": RenderProfile("draft", 540, 960, 15, publish=False),
+    "standard": RenderProfile("standard", 1080, 1920, 30),
+    "final": RenderProfile("final", 1080, 1920, 30, ladder=((720, 1280), (540, 960))),
+}
+DEFAULT_RENDER_PROFILE = "standard"
+
+_CONFIG_LINES = {
+    "pixel_width": re.compile(r"^([ \t]*)config\.pixel_width\s*=.*$", re.MULTILINE),
+    "pixel_height": re.compile(r"^([ \t]*)config\.pixel_height\s*=.*$", re.MULTILINE),
+    "frame_rate": re.compile(r"^([ \t]*)config\.frame_rate\s*=.*$", re.MULTILINE),
+}
+
+
+def get_render_profile(name: str = None) -> RenderProfile:
+    return RENDER_PROFILES[name or DEFAULT_RENDER_PROFILE]
+
+
+def apply_render_profile(script: str, profile: RenderProfile) -> str:
+    """
+    Script'teki çözünürlük / fps satırlarını profile göre yeniden yaz
+    - Satır yoksa "from manim import *" sonrasına eklenir
+    """
+    values = {"pixel_width": profile.width, "pixel_height": profile.height, "frame_rate": profile.fps}
+    missing = []
+    for field, pattern in _CONFIG_LINES.items():
+        script, count = pattern.subn(lambda m, f=field: f"{m.group(1)}config.{f} = {values[f]}", script)
+        if not count:
+            missing.append(f"config.{field} = {values[field]}")
+
+    if missing:
+        block = "\n".join(missing)
+        if "from manim import *" in script:
+            script = script.replace("from manim import *", f"from manim import *\n{block}", 1)
+        else:
+            script = f"{block}\n{script}"
+    return script
+
+
+def build_ladder_command(video_path: Path, renditions: List[Tuple[int, int, Path]]) -> list:
+    """
+    Tek geçişli çözünürlük merdiveni: kaynak bir kez çözülür, split + scale ile her
+    basamak ayrı dosyaya encode edilir, ses stream copy
+    """
+    splits = "".join(f"[v{i}]" for i in range(len(renditions)))
+    filters = [f"[0:v]split={len(renditions)}{splits}"]
+    for i, (width, height, _) in enumerate(renditions):
+        filters.append(f"[v{i}]scale={width}:{height}:flags=lanczos[o{i}]")
+
+    cmd = ["ffmpeg", "-y", "-i", str(video_path), "-filter_complex", ";".join(filters)]
+    for i, (_, _, output_path) in enumerate(renditions):
+        cmd.extend([
+            "-map", f"[o{i}]", "-map", "0:a?",
+            "-c:v", "libx264", "-preset", "veryfast", "-crf", "23", "-pix_fmt", "yuv420p",
+            "-c:a", "copy", "-movflags", "+faststart",
+            str(output_path)
+        ])
+    return cmd
+
+
+async def render_ladder(video_path: Path, profile: RenderProfile, out_dir: Path) -> List[Tuple[int, Path]]:
+    """
+    Profilin merdiven basamaklarını üret: [(yükseklik, dosya)]
+    - Ana video en üst basamaktır, yeniden encode edilmez
+    """
+    if not profile.ladder:
+        return []
+    renditions = [(w, h, out_dir / f"rendition_{h}p.mp4") for w, h in profile.ladder]
+    try:
+        result = await run_process(
+            build_ladder_command(video_path, renditions),
+            timeout=300, step=f"ffmpeg ladder ({len(renditions)})"
+        )
+    except Exception as e:
+        print(f"⚠️ Çözünürlük merdiveni hatası: {e}")
+        return []
+    if not result.ok:
+        print(f"⚠️ Çözünürlük merdiveni hatası: {result.stderr[-500:]}")
+        return []
+    return [(h, path) for _, h, path in renditions if path.exists()]
@@ -0,0 +1,401 @@
+"""
+Teknokul Manim Worker Havuzu
+🏭 Kalıcı render süreçleri: manim / numpy / cairo / pango importu ve font taraması süreç başına bir kez
+- Her worker script'i izole bir namespace'te çalıştırır, config iş bazında tempconfig ile verilir
+- N işten sonra veya RSS sınırı aşılınca worker yenilenir (sızıntı / parçalanma)
+- Timeout veya iptalde worker'ın process grubu öldürülür, yerine yenisi açılır
+- Text / MathTex SVG'leri (Manim text_dir / tex_dir) worker'lar ve restart'lar arasında paylaşılır
+- Havuz açılamazsa (örn. manim import hatası) çağıran CLI render'a döner
+"""
+
+import os
+import time
+import shutil
+import signal
+import asyncio
+import tempfile
+import traceback
+import multiprocessing
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional, Set
+
+from pipeline.metrics import record_step
+
+# Worker'ın başlangıçta manim importu için beklenen süre
+STARTUP_TIMEOUT = 120
+
+
+class WorkerStartError(RuntimeError):
+    """
+    Worker açılamadı
+    - permanent=True: manim import edilemedi, tekrar denemek anlamsız
+    - permanent=False: STARTUP_TIMEOUT aşıldı / süreç düştü (yoğun instance), sonraki render yeniden dener
+    """
+
+    def __init__(self, message: str, permanent: bool = False):
+        super().__init__(message)
+        self.permanent = permanent
+
+
+@dataclass
+class RenderResult:
+    ok: bool
+    output: Optional[Path] = None
+    error: str = ""
+    duration: float = 0.0
+    timed_out: bool = False
+
+
+# ============================================================
+# WORKER SÜRECİ
+# ============================================================
+
+def _rss_mb() -> float:
+    """Anlık RSS (MB); /proc yoksa tepe RSS"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _reset_mobject_defaults(base) -> None:
+    """Script'lerin set_default ile değiştirdiği __init__ varsayılanlarını geri al (örn. Text font)"""
+    pending = [base]
+    while pending:
+        cls = pending.pop()
+        pending.extend(cls.__subclasses__())
+        original = cls.__dict__.get("_original__init__")
+        if original is not None and cls.__dict__.get("__init__") is not original:
+            cls.__init__ = original
+
+
+class TextCache:
+    """
+    Manim'in Text (Pango) ve MathTex (LaTeX) SVG önbelleği, worker'lar arasında paylaşımlı
+    - Manim dosya adını içerikten üretir (metin, font, boyut, kalınlık, renk...): aynı ad = aynı SVG
+    - Worker kendi staging dizinine yazar: aynı metni aynı anda üreten iki süreç yarım dosya okumaz
+    - pull(): paylaşımlı dizindeki yeni SVG'ler staging'e hard link'lenir
+    - push(): worker'ın ürettiği yeni SVG'ler paylaşımlı dizine atomik olarak (os.replace) yayınlanır
+    """
+
+    SUBDIRS = {"text_dir": "texts", "tex_dir": "Tex"}
+
+    def __init__(self, shared: Path, staging: Path):
+        self.shared = shared
+        self.staging = staging
+        self._known: Dict[str, Set[str]] = {name: set() for name in self.SUBDIRS.values()}
+        for name in self.SUBDIRS.values():
+            (shared / name).mkdir(parents=True, exist_ok=True)
+            (staging / name).mkdir(parents=True, exist_ok=True)
+
+    @property
+    def config(self) -> Dict[str, str]:
+        return {key: str(self.staging / name) for key, name in self.SUBDIRS.items()}
+
+    @staticmethod
+    def _link(src: str, dst: Path) -> None:
+        try:
+            os.link(src, dst)
+        except FileExistsError:
+            pass
+        except OSError:
+            shutil.copy2(src, dst)
+
+    def pull(self) -> None:
+        for name, known in self._known.items():
+            for entry in os.scandir(self.shared / name):
+                if entry.name.endswith(".svg") and entry.name not in known:
+                    self._link(entry.path, self.staging / name / entry.name)
+                    known.add(entry.name)
+
+    def push(self) -> int:
+        published = 0
+        for name, known in self._known.items():
+            for entry in os.scandir(self.staging / name):
+                if entry.name.endswith(".svg") and entry.name not in known:
+                    tmp = self.shared / name / f".{entry.name}.{os.getpid()}.tmp"
+                    self._link(entry.path, tmp)
+                    os.replace(tmp, self.shared / name / entry.name)
+                    known.add(entry.name)
+                    published += 1
+        return published
+
+
+def _render_job(job: dict, text_cache: Optional[TextCache]) -> dict:
+    """scene None: script sadece çalıştırılır (Text önbelleği ısıtma)"""
+    import manim
+
+    started = time.monotonic()
+    script_path = Path(job["script_path"])
+    overrides = {
+        "media_dir": job["media_dir"],
+        "input_file": str(script_path),
+        "pixel_width": job["width"],
+        "pixel_height": job["height"],
+        "frame_rate": job["fps"],
+        "format": "mp4",
+        "write_to_movie": True,
+        "progress_bar": "none",
+        "verbosity": "WARNING",
+    }
+    if text_cache is not None:
+        text_cache.pull()
+        overrides.update(text_cache.config)
+    try:
+        output = None
+        with manim.tempconfig(overrides):
+            namespace = {"__name__": "__teknokul_scene__", "__file__": str(script_path)}
+            exec(compile(job["script"], str(script_path), "exec"), namespace)
+            if job["scene"]:
+                scene = namespace[job["scene"]]()
+                scene.render()
+                output = str(scene.renderer.file_writer.movie_file_path)
+        return {"ok": True, "output": output, "duration": time.monotonic() - started, "rss_mb": _rss_mb()}
+    except BaseException:
+        return {"ok": False, "error": traceback.format_exc()[-3000:],
+                "duration": time.monotonic() - started, "rss_mb": _rss_mb()}
+    finally:
+        _reset_mobject_defaults(manim.Mobject)
+        if text_cache is not None:
+            try:
+                text_cache.push()
+            except OSError as e:
+                print(f"⚠️ Text önbelleği yayınlanamadı: {e}")
+
+
+def _worker_main(conn, text_cache_dirs: Optional[tuple] = None) -> None:
+    """Worker döngüsü: manim bir kez import edilir, sonra iş başına bir script"""
+    # Kendi process grubu: timeout'ta alt süreçleriyle (ffmpeg) birlikte öldürülebilir
+    os.setsid()
+    try:
+        import manim
+    except BaseException:
+        conn.send({"ready": False, "error": traceback.format_exc()[-3000:]})
+        return
+
+    text_cache = None
+    if text_cache_dirs:
+        try:
+            text_cache = TextCache(*map(Path, text_cache_dirs))
+        except OSError as e:
+            print(f"⚠️ Text önbelleği kullanılamıyor: {e}")
+    conn.send({"ready": True, "version": getattr(manim, "__version__", "unknown")})
+
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            return
+        if job is None:
+            return
+        conn.send(_render_job(job, text_cache))
+
+
+# ============================================================
+# HAVUZ
+# ============================================================
+
+class _Worker:
+    def __init__(self, ctx, text_cache_dir: Optional[Path] = None):
+        # Staging dizini parent'ta açılır: worker öldürülse de parent temizler
+        self.staging = None
+        text_cache_dirs = None
+        if text_cache_dir is not None:
+            (text_cache_dir / "staging").mkdir(parents=True, exist_ok=True)
+            self.staging = tempfile.mkdtemp(prefix="worker-", dir=text_cache_dir / "staging")
+            text_cache_dirs = (str(text_cache_dir), self.staging)
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(target=_worker_main, args=(child_conn, text_cache_dirs), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.jobs = 0
+        self.rss_mb = 0.0
+
+    def wait(self, timeout: float) -> Optional[dict]:
+        """Bloklayan okuma (thread'de çalışır); timeout'ta None"""
+        if self.conn.poll(timeout):
+            return self.conn.recv()
+        return None
+
+    def kill(self) -> None:
+        # Bağlantı açık bırakılır: bekleyen okuma thread'i EOF alıp hemen çıkar
+        try:
+            os.killpg(self.process.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            self.process.kill()
+        self.process.join(5)
+        self._remove_staging()
+
+    def _remove_staging(self) -> None:
+        if self.staging:
+            shutil.rmtree(self.staging, ignore_errors=True)
+
+    def stop(self) -> None:
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(5)
+        if self.process.is_alive():
+            self.kill()
+        else:
+            self.conn.close()
+            self._remove_staging()
+
+
+class ManimWorkerPool:
+    """
+    Kalıcı Manim render süreçleri
+    - render(): boş worker'a iş gönderir, worker yoksa size'a kadar yenisini açar
+    - max_jobs / max_rss_mb: aşılınca worker iş sonunda kapatılıp yenisi açılır
+    - text_cache_dir: Text / MathTex SVG önbelleği (None: Manim varsayılanı, iş başına media dizini)
+    """
+
+    def __init__(self, size: int, max_jobs: int = 20, max_rss_mb: int = 1024,
+                 text_cache_dir: Optional[Path] = None):
+        self.size = max(1, size)
+        self.max_jobs = max_jobs
+        self.max_rss_mb = max_rss_mb
+        self.text_cache_dir = text_cache_dir
+        self._ctx = multiprocessing.get_context("spawn")
+        self._idle: asyncio.Queue = None
+        self._slots: asyncio.Semaphore = None
+        self._workers = set()
+        self.manim_version: Optional[str] = None
+        self.started = 0
+        self.recycled = 0
+        self.jobs = 0
+
+    def _ensure_loop_state(self) -> None:
+        # asyncio nesneleri çalışan event loop'ta oluşturulur
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.size)
+            self._idle = asyncio.Queue()
+
+    async def _spawn(self) -> _Worker:
+        worker = _Worker(self._ctx, self.text_cache_dir)
+        try:
+            hello = await asyncio.to_thread(worker.wait, STARTUP_TIMEOUT)
+        except (OSError, EOFError):
+            hello = None
+        except asyncio.CancelledError:
+            await asyncio.shield(asyncio.to_thread(worker.kill))
+            raise
+        if not hello or not hello.get("ready"):
+            await asyncio.to_thread(worker.kill)
+            raise WorkerStartError(
+                (hello or {}).get("error", "Manim worker başlatılamadı"),
+                permanent=bool(hello) and hello.get("ready") is False
+            )
+        self.manim_version = hello.get("version")
+        self._workers.add(worker)
+        self.started += 1
+        return worker
+
+    async def _retire(self, worker: _Worker, kill: bool = False) -> None:
+        self._workers.discard(worker)
+        await asyncio.to_thread(worker.kill if kill else worker.stop)
+
+    async def warm(self, count: int = 1) -> None:
+        """Startup'ta worker aç: ilk videonun import maliyeti de gizlenir"""
+        self._ensure_loop_state()
+        for _ in range(min(count, self.size) - self._idle.qsize()):
+            self._idle.put_nowait(await self._spawn())
+
+    async def render(self, script: str, scene_name: str, script_path: Path, media_dir: Path,
+                     width: int, height: int, fps: int, timeout: float = 300,
+                     step: str = "manim render") -> RenderResult:
+        """
+        Script'teki scene_name sahnesini render et
+        - Worker açılamazsa WorkerStartError yükselir
+        - Görev iptal edilirse worker öldürülüp CancelledError yeniden yükselir
+        """
+        job = {
+            "script": script, "scene": scene_name, "script_path": str(script_path),
+            "media_dir": str(media_dir), "width": width, "height": height, "fps": fps,
+        }
+        return await self._submit(job, timeout, step)
+
+    async def prewarm(self, script: str, work_dir: Path, timeout: float = 300) -> RenderResult:
+        """
+        Script'i render etmeden çalıştır: oluşturduğu Text / MathTex'ler önbelleğe yazılır
+        - Container açılışında sabit marka metinleri için
+        """
+        job = {
+            "script": script, "scene": None, "script_path": str(work_dir / "prewarm.py"),
+            "media_dir": str(work_dir), "width": 1080, "height": 1920, "fps": 30,
+        }
+        return await self._submit(job, timeout, "manim prewarm")
+
+    async def _submit(self, job: dict, timeout: float, step: str) -> RenderResult:
+        self._ensure_loop_state()
+        async with self._slots:
+            worker = self._idle.get_nowait() if not self._idle.empty() else await self._spawn()
+            started = time.monotonic()
+            try:
+                worker.conn.send(job)
+                reply = await asyncio.to_thread(worker.wait, timeout)
+            except asyncio.CancelledError:
+                # Öldürme (join 5 sn'ye kadar sürebilir) thread'de: event loop bloklanmaz
+                await asyncio.shield(self._retire(worker, kill=True))
+                raise
+            except (OSError, EOFError) as e:
+                # Worker çökmüş (OOM killer vb.)
+                await self._retire(worker, kill=True)
+                reply = {"ok": False, "error": f"Worker bağlantısı koptu: {e}"}
+            duration = time.monotonic() - started
+            self.jobs += 1
+
+            if reply is None:
+                await self._retire(worker, kill=True)
+                result = RenderResult(ok=False, error="timeout", duration=duration, timed_out=True)
+            else:
+                result = RenderResult(
+                    ok=reply["ok"],
+                    output=Path(reply["output"]) if reply.get("output") else None,
+                    error=reply.get("error", ""),
+                    duration=duration
+                )
+                if worker in self._workers:
+                    worker.jobs += 1
+                    worker.rss_mb = reply.get("rss_mb", 0.0)
+                    if worker.jobs >= self.max_jobs or worker.rss_mb > self.max_rss_mb:
+                        self.recycled += 1
+                        await self._retire(worker)
+                    else:
+                        self._idle.put_nowait(worker)
+
+        status = "timeout" if result.timed_out else ("ok" if result.ok else "error")
+        print(f"⏱️ {step}: {duration:.2f}s ({status}, worker)")
+        record_step(step, duration, ok=result.ok)
+        return result
+
+    def stats(self) -> dict:
+        return {
+            "size": self.size,
+            "alive": len(self._workers),
+            "idle": self._idle.qsize() if self._idle else 0,
+            "started": self.started,
+            "recycled": self.recycled,
+            "jobs": self.jobs,
+            "max_jobs": self.max_jobs,
+            "max_rss_mb": self.max_rss_mb,
+            "text_cache": self.text_cache_stats(),
+        }
+
+    def text_cache_stats(self) -> Optional[dict]:
+        if self.text_cache_dir is None:
+            return None
+        counts = {}
+        for name in TextCache.SUBDIRS.values():
+            directory = self.text_cache_dir / name
+            counts[name] = sum(1 for f in directory.glob("*.svg")) if directory.exists() else 0
+        return counts
+
+    async def close(self) -> None:
+        workers = list(self._workers)
+        self._workers.clear()
+        await asyncio.gather(*[asyncio.to_thread(worker.stop) for worker in workers])